@@ -7,64 +7,396 @@ Description: AlphaBeta AI
 import random
 
 import chess
-import math
+import time
 import PieceSquareTables as pst
+from IncrementalEvaluator import IncrementalEvaluator
+from MoveOrderer import MoveOrderer
+from OpeningBook import book_move_stats
+from PositionHistory import PositionHistory
+from SearchBoard import SearchBoard
+from SearchStats import SearchStats, default_observers
+from TranspositionTable import TranspositionTable, zobrist_key, EXACT, LOWER_BOUND, UPPER_BOUND
+
+# scores are integers; a checkmate scores MATE_SCORE minus its distance in plies from the root, so faster mates
+# score higher, and anything beyond MATE_BOUND is a mate score
+MATE_SCORE = 100000
+MATE_BOUND = MATE_SCORE - 1000
+INFINITE_SCORE = MATE_SCORE + 1  # search window bound, beyond every reachable score
+
+NULL_MOVE_REDUCTION = 2  # extra plies taken off the search after a null move
+LMR_MIN_DEPTH = 3  # late move reductions only at nodes with at least this many plies left
+LMR_MIN_INDEX = 3  # number of moves searched at full depth before later quiet moves are reduced
+DRAW_PENALTY = 200  # taken off a repetition or stalemate the side that just moved could still have won
+
+FLIPPED_BOUND = {EXACT: EXACT, LOWER_BOUND: UPPER_BOUND, UPPER_BOUND: LOWER_BOUND}  # the bound seen by the other side
+
+
+# raised inside the search when the deadline passes or a stop is requested
+class SearchAborted(Exception):
+    pass
+
+
+# signed number of moves to checkmate for a mate score (negative when being mated), None for other scores
+def mate_distance(score):
+    if score is None or abs(score) < MATE_BOUND:
+        return None
+    plies = MATE_SCORE - abs(score)
+    moves = (plies + 1) // 2
+    return moves if score > 0 else -moves
 
 
 class AlphaBetaAI:
-    def __init__(self, depth, color, simple):
+    def __init__(self, depth, color, simple, hash_size=16, incremental=True, vectorized=False, ordering="mvv_lva",
+                 workers=1, compact_board=True, observers=None, time_evaluations=False, null_move=False,
+                 late_move_reductions=False, pvs=False, book=None, syzygy_path=None, table_path=None, profile=False,
+                 trace_path=None):
         self.depth = depth  # decremented until reaches depth limit of 0
+        self.root_depth = depth  # depth the current search was started with
         self.color = color  # true is white, false is black
         self.opponent_color = not color
         self.board_before_reorder = None
         self.min_max_calls = 0  # keeps track of calls to min and max each iteration
         self.heuristic_calls = 0
+        self.leaf_evals = 0  # evaluations of nodes where the search stopped, with either heuristic
         self.simple = simple
+        # transposition table of hash_size megabytes shared by every search of this AI (0 disables it); with
+        # table_path it is a file kept between runs and shared with other processes (see PersistentTable.py)
+        self.table = TranspositionTable(hash_size) if hash_size > 0 else None
+        if table_path is not None and hash_size > 0:
+            from PersistentTable import PersistentTable
+            self.table = PersistentTable(table_path, hash_size, 1 if simple else 0)
+        # the draw penalty counts against this AI whichever side it plays, so it isn't zero-sum; a table shared by
+        # both colors flips scores between them and would turn one side's penalty into a bonus for the other
+        self.draw_penalty = 0 if self.table is not None and self.table.shared else DRAW_PENALTY
+        # keeps Michniewski material/position totals up to date while searching instead of rescanning every leaf
+        self.evaluator = IncrementalEvaluator() if incremental and not simple and not vectorized else None
+        # NumPy backend that scores all children of a frontier node in one batch (needs numpy installed)
+        self.vectorizer = None
+        if vectorized and not simple:
+            from VectorizedEvaluator import VectorizedEvaluator
+            self.vectorizer = VectorizedEvaluator()
+        # Syzygy tables in syzygy_path score positions with few pieces exactly (missing tables are skipped)
+        self.tablebase = None
+        if syzygy_path is not None:
+            from Tablebase import Tablebase
+            self.tablebase = Tablebase(syzygy_path)
+        # "mvv_lva" orders moves without making them (captures, promotions, killers, checks, history);
+        # "material" pushes every move and sorts by the simple heuristic
+        self.ordering = ordering
+        self.orderer = MoveOrderer()  # also keeps the cutoff statistics for both orderings
+        self.history = PositionHistory()  # zobrist keys of the game and search path, for repetition detection
+        self.compact_board = compact_board  # search a SearchBoard copy instead of the chess.Board itself
+        # null move pruning: let the side to move pass, and cut off if a shallower search still fails high
+        self.null_move = null_move
+        # late move reductions: search quiet moves late in the ordering one ply shallower, re-searching if they raise
+        # the bound
+        self.late_move_reductions = late_move_reductions
+        # principal variation search: one negamax function; moves after the first are only searched with a null window
+        # unless they turn out better than the best so far
+        self.pvs = pvs
+        self.null_move_cutoffs = 0
+        self.reduced_searches = 0
+        self.re_searches = 0  # reduced searches that had to be repeated at full depth
+        self.root_keys = 0  # length of the position history at the root, for measuring the distance to mates
+        self.root_turn = color  # side to move at the root
+        self.deadline = None  # time.perf_counter() value at which the search is aborted (None searches to the end)
+        self.max_nodes = None  # min/max call count at which the search is aborted (None for no limit)
+        self.stop_requested = False  # set from another thread to abort the search
+        self.stop_event = None  # multiprocessing.Event shared with the parent process of a parallel search worker
+        self.pv = []  # principal variation searched first (set between iterative deepening iterations)
+        self.follow_pv = False  # true while the current node lies on self.pv
+        # true while every move from the root to the current node was the first one searched at its parent (the
+        # principal variation nodes of max_value/min_value, which never get a null window)
+        self.pv_node = True
+        self.best_value = None  # score of the last completed search
+        # searches root moves in a pool of worker processes when workers > 1 (see ParallelSearch.py)
+        self.workers = workers
+        self.parallel = None
+        self.options = {"hash_size": hash_size, "incremental": incremental, "vectorized": vectorized,
+                        "ordering": ordering, "compact_board": compact_board, "null_move": null_move,
+                        "late_move_reductions": late_move_reductions,
+                        "pvs": pvs, "syzygy_path": syzygy_path,
+                        "table_path": table_path}  # builds the same AI in worker processes
+        # told about every chosen move (see SearchStats.py); None prints the usual progress lines
+        self.observers = default_observers(observers)
+        self.stats = None  # SearchStats of the last choose_move call
+        self.book = book  # OpeningBook probed before searching (None always searches)
+        # times every evaluate call for the statistics; off by default because it costs two clock reads per leaf
+        self.time_evaluations = time_evaluations
+        self.eval_seconds = 0.0
+        if time_evaluations:
+            self.evaluate = self.timed_evaluate
+        # samples every choose_move call and writes its call stacks to profiles/ (see SearchProfiler.py); without the
+        # flag choose_move isn't wrapped at all
+        self.profiler = None
+        if profile:
+            from SearchProfiler import SearchProfiler
+            self.profiler = SearchProfiler("alphabeta_" + ("white" if color else "black"))
+            self.choose_move = self.profiler.wrap(self.choose_move)
+        # appends every visited node to a binary trace file (see SearchTrace.py); off by default, and without it the
+        # search functions aren't wrapped at all
+        self.tracer = None
+        if trace_path is not None:
+            from SearchTrace import SearchTracer
+            self.tracer = SearchTracer(trace_path)
+            self.max_value = self.traced_max_value
+            self.min_value = self.traced_min_value
+            self.negamax = self.traced_negamax
 
     def choose_move(self, board):
-        self.min_max_calls = 0  # resetting min/max calls before move decision process
-        self.heuristic_calls = 0
+        self.stop_requested = False
+        self.reset_counters()  # resetting min/max calls before move decision process
+        start = time.perf_counter()
+        move = self.book.probe(board) if self.book is not None else None
+        if move is not None:
+            self.stats = book_move_stats("alphabeta", move, time.perf_counter() - start)
+            for observer in self.observers:
+                observer.on_move(self.stats)
+            return move
+        move = self.tablebase_root_move(board)
+        if move is not None:
+            from Tablebase import tablebase_move_stats
+            self.stats = tablebase_move_stats("alphabeta", move, time.perf_counter() - start)
+            for observer in self.observers:
+                observer.on_move(self.stats)
+            return move
         move = self.minimax_decision(board)
-        print("Alpha Beta AI recommending move " + str(move) + " | depth = " + str(self.depth) +
-              " | min/max calls = " + str(self.min_max_calls))
-        print("heuristic calls: " + str(self.heuristic_calls))
+        self.stats = SearchStats("alphabeta", self.depth)
+        self.stats.add_cutoffs(self.orderer)
+        self.record_stats(self.stats, move, time.perf_counter() - start)
+        for observer in self.observers:
+            observer.on_move(self.stats)
         return move
 
-    # checks if the game is over or depth is over
-    def cutoff_test(self, board):
-        if self.depth == 0 or board.is_game_over():  # if at depth limit or no legal moves
-            return True
-        return False
+    # zeroes the counters read by record_stats
+    def reset_counters(self):
+        self.min_max_calls = 0
+        self.heuristic_calls = 0
+        self.leaf_evals = 0
+        self.eval_seconds = 0.0
+        self.null_move_cutoffs = 0
+        self.reduced_searches = 0
+        self.re_searches = 0
+        if self.table is not None:
+            self.table.reset_stats()
+        if self.tablebase is not None:
+            self.tablebase.reset_stats()
+
+    # copies the counters since reset_counters into stats for a search that chose move in the given seconds
+    def record_stats(self, stats, move, seconds):
+        stats.move = move
+        stats.value = self.best_value
+        stats.nodes = self.min_max_calls
+        stats.leaf_evals = self.leaf_evals
+        stats.heuristic_calls = self.heuristic_calls
+        if self.table is not None:
+            stats.table = (self.table.hits, self.table.misses, self.table.collisions)
+        if self.tablebase is not None:
+            stats.tablebase = (self.tablebase.probes, self.tablebase.hits)
+        stats.seconds = seconds
+        if self.time_evaluations:
+            stats.eval_seconds = self.eval_seconds
+
+    # a perfect move for a root position covered by the endgame tablebase, or None
+    def tablebase_root_move(self, board):
+        if self.tablebase is None or self.tablebase.tables is None:
+            return None
+        if not isinstance(board, chess.Board):
+            board = board.position()
+        return self.tablebase.root_move(board)
+
+    # exact score (for this AI's color) of a node below the root covered by the endgame tablebase, or None
+    def tablebase_value(self, board):
+        if self.ply() == 0:  # the root needs a move, not just a score
+            return None
+        score = self.tablebase.score(board)
+        if score is None:
+            return None
+        return score if board.turn == self.color else -score
+
+    # checks if the game is over; moves is the node's legal move list, generated once per node
+    def cutoff_test(self, board, moves):
+        return self.history.is_game_over(board, moves)
+
+    # scores a node where the search stops; has_moves is None when the legal moves weren't generated
+    def evaluate(self, board, has_moves=None):
+        self.leaf_evals += 1
+        if self.simple:
+            return self.simple_heuristic(board)
+        if has_moves is None:
+            has_moves = any(board.generate_legal_moves())  # stops at the first legal move
+        return self.michniewski_heuristic(board, has_moves)
+
+    # evaluate, also adding up the time it takes (installed by time_evaluations=True)
+    def timed_evaluate(self, board, has_moves=None):
+        start = time.perf_counter()
+        value = AlphaBetaAI.evaluate(self, board, has_moves)
+        self.eval_seconds += time.perf_counter() - start
+        return value
 
     # goes through options at given depth and returns best move
-    def minimax_decision(self, board):
-        max_move_value, max_move = self.max_value(board, -math.inf, math.inf)
-        return max_move  # don't need the value
+    # alpha and beta narrow the root window (aspiration search); a best_value outside them is only a bound
+    def minimax_decision(self, board, alpha=-INFINITE_SCORE, beta=INFINITE_SCORE):
+        if self.workers > 1:
+            if self.parallel is None:
+                from ParallelSearch import ParallelSearch
+                self.parallel = ParallelSearch(self)
+            return self.parallel.minimax_decision(board)  # always searches the full window
+
+        board = self.search_position(board)
+        self.start_search(board)
+        stack_size = len(board.move_stack)
+        try:
+            if not self.pvs:
+                max_move_value, max_move = self.max_value(board, alpha, beta)
+            elif board.turn == self.color:
+                max_move_value, max_move = self.negamax(board, alpha, beta)
+            else:  # negamax scores are for the side to move
+                max_move_value, max_move = self.negamax(board, -beta, -alpha)
+                max_move_value = -max_move_value
+        except SearchAborted:
+            # unwind the moves the aborted search left on the board
+            while len(board.move_stack) > stack_size:
+                board.pop()
+            self.depth = self.root_depth
+            raise
+        finally:
+            if self.tracer is not None:
+                self.tracer.flush()
+
+        self.best_value = max_move_value
+        return max_move
+
+    # the position the search runs on: a compact SearchBoard copy of board, or board itself
+    def search_position(self, board):
+        return SearchBoard.from_board(board) if self.compact_board else board
+
+    # resets per-search state before searching board with the current depth
+    def start_search(self, board):
+        self.root_depth = self.depth
+        self.orderer.new_search()
+        self.follow_pv = len(self.pv) > 0
+        self.pv_node = True
+        self.history.reset(board)
+        self.root_keys = len(self.history.keys)
+        self.root_turn = board.turn
+        if self.evaluator is not None:
+            self.evaluator.reset(board)
+        if self.tracer is not None:
+            self.tracer.start(self.history.current(), self.depth)
+
+    # distance in plies of the current node from the root of the search
+    def ply(self):
+        return len(self.history.keys) - self.root_keys
+
+    # asks the running search to stop (from another thread); choose_move raises SearchAborted
+    def stop(self):
+        self.stop_requested = True
+
+    # shuts down the worker processes of a parallel search and closes the trace file and a table file (the AI then
+    # searches without a table)
+    def close(self):
+        if self.parallel is not None:
+            self.parallel.close()
+            self.parallel = None
+        if self.tracer is not None:
+            self.tracer.close()
+            self.tracer = None
+        if self.table is not None and self.table.shared:
+            self.table.close()
+            self.table = None
+
+    # raises SearchAborted once the deadline or node limit has passed or a stop was requested; checked every 256 nodes
+    def check_abort(self):
+        if self.stop_requested or (self.deadline is not None and time.perf_counter() >= self.deadline):
+            raise SearchAborted()
+        if self.max_nodes is not None and self.min_max_calls >= self.max_nodes:
+            raise SearchAborted()
+        if self.stop_event is not None and self.stop_event.is_set():
+            raise SearchAborted()
+
+    # follows best moves stored in the transposition table to build the principal variation from board
+    def principal_variation(self, board, max_length):
+        line = []
+        if self.table is None:
+            return line
+        while len(line) < max_length:
+            entry = self.table.probe(zobrist_key(board))
+            if entry is None or entry[4] is None or not board.is_legal(entry[4]):
+                break
+            line.append(entry[4])
+            board.push(entry[4])
+        for _ in line:
+            board.pop()
+        return line
 
     # try to maximize the value of a board
     def max_value(self, board, alpha, beta):
         self.min_max_calls += 1  # increment min/max call tracking variable
+        if self.min_max_calls & 255 == 0:
+            self.check_abort()
 
-        if self.cutoff_test(board):  # game over or depth limit reached
-            if self.simple:
-                return self.simple_heuristic(board), None
-            else:
-                return self.michniewski_heuristic(board), None  # no need to keep track of best move
+        key = self.history.current()
+        hash_move = None
+        if self.table is not None:
+            table_value, hash_move = self.probe_table(key, alpha, beta)
+            if table_value is not None:
+                return table_value, hash_move
 
-        v = -math.inf
-        max_move = None
+        if self.depth == 0:  # depth limit reached
+            return self.evaluate(board), None  # no need to keep track of best move
 
-        self.board_before_reorder = board  # keeps track of current board
-        sorted_moves = sorted(board.legal_moves, key=self.move_reorderer, reverse=True)  # sort moves by board value
-        # sorted_moves = sorted(board.legal_moves, key=lambda k: random.random())
+        moves = list(board.legal_moves)  # the only move generation for this node
+        if self.cutoff_test(board, moves):  # game over
+            return self.evaluate(board, len(moves) > 0), None
+
+        if self.tablebase is not None:  # exact result, no need to search the subtree
+            tablebase_value = self.tablebase_value(board)
+            if tablebase_value is not None:
+                return tablebase_value, None
+
+        v = -INFINITE_SCORE
+        max_move = None
+        alpha_original = alpha  # alpha is raised while searching; the bound type is judged against the original
+
+        if self.vectorizer is not None and self.depth == 1:  # children are leaves, score them together
+            return self.frontier_value(board, moves, True, key, alpha_original, beta)
+
+        # if passing still scores at least beta, a real move will too (except in zugzwang)
+        if self.null_move and beta < INFINITE_SCORE and self.null_move_allowed(board):
+            self.pv_node = False
+            self.push_null_move(board)
+            self.depth -= 1 + NULL_MOVE_REDUCTION
+            null_value, null_reply = self.min_value(board, max(alpha, beta - 1), beta)
+            self.depth += 1 + NULL_MOVE_REDUCTION
+            self.pop_move(board)
+            if null_value >= beta:
+                self.null_move_cutoffs += 1
+                return beta, None  # not null_value, which may be a mate score only reached by passing
+
+        sorted_moves = self.order_moves(board, moves, hash_move, True)
+        in_check = self.late_move_reductions and board.is_check()
+        pv_node = self.pv_node
 
         # loop through moves and update alpha/beta
-        for move in sorted_moves:
-            board.push(move)
+        for index, move in enumerate(sorted_moves):
+            reduce = self.late_move_reductions and self.reducible(board, move, index, in_check, alpha, pv_node)
+            self.pv_node = pv_node and index == 0
+            self.push_move(board, move)
             self.depth -= 1
-            min_value, min_move = self.min_value(board, alpha, beta)
+            if reduce and not board.is_check():
+                # a null window search one ply shallower only has to show the move doesn't beat alpha
+                self.reduced_searches += 1
+                self.depth -= 1
+                min_value, min_move = self.min_value(board, alpha, alpha + 1)
+                self.depth += 1
+                if min_value > alpha:
+                    self.re_searches += 1
+                    min_value, min_move = self.min_value(board, alpha, beta)
+            else:
+                min_value, min_move = self.min_value(board, alpha, beta)
             self.depth += 1
-            board.pop()
+            self.pop_move(board)
 
             # check if the min value of the current move is better than min value of the best (max) move so far
             if min_value > v:
@@ -72,35 +404,81 @@ class AlphaBetaAI:
                 max_move = move
 
             if v >= beta:
+                self.orderer.record_cutoff(board, move, self.root_depth - self.depth, self.depth, index)
+                self.store_table(key, v, alpha, beta, move)
                 return v, move  # move value greater than beta, return immediately
             alpha = max(alpha, v)
 
+        self.store_table(key, v, alpha_original, beta, max_move)
         return v, max_move
 
     # try to minimize the value of a board
     def min_value(self, board, alpha, beta):
         self.min_max_calls += 1  # increment min/max call tracking variable
+        if self.min_max_calls & 255 == 0:
+            self.check_abort()
 
-        if self.cutoff_test(board):  # game over or depth limit reached
-            if self.simple:
-                return self.simple_heuristic(board), None
-            else:
-                return self.michniewski_heuristic(board), None
+        key = self.history.current()
+        hash_move = None
+        if self.table is not None:
+            table_value, hash_move = self.probe_table(key, alpha, beta)
+            if table_value is not None:
+                return table_value, hash_move
 
-        v = math.inf
-        min_move = None
+        if self.depth == 0:  # depth limit reached
+            return self.evaluate(board), None  # no need to keep track of best move
 
-        self.board_before_reorder = board  # keeps track of current board
-        sorted_moves = sorted(board.legal_moves, key=self.move_reorderer, reverse=False)  # sort moves by board value
-        # sorted_moves = sorted(board.legal_moves, key=lambda k: random.random())
+        moves = list(board.legal_moves)  # the only move generation for this node
+        if self.cutoff_test(board, moves):  # game over
+            return self.evaluate(board, len(moves) > 0), None
+
+        if self.tablebase is not None:  # exact result, no need to search the subtree
+            tablebase_value = self.tablebase_value(board)
+            if tablebase_value is not None:
+                return tablebase_value, None
+
+        v = INFINITE_SCORE
+        min_move = None
+        beta_original = beta  # beta is lowered while searching; the bound type is judged against the original
+
+        if self.vectorizer is not None and self.depth == 1:  # children are leaves, score them together
+            return self.frontier_value(board, moves, False, key, alpha, beta_original)
+
+        # if passing still scores at most alpha, a real move will too (except in zugzwang)
+        if self.null_move and alpha > -INFINITE_SCORE and self.null_move_allowed(board):
+            self.pv_node = False
+            self.push_null_move(board)
+            self.depth -= 1 + NULL_MOVE_REDUCTION
+            null_value, null_reply = self.max_value(board, alpha, min(beta, alpha + 1))
+            self.depth += 1 + NULL_MOVE_REDUCTION
+            self.pop_move(board)
+            if null_value <= alpha:
+                self.null_move_cutoffs += 1
+                return alpha, None  # not null_value, which may be a mate score only reached by passing
+
+        sorted_moves = self.order_moves(board, moves, hash_move, False)
+        in_check = self.late_move_reductions and board.is_check()
+        pv_node = self.pv_node
 
         # loop through moves and update alpha/beta
-        for move in sorted_moves:
-            board.push(move)
+        for index, move in enumerate(sorted_moves):
+            reduce = self.late_move_reductions and self.reducible(board, move, index, in_check, beta, pv_node)
+            self.pv_node = pv_node and index == 0
+            self.push_move(board, move)
             self.depth -= 1
-            max_value, max_move = self.max_value(board, alpha, beta)
+            if reduce and not board.is_check():
+                # a null window search one ply shallower only has to show the move doesn't get below beta
+                self.reduced_searches += 1
+                self.depth -= 1
+                max_value, max_move = self.max_value(board, beta - 1, beta)
+                self.depth += 1
+                if max_value < beta:
+                    self.re_searches += 1
+                    max_value, max_move = self.max_value(board, alpha, beta)
+            else:
+                max_value, max_move = self.max_value(board, alpha, beta)
             self.depth += 1
-            board.pop()
+            self.pop_move(board)
 
             # check if the max value of the current move is better than max value of the best (min) move so far
             if max_value < v:
@@ -108,11 +486,261 @@ class AlphaBetaAI:
                 min_move = move
 
             if v <= alpha:  # move value less than alpha, return immediately
+                self.orderer.record_cutoff(board, move, self.root_depth - self.depth, self.depth, index)
+                self.store_table(key, v, alpha, beta, move)
                 return v, move
             beta = min(beta, v)
 
+        self.store_table(key, v, alpha, beta_original, min_move)
         return v, min_move
 
+    # principal variation search in negamax form: scores are for the side to move, the first (expected best) move
+    # gets the full window, and later moves a null window that only proves they are no better, re-searched with the
+    # full window when they are
+    def negamax(self, board, alpha, beta):
+        self.min_max_calls += 1  # increment min/max call tracking variable
+        if self.min_max_calls & 255 == 0:
+            self.check_abort()
+
+        key = self.history.current()
+        hash_move = None
+        if self.table is not None:
+            table_value, hash_move = self.probe_table(key, alpha, beta)
+            if table_value is not None:
+                return table_value, hash_move
+
+        sign = 1 if board.turn == self.color else -1  # evaluate scores for the AI's color
+        if self.depth == 0:  # depth limit reached
+            return sign * self.evaluate(board), None
+
+        moves = list(board.legal_moves)  # the only move generation for this node
+        if self.cutoff_test(board, moves):  # game over
+            return sign * self.evaluate(board, len(moves) > 0), None
+
+        if self.tablebase is not None:  # exact result, no need to search the subtree
+            tablebase_value = self.tablebase_value(board)
+            if tablebase_value is not None:
+                return sign * tablebase_value, None
+
+        alpha_original = alpha
+
+        # if passing still scores at least beta, a real move will too (except in zugzwang)
+        if self.null_move and beta < INFINITE_SCORE and self.null_move_allowed(board):
+            self.push_null_move(board)
+            self.depth -= 1 + NULL_MOVE_REDUCTION
+            null_value = -self.negamax(board, -beta, -beta + 1)[0]
+            self.depth += 1 + NULL_MOVE_REDUCTION
+            self.pop_move(board)
+            if null_value >= beta:
+                self.null_move_cutoffs += 1
+                return beta, None
+
+        sorted_moves = self.order_moves(board, moves, hash_move, sign > 0)
+        in_check = self.late_move_reductions and board.is_check()
+        pv_node = beta - alpha > 1  # null window nodes only have to prove a bound
+        v = -INFINITE_SCORE
+        best_move = None
+
+        for index, move in enumerate(sorted_moves):
+            reduce = self.late_move_reductions and self.reducible(board, move, index, in_check, alpha, pv_node)
+            self.push_move(board, move)
+            self.depth -= 1
+            if index == 0:
+                value = -self.negamax(board, -beta, -alpha)[0]
+            else:
+                if reduce and not board.is_check():
+                    self.reduced_searches += 1
+                    self.depth -= 1
+                    value = -self.negamax(board, -alpha - 1, -alpha)[0]
+                    self.depth += 1
+                    if value > alpha:
+                        self.re_searches += 1
+                        value = -self.negamax(board, -alpha - 1, -alpha)[0]
+                else:
+                    value = -self.negamax(board, -alpha - 1, -alpha)[0]
+                if alpha < value < beta:  # better than expected: find its exact score
+                    value = -self.negamax(board, -beta, -alpha)[0]
+            self.depth += 1
+            self.pop_move(board)
+
+            if value > v:
+                v = value
+                best_move = move
+
+            if v >= beta:
+                self.orderer.record_cutoff(board, move, self.root_depth - self.depth, self.depth, index)
+                self.store_table(key, v, alpha, beta, move)
+                return v, move
+            alpha = max(alpha, v)
+
+        self.store_table(key, v, alpha_original, beta, best_move)
+        return v, best_move
+
+    # runs search (max_value, min_value or negamax) on a node and writes the node to the trace when it returns
+    def traced_search(self, search, board, alpha, beta):
+        key = self.history.current()
+        ply = self.ply()
+        depth = self.depth
+        value, move = search(self, board, alpha, beta)
+        self.tracer.record(key, ply, depth, alpha, beta, value, self.orderer.last_cutoff_index)
+        self.orderer.last_cutoff_index = -1  # a cutoff is only reported by the node that made it
+        return value, move
+
+    # max_value, min_value and negamax writing every node to the trace (installed by trace_path)
+    def traced_max_value(self, board, alpha, beta):
+        return self.traced_search(AlphaBetaAI.max_value, board, alpha, beta)
+
+    def traced_min_value(self, board, alpha, beta):
+        return self.traced_search(AlphaBetaAI.min_value, board, alpha, beta)
+
+    def traced_negamax(self, board, alpha, beta):
+        return self.traced_search(AlphaBetaAI.negamax, board, alpha, beta)
+
+    # returns the legal moves of board in the order they should be searched
+    def order_moves(self, board, moves, hash_move, maximize):
+        if self.follow_pv:  # the previous iteration's best line is searched first
+            ply = self.root_depth - self.depth
+            if ply < len(self.pv):
+                hash_move = self.pv[ply]
+            else:
+                self.follow_pv = False
+
+        if self.ordering == "mvv_lva":
+            return self.orderer.order(board, moves, self.root_depth - self.depth, hash_move)
+
+        self.board_before_reorder = board  # keeps track of current board
+        # sort moves by board value, best for the side to move first
+        sorted_moves = sorted(moves, key=self.move_reorderer, reverse=maximize)
+        self.move_to_front(sorted_moves, hash_move)
+        # sorted_moves = sorted(moves, key=lambda k: random.random())
+        return sorted_moves
+
+    # evaluates every child of a node one ply above the depth limit with a single batched heuristic call
+    def frontier_value(self, board, moves, maximize, key, alpha, beta):
+        masks_list = []
+        terminal_scores = []
+        for move in moves:
+            self.push_move(board, move)
+            self.min_max_calls += 1  # each child counts as a visited min/max node
+            masks_list.append(self.vectorizer.position_masks(board))
+            terminal_scores.append(self.michniewski_terminal_score(board, any(board.generate_legal_moves())))
+            self.pop_move(board)
+
+        scores = self.vectorizer.score_batch(masks_list, self.color).tolist()
+        self.leaf_evals += len(moves)
+        values = [terminal if abs(terminal) >= MATE_BOUND else score + terminal
+                  for score, terminal in zip(scores, terminal_scores)]
+        best = max(range(len(moves)), key=values.__getitem__) if maximize else \
+            min(range(len(moves)), key=values.__getitem__)
+
+        self.store_table(key, values[best], alpha, beta, moves[best])
+        return values[best], moves[best]
+
+    # true if a null move may be tried at this node: never at the root, on the principal variation, twice in a row,
+    # in check, or when the side to move has only pawns left (where passing is often better than any move)
+    def null_move_allowed(self, board):
+        if self.depth <= NULL_MOVE_REDUCTION or self.depth == self.root_depth or self.follow_pv:
+            return False
+        if not board.move_stack[-1] or board.is_check():
+            return False
+        pieces = board.knights | board.bishops | board.rooks | board.queens
+        return bool(pieces & board.occupied_co[board.turn])
+
+    # true if the index-th move of a node may be searched with a late move reduction (the move giving check is
+    # tested after it is made); bound is the side to move's alpha or beta, which must be finite for a null window
+    # moves of the root and of principal variation nodes are never reduced, since their scores are the result
+    def reducible(self, board, move, index, in_check, bound, pv_node):
+        if index < LMR_MIN_INDEX or self.depth < LMR_MIN_DEPTH or in_check or abs(bound) >= INFINITE_SCORE:
+            return False
+        if pv_node or self.depth == self.root_depth:
+            return False
+        return not move.promotion and not board.is_capture(move)
+
+    # passes the turn for a null move search
+    def push_null_move(self, board):
+        if self.evaluator is not None:
+            self.evaluator.push_null()
+        self.history.push_null(board)  # also pushes the null move onto board
+
+    # makes a search move, keeping the incremental evaluator in step with the board
+    def push_move(self, board, move):
+        if self.evaluator is not None:
+            self.evaluator.push(board, move)
+        self.history.push(board, move)  # also pushes the move onto board
+
+    # takes back the last search move
+    def pop_move(self, board):
+        board.pop()
+        self.history.pop()
+        self.follow_pv = False  # only the first child of a principal variation node is on the principal variation
+        if self.evaluator is not None:
+            self.evaluator.pop()
+
+    # looks up a position in the transposition table; returns (score, move) with score None when it can't cut off
+    def probe_table(self, key, alpha, beta):
+        entry = self.table.probe(key)
+        if entry is None:
+            return None, None
+
+        entry_key, entry_depth, entry_score, entry_bound, entry_move = entry
+        if self.table.shared and not self.white_node():
+            entry_score, entry_bound = -entry_score, FLIPPED_BOUND[entry_bound]
+        entry_score = self.score_from_table(entry_score)
+        # never cut at the root so the decision always comes from a search of the current position
+        if entry_depth >= self.depth and self.depth != self.root_depth:
+            if entry_bound == EXACT:
+                return entry_score, entry_move
+            if entry_bound == LOWER_BOUND and entry_score >= beta:
+                return entry_score, entry_move
+            if entry_bound == UPPER_BOUND and entry_score <= alpha:
+                return entry_score, entry_move
+        return None, entry_move  # stored best move is still useful for ordering
+
+    # records the result of a searched node in the transposition table
+    def store_table(self, key, v, alpha, beta, move):
+        if self.table is None:
+            return
+        if v <= alpha:
+            bound = UPPER_BOUND
+        elif v >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        v = self.score_to_table(v)
+        if self.table.shared and not self.white_node():
+            v, bound = -v, FLIPPED_BOUND[bound]
+        self.table.store(key, self.depth, v, bound, move)
+
+    # whether the current node's scores are from White's point of view: the AI's color for max_value/min_value, the
+    # side to move for negamax
+    def white_node(self):
+        if not self.pvs:
+            return self.color == chess.WHITE
+        return (self.ply() % 2 == 0) == (self.root_turn == chess.WHITE)
+
+    # mate scores are stored as the distance from the stored node rather than from the root, so they stay right
+    # when the position is reached at another ply
+    def score_to_table(self, score):
+        if score >= MATE_BOUND:
+            return score + self.ply()
+        if score <= -MATE_BOUND:
+            return score - self.ply()
+        return score
+
+    def score_from_table(self, score):
+        if score >= MATE_BOUND:
+            return score - self.ply()
+        if score <= -MATE_BOUND:
+            return score + self.ply()
+        return score
+
+    # moves the best move stored in the transposition table to the front of the search order
+    @staticmethod
+    def move_to_front(moves, move):
+        if move is not None and move in moves:
+            moves.remove(move)
+            moves.insert(0, move)
+
     # calculate value of move using a simple heuristic
     def move_reorderer(self, move):
         self.board_before_reorder.push(move)
@@ -214,25 +842,43 @@ class AlphaBetaAI:
         else:
             return black_position_score - white_position_score
 
-    # calculate player score according to Tomasz Michniewski's Simplified Evaluation Function
-    # https://www.chessprogramming.org/Simplified_Evaluation_Function
-    def michniewski_heuristic(self, board):
+    # end-of-game part of the Michniewski heuristic (repetition, stalemate and checkmate)
+    # has_moves tells whether the side to move has a legal move, so mate and stalemate need no extra move generation
+    # a checkmate returns a mate score, which replaces the rest of the evaluation
+    def michniewski_terminal_score(self, board, has_moves):
         board_score = 0
         color = not board.turn  # player that just moved
+        in_check = not has_moves and board.is_check()  # only needed to tell checkmate from stalemate
 
         # if board.is_game_over(): print(str(board.outcome()))
 
-        if not board.has_insufficient_material(color):  # color can still win
-            if board.is_repetition(3) or board.is_stalemate():
-                board_score -= 200   # repetition and stalemate bad
+        repetition = self.history.repetitions(board) >= 3
+        stalemate = not has_moves and not in_check
+        if (repetition or stalemate) and not board.has_insufficient_material(color):  # color can still win
+            board_score -= self.draw_penalty   # repetition and stalemate bad
+
+        if not has_moves and in_check:
+            mate_score = MATE_SCORE - self.ply()  # sooner mates score higher
+            return mate_score if color == self.color else -mate_score
 
-        if board.is_checkmate():
-            board_score += math.inf if color == self.color else -math.inf   # checkmate is infinite value
+        return board_score
 
-        board_score += self.michniewski_player_material_score(board, self.color) - \
-                         self.michniewski_player_material_score(board, self.opponent_color)
+    # calculate player score according to Tomasz Michniewski's Simplified Evaluation Function
+    # https://www.chessprogramming.org/Simplified_Evaluation_Function
+    def michniewski_heuristic(self, board, has_moves):
+        board_score = self.michniewski_terminal_score(board, has_moves)
+        if abs(board_score) >= MATE_BOUND:
+            return board_score
+
+        if self.evaluator is not None:
+            board_score += self.evaluator.score(self.color)  # material and position kept up to date during search
+        elif self.vectorizer is not None:
+            board_score += self.vectorizer.score(board, self.color)
+        else:
+            board_score += self.michniewski_player_material_score(board, self.color) - \
+                             self.michniewski_player_material_score(board, self.opponent_color)
 
-        board_score += self.michniewski_player_position_score(board, self.color)
+            board_score += self.michniewski_player_position_score(board, self.color)
 
         return board_score
 
@@ -0,0 +1,87 @@
+"""
+Description: Runs a player's move search in a worker thread and hands back a future, so callers such as the Qt GUI
+stay responsive; searches can be cancelled and report their progress
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+
+from AlphaBetaAI import SearchAborted
+from SearchStats import SearchObserver
+
+
+# passes every completed iterative deepening iteration on to a progress callback
+class ProgressObserver(SearchObserver):
+    def __init__(self, callback):
+        self.callback = callback
+
+    def on_iteration(self, stats, iteration):
+        self.callback(iteration)
+
+
+# future of a running search; cancelling it also stops the search
+class SearchFuture(concurrent.futures.Future):
+    def __init__(self, player):
+        super().__init__()
+        self.player = player
+
+    def cancel(self):
+        stop = getattr(self.player, "stop", None)  # HumanPlayer and RandomAI can't be stopped
+        if stop is not None:
+            stop()
+        return super().cancel()
+
+
+class AsyncEngine:
+    def __init__(self, player):
+        self.player = player  # any object with choose_move(board)
+        self.thread = None
+
+    # true while a search is running
+    def busy(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    # starts choosing a move for a copy of board and returns a future of the move
+    # progress is called from the search thread with the IterationStats of every completed iteration
+    def choose_move_async(self, board, progress=None):
+        if self.busy():
+            raise RuntimeError("a search is already running")
+        future = SearchFuture(self.player)
+        self.thread = threading.Thread(target=self.run, args=(future, board.copy(), progress), daemon=True)
+        self.thread.start()
+        return future
+
+    # asyncio version of choose_move_async; cancelling the awaiting task stops the search
+    async def choose_move_coroutine(self, board, progress=None):
+        return await asyncio.wrap_future(self.choose_move_async(board, progress))
+
+    def run(self, future, board, progress):
+        observer = None
+        if progress is not None and hasattr(self.player, "observers"):
+            observer = ProgressObserver(progress)
+            self.player.observers.append(observer)
+        try:
+            if future.cancelled():
+                return
+            move = self.player.choose_move(board)
+            self.finish(future, move)
+        except SearchAborted:
+            # cancelled while searching, or stopped through player.stop(); cancelling again is harmless and makes sure
+            # every waiter on the future is released
+            future.cancel()
+        except Exception as error:
+            self.finish(future, None, error)
+        finally:
+            if observer is not None:
+                self.player.observers.remove(observer)
+
+    @staticmethod
+    def finish(future, move, error=None):
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(move)
+        except concurrent.futures.InvalidStateError:
+            pass  # cancelled after the search finished
@@ -2,18 +2,47 @@ import chess
 
 
 class ChessGame:
-    def __init__(self, player1, player2):
-        self.board = chess.Board()
+    def __init__(self, player1, player2, fen=None):
+        self.board = chess.Board() if fen is None else chess.Board(fen)  # optional starting position
         self.players = [player1, player2]
-
-    def make_move(self):
-        player = self.players[1 - int(self.board.turn)]
-        move = player.choose_move(self.board)
+        self.move_stats = [[], []]  # SearchStats of every move of each player, for players that keep them
+
+    # asks the player to move and plays its move; move is the player's move when it was already chosen elsewhere (the
+    # GUI searches in a worker thread)
+    def make_move(self, move=None):
+        index = 1 - int(self.board.turn)
+        player = self.players[index]
+        if move is None:
+            move = player.choose_move(self.board)
+        stats = getattr(player, "stats", None)  # HumanPlayer and RandomAI keep none
+        if stats is not None:
+            self.move_stats[index].append(stats)
         self.board.push(move)  # Make the move
 
     def is_game_over(self):
         return self.board.is_game_over()
 
+    # plays the game to the end and returns its result ("1-0", "0-1" or "1/2-1/2")
+    # show_board prints the board before every move; games reaching max_plies are scored as draws
+    def play(self, show_board=True, max_plies=None):
+        while not self.is_game_over():
+            if max_plies is not None and len(self.board.move_stack) >= max_plies:
+                return "1/2-1/2"
+            if show_board:
+                print(self)
+            self.make_move()
+        return self.board.result()
+
+    # (book moves, moves, seconds saved) of player 0 or 1; each book move is counted as saving the player's average
+    # search time of the game, less the time the probe took
+    def book_summary(self, index):
+        moves = self.move_stats[index]
+        book_moves = [stats for stats in moves if stats.book]
+        searches = [stats.seconds for stats in moves if not stats.book]
+        average = sum(searches) / len(searches) if searches else 0.0
+        saved = sum((average - stats.seconds for stats in book_moves), 0.0)
+        return len(book_moves), len(moves), saved
+
     def __str__(self):
 
         column_labels = "\n----------------\na b c d e f g h\n"
@@ -0,0 +1,132 @@
+"""
+Description: Michniewski evaluation kept up to date incrementally as moves are made and unmade during search
+"""
+
+import chess
+import PieceSquareTables as pst
+
+# material values from Tomasz Michniewski's Simplified Evaluation Function, indexed by piece type
+MATERIAL_VALUES = [0, 100, 320, 330, 500, 900, 20000]
+
+# piece square tables indexed by [color][piece type]; kings are handled separately (middle-game vs end-game)
+POSITION_TABLES = [
+    [None, pst.pawn_values_black, pst.knight_values_black, pst.bishop_values_black,
+     pst.rook_values_black, pst.queen_values_black],
+    [None, pst.pawn_values_white, pst.knight_values_white, pst.bishop_values_white,
+     pst.rook_values_white, pst.queen_values_white]
+]
+KING_MIDDLEGAME_TABLES = [pst.king_values_black_middlegame, pst.king_values_white_middlegame]
+KING_ENDGAME_TABLES = [pst.king_values_black_endgame, pst.king_values_white_endgame]
+
+
+class IncrementalEvaluator:
+    def __init__(self):
+        # every list is indexed by color (0 is black, 1 is white)
+        self.material = [0, 0]
+        self.position = [0, 0]  # piece square total of all pieces except the king
+        self.king_square = [None, None]
+        self.queens = [0, 0]
+        self.minor_pieces = [0, 0]  # every piece that isn't a queen or king, as counted by the end-game test
+        self.history = []  # saved state for each pushed move
+
+    # recomputes every total from scratch; called once at the root of each search
+    def reset(self, board):
+        self.material = [0, 0]
+        self.position = [0, 0]
+        self.king_square = [None, None]
+        self.queens = [0, 0]
+        self.minor_pieces = [0, 0]
+        self.history = []
+
+        for square in range(0, 64):
+            piece = board.piece_at(square)
+            if piece is not None:
+                self.add_piece(piece.piece_type, int(piece.color), square)
+
+    def add_piece(self, piece_type, color, square):
+        self.material[color] += MATERIAL_VALUES[piece_type]
+        if piece_type == chess.KING:
+            self.king_square[color] = square
+            return
+        self.position[color] += POSITION_TABLES[color][piece_type][square]
+        if piece_type == chess.QUEEN:
+            self.queens[color] += 1
+        else:
+            self.minor_pieces[color] += 1
+
+    def remove_piece(self, piece_type, color, square):
+        self.material[color] -= MATERIAL_VALUES[piece_type]
+        if piece_type == chess.KING:
+            self.king_square[color] = None
+            return
+        self.position[color] -= POSITION_TABLES[color][piece_type][square]
+        if piece_type == chess.QUEEN:
+            self.queens[color] -= 1
+        else:
+            self.minor_pieces[color] -= 1
+
+    # updates the totals for move; must be called before the move is pushed onto board
+    def push(self, board, move):
+        self.history.append((self.material[:], self.position[:], self.king_square[:],
+                             self.queens[:], self.minor_pieces[:]))
+
+        color = int(board.turn)
+        from_square = move.from_square
+        to_square = move.to_square
+        piece_type = board.piece_type_at(from_square)
+
+        if piece_type == chess.KING and board.is_castling(move):
+            rank = chess.square_rank(from_square)
+            if board.is_kingside_castling(move):
+                king_to, rook_from, rook_to = chess.square(6, rank), chess.square(7, rank), chess.square(5, rank)
+            else:
+                king_to, rook_from, rook_to = chess.square(2, rank), chess.square(0, rank), chess.square(3, rank)
+            self.remove_piece(chess.KING, color, from_square)
+            self.add_piece(chess.KING, color, king_to)
+            self.remove_piece(chess.ROOK, color, rook_from)
+            self.add_piece(chess.ROOK, color, rook_to)
+            return
+
+        if board.is_en_passant(move):
+            captured_square = chess.square(chess.square_file(to_square), chess.square_rank(from_square))
+            self.remove_piece(chess.PAWN, 1 - color, captured_square)
+        else:
+            captured_type = board.piece_type_at(to_square)
+            if captured_type is not None:
+                self.remove_piece(captured_type, 1 - color, to_square)
+
+        self.remove_piece(piece_type, color, from_square)
+        self.add_piece(move.promotion or piece_type, color, to_square)
+
+    # null move: nothing changes, but the matching pop still needs a saved state
+    def push_null(self):
+        self.history.append((self.material[:], self.position[:], self.king_square[:],
+                             self.queens[:], self.minor_pieces[:]))
+
+    # restores the totals saved by the matching push
+    def pop(self):
+        self.material, self.position, self.king_square, self.queens, self.minor_pieces = self.history.pop()
+
+    # same king end-game test as AlphaBetaAI.michniewski_player_position_score
+    def king_endgame(self):
+        white_queen = self.queens[1] > 0
+        black_queen = self.queens[0] > 0
+        if not white_queen and not black_queen:
+            return True
+        if white_queen and not black_queen and self.minor_pieces[1] <= 1:
+            return True
+        if not white_queen and black_queen and self.minor_pieces[0] <= 1:
+            return True
+        return self.minor_pieces[1] <= 1 and self.minor_pieces[0] <= 1
+
+    # material plus position score from color's point of view
+    def score(self, color):
+        color = int(color)
+        king_tables = KING_ENDGAME_TABLES if self.king_endgame() else KING_MIDDLEGAME_TABLES
+
+        position = [self.position[0], self.position[1]]
+        for side in (0, 1):
+            if self.king_square[side] is not None:
+                position[side] += king_tables[side][self.king_square[side]]
+
+        return (self.material[color] - self.material[1 - color]) + (position[color] - position[1 - color])
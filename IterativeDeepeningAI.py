@@ -6,27 +6,236 @@ Description: Iterative Deepening AI using AlphaBeta AI
 
 import chess
 import math
-from AlphaBetaAI import AlphaBetaAI
+import threading
+import time
+from AlphaBetaAI import AlphaBetaAI, SearchAborted, INFINITE_SCORE, MATE_BOUND
+from OpeningBook import book_move_stats
+from SearchStats import IterationStats, SearchStats, default_observers
+from Tablebase import tablebase_move_stats
+from TranspositionTable import zobrist_key
+
+MOVES_TO_GO = 30  # number of moves the remaining clock is assumed to be spread over
 
 
 class IterativeDeepeningAI:
-    def __init__(self, max_depth, color, simple):
+    def __init__(self, max_depth, color, simple, time_limit=None, clock=None, increment=0, observers=None,
+                 time_evaluations=False, ponder=False, node_limit=None, pvs=False, aspiration_window=None,
+                 book=None, syzygy_path=None, table_path=None, profile=False, trace_path=None):
         self.max_depth = max_depth
         self.color = color  # color of the player
-        self.AI = AlphaBetaAI(max_depth, self.color, simple)
+        # the inner AI reports nothing itself; its statistics are collected per iteration below
+        self.AI = AlphaBetaAI(max_depth, self.color, simple, observers=[], time_evaluations=time_evaluations, pvs=pvs,
+                              syzygy_path=syzygy_path, table_path=table_path, trace_path=trace_path)
         self.best_move = None
+        self.time_limit = time_limit  # fixed seconds per move (None for no per-move limit)
+        self.clock = clock  # seconds left on this player's game clock (None for no clock)
+        self.increment = increment  # seconds added to the clock after every move
+        self.node_limit = node_limit  # min/max calls this move may take (None for no limit)
+        # half width of the window around the previous iteration's score that each iteration is first searched with
+        # (None searches every iteration with the full window)
+        self.aspiration_window = aspiration_window
+        # told about every iteration and chosen move (see SearchStats.py); None prints the usual progress lines
+        self.observers = default_observers(observers)
+        self.stats = None  # SearchStats of the last choose_move call
+        self.book = book  # OpeningBook probed before searching (None always searches)
+        # samples every choose_move call and writes its call stacks to profiles/ (see SearchProfiler.py); without the
+        # flag choose_move isn't wrapped at all
+        self.profiler = None
+        if profile:
+            from SearchProfiler import SearchProfiler
+            self.profiler = SearchProfiler("iterative_deepening_" + ("white" if color else "black"))
+            self.choose_move = self.profiler.wrap(self.choose_move)
+        # with ponder set, the predicted reply is searched in a background thread while the opponent thinks
+        self.ponder = ponder
+        self.ponder_thread = None
+        self.ponder_move = None  # predicted reply being pondered
+        self.ponder_key = None  # zobrist key of the position being pondered
+        # (depth, move, principal variation, scores of every iteration) of the deepest finished ponder iteration
+        self.ponder_result = None
+
+    # seconds this move may take, or None when searching without a time limit
+    def time_budget(self):
+        budget = self.time_limit
+        if self.clock is not None:
+            clock_budget = self.clock / MOVES_TO_GO + 0.8 * self.increment
+            clock_budget = min(clock_budget, 0.5 * self.clock)  # never risk more than half the clock on one move
+            budget = clock_budget if budget is None else min(budget, clock_budget)
+        return budget
 
     def choose_move(self, board):
-        best_move_list = []
+        start = time.perf_counter()
+        self.stop_pondering()
+        move = self.book.probe(board) if self.book is not None else None
+        if move is not None:
+            self.stats = book_move_stats("iterative_deepening", move, time.perf_counter() - start)
+        else:
+            move = self.AI.tablebase_root_move(board)
+            if move is not None:
+                self.stats = tablebase_move_stats("iterative_deepening", move, time.perf_counter() - start)
+        if move is not None:  # no search needed
+            if self.clock is not None:
+                self.clock += self.increment - self.stats.seconds
+            for observer in self.observers:
+                observer.on_move(self.stats)
+            return move
+        self.AI.stop_requested = False
+        budget = self.time_budget()
+        best_move = None
+        values = []  # scores of the completed iterations
+        completed_depth = 0
+        self.AI.pv = []
+        stats = SearchStats("iterative_deepening", 0)
+
+        # ponder hit: the iterations the ponder search finished don't need to be repeated
+        if self.ponder_result is not None and zobrist_key(board) == self.ponder_key:
+            completed_depth, best_move, self.AI.pv, values = self.ponder_result
+            stats.ponder_depth = completed_depth
+            self.best_move = best_move
+        self.ponder_result = None
+        # answered when a stop comes before the first iteration completes, so a stopped search always has a legal move
+        fallback_move = self.fallback_move(board) if best_move is None else None
+        self.AI.reset_counters()
+
+        for depth in range(completed_depth + 1, max(self.max_depth, 1) + 1):
+            # the first iteration always completes so there is a move to return
+            if budget is not None and best_move is not None:
+                elapsed = time.perf_counter() - start
+                if elapsed > 0.5 * budget:
+                    break  # the next iteration would most likely not finish in time
+                self.AI.deadline = start + budget
+            if self.node_limit is not None and best_move is not None:
+                if self.AI.min_max_calls >= self.node_limit:
+                    break
+                self.AI.max_nodes = self.node_limit
 
-        for depth in range(0, self.max_depth + 1):
-            # AI = AlphaBetaAI(depth, self.color)
             self.AI.depth = depth
-            move = self.AI.minimax_decision(board)
+            iteration_start = time.perf_counter()
+            iteration_nodes = self.AI.min_max_calls
+            try:
+                move = self.search_iteration(board, values, stats)
+            except SearchAborted:
+                stats.aborted_depth = depth
+                for observer in self.observers:
+                    observer.on_abort(stats, depth, time.perf_counter() - start)
+                break
+            finally:
+                self.AI.deadline = None
+                self.AI.max_nodes = None
+                stats.add_cutoffs(self.AI.orderer)  # the orderer's counters only cover the latest iteration
+
             self.best_move = move   # update move in case it needs to be returned by a time
-            best_move_list.append(move)
-            print("Depth: " + str(depth) + " | Move: " + str(move) + " | recommended by Iterative Deepening AI (using "
-                                                                     "Alpha Beta)")
+            best_move = move
+            values.append(self.AI.best_value)
+            completed_depth = depth
+            self.update_pv(board, depth, move)
+            iteration = IterationStats(depth, move, self.AI.best_value, self.AI.min_max_calls - iteration_nodes,
+                                       time.perf_counter() - iteration_start)
+            stats.iterations.append(iteration)
+            for observer in self.observers:
+                observer.on_iteration(stats, iteration)
+
+        if best_move is None:
+            best_move = fallback_move
+            self.best_move = best_move
+        elapsed = time.perf_counter() - start
+        if self.clock is not None:
+            self.clock += self.increment - elapsed
+
+        stats.depth = completed_depth
+        self.AI.record_stats(stats, best_move, elapsed)
+        self.stats = stats
+        for observer in self.observers:
+            observer.on_move(stats)
+
+        if self.ponder:
+            self.start_pondering(board, best_move)
+        return best_move  # the last move recommended
+
+    # the transposition table's move for board, or else the first legal move in search order (None without legal moves)
+    def fallback_move(self, board):
+        moves = list(board.legal_moves)
+        if not moves:
+            return None
+        entry = self.AI.table.probe(zobrist_key(board)) if self.AI.table is not None else None
+        return self.AI.orderer.order(board, moves, 0, entry[4] if entry is not None else None)[0]
+
+    # searches one iteration after the iterations that scored values; with an aspiration window it is first searched
+    # in a narrow window around the previous iteration's score, which is widened on the failing side until the score
+    # falls inside it. The window is only used once the last two scores are within it of each other: the scores of
+    # the first iterations swing too much, and every failed window costs a re-search
+    def search_iteration(self, board, values, stats=None):
+        if self.aspiration_window is None or len(values) < 2 or self.AI.workers > 1:
+            return self.AI.minimax_decision(board)
+        previous_value = values[-1]
+        if abs(previous_value) >= MATE_BOUND or abs(previous_value - values[-2]) > self.aspiration_window:
+            return self.AI.minimax_decision(board)
+
+        below = above = self.aspiration_window
+        while True:
+            alpha = max(previous_value - below, -INFINITE_SCORE)
+            beta = min(previous_value + above, INFINITE_SCORE)
+            move = self.AI.minimax_decision(board, alpha, beta)
+            value = self.AI.best_value
+            if value <= alpha and alpha > -INFINITE_SCORE:
+                below *= 4  # failed low: the score is at most alpha
+            elif value >= beta and beta < INFINITE_SCORE:
+                above *= 4  # failed high: the score is at least beta
+            else:
+                return move
+            if stats is not None:
+                stats.aspiration_failures += 1
+
+    # the next iteration searches this iteration's best line first
+    def update_pv(self, board, depth, move):
+        self.AI.pv = self.AI.principal_variation(board, depth)
+        if not self.AI.pv or self.AI.pv[0] != move:
+            self.AI.pv = [move]
+
+    # starts searching the position after move and the reply predicted by the principal variation
+    def start_pondering(self, board, move):
+        self.ponder_move = None
+        if len(self.AI.pv) < 2:
+            return  # no predicted reply
+        ponder_board = board.copy()
+        ponder_board.push(move)
+        ponder_board.push(self.AI.pv[1])
+        if ponder_board.is_game_over():
+            return
+        self.ponder_move = self.AI.pv[1]
+        self.ponder_key = zobrist_key(ponder_board)
+        self.ponder_thread = threading.Thread(target=self.ponder_search, args=(ponder_board, self.AI.pv[2:]),
+                                              daemon=True)
+        self.ponder_thread.start()
+
+    # iterative deepening without a time limit on the pondered position, until stopped or at max depth
+    # fills the transposition table and move ordering tables the next search will use
+    def ponder_search(self, board, pv):
+        self.AI.pv = pv
+        values = []
+        for depth in range(1, max(self.max_depth, 1) + 1):
+            self.AI.depth = depth
+            try:
+                move = self.search_iteration(board, values)
+            except SearchAborted:
+                return
+            values.append(self.AI.best_value)
+            self.update_pv(board, depth, move)
+            self.ponder_result = (depth, move, self.AI.pv, list(values))
+
+    # asks the running search to stop (from another thread); choose_move returns the best move found so far
+    def stop(self):
+        self.AI.stop_requested = True
+
+    # stops pondering and closes the inner AI's worker processes, trace file and table file
+    def close(self):
+        self.stop_pondering()
+        self.AI.close()
 
-        print("\nIterative Deepening AI (using Alpha Beta) recommending move " + str(best_move_list[len(best_move_list) - 1]))
-        return best_move_list[len(best_move_list) - 1]  # the last move recommended
+    # stops a running ponder search; its deepest finished iteration is kept in ponder_result
+    def stop_pondering(self):
+        if self.ponder_thread is None:
+            return
+        self.AI.stop_requested = True
+        self.ponder_thread.join()
+        self.AI.stop_requested = False
+        self.ponder_thread = None
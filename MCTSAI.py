@@ -0,0 +1,246 @@
+"""
+Description: Monte Carlo tree search AI; grows a UCT tree kept in flat arrays and scores its leaves with random
+playouts, run in batches by a pool of worker processes
+"""
+
+import math
+import multiprocessing
+import random
+import time
+from array import array
+
+import chess
+from RandomAI import random_move
+from SearchBoard import SearchBoard, MOVES
+from SearchStats import SearchStats, default_observers
+
+PLAYOUT_PLIES = 6  # playouts still running after this many plies are scored by material (longer ones are noise)
+MATERIAL_SCALE = 300  # material advantage (centipawns) at which a stopped playout scores about 0.9
+PIECE_VALUES = [0, 100, 320, 330, 500, 900, 0]  # indexed by piece type
+
+# state of a playout worker: the root position of the last task, so it is only parsed once per search
+root_fen = None
+root_board = None
+
+
+# the result of a finished game for White (1 win, 0.5 draw, 0 loss), or None while it goes on
+def game_result(board, has_moves):
+    if not has_moves:
+        if board.is_check():
+            return 0.0 if board.turn == chess.WHITE else 1.0
+        return 0.5
+    if board.halfmove_clock >= 100 or board.is_insufficient_material():
+        return 0.5
+    return None
+
+
+# expected result for White of a playout stopped early, from the material balance
+def material_result(board):
+    balance = 0
+    for piece_type in range(chess.PAWN, chess.KING):
+        pieces = board.masks[piece_type]
+        balance += PIECE_VALUES[piece_type] * (chess.popcount(pieces & board.occupied_co[chess.WHITE]) -
+                                               chess.popcount(pieces & board.occupied_co[chess.BLACK]))
+    return 1 / (1 + 10 ** (-balance / MATERIAL_SCALE))
+
+
+# plays random moves from board until the game ends or PLAYOUT_PLIES pass; returns the result for White and leaves
+# board as it was
+def playout(board, guided, rng):
+    pushed = 0
+    result = None
+    while result is None:
+        moves = board.legal_moves
+        result = game_result(board, len(moves) > 0)
+        if result is None:
+            if pushed == PLAYOUT_PLIES:
+                result = material_result(board)
+                break
+            board.push(random_move(board, moves, guided, rng))
+            pushed += 1
+    for _ in range(pushed):
+        board.pop()
+    return result
+
+
+# runs the playouts of one leaf (in a worker process, or in the searching process without workers)
+# task is (root FEN, move codes from the root to the leaf, playouts, guided, seed); returns the summed results
+def playout_task(task):
+    global root_fen, root_board
+    fen, codes, count, guided, seed = task
+    if fen != root_fen:
+        root_fen = fen
+        root_board = SearchBoard.from_board(chess.Board(fen))
+    board = root_board
+    for code in codes:
+        board.push(MOVES[code])
+    rng = random.Random(seed)
+    total = sum(playout(board, guided, rng) for _ in range(count))
+    for _ in codes:
+        board.pop()
+    return total
+
+
+class MCTSAI:
+    def __init__(self, color, playouts=1000, time_limit=None, workers=1, batch_size=None, playouts_per_leaf=1,
+                 exploration=0.3, guided=True, observers=None):
+        self.color = color  # color of the player
+        self.playouts = playouts  # playouts per move (None for no limit, then time_limit has to be set)
+        self.time_limit = time_limit  # seconds per move (None for no limit)
+        # playouts run in a pool of worker processes when workers > 1; every batch selects batch_size leaves first
+        self.workers = workers
+        self.batch_size = batch_size or 8 * workers
+        self.playouts_per_leaf = playouts_per_leaf
+        self.exploration = exploration  # UCT exploration constant
+        self.guided = guided  # playouts prefer captures that don't lose material (see RandomAI.random_move)
+        self.pool = None
+        self.stop_requested = False  # set from another thread to end the search early
+        self.rng = random.Random()
+        # told about every chosen move (see SearchStats.py); None prints the usual progress lines
+        self.observers = default_observers(observers)
+        self.stats = None  # SearchStats of the last choose_move call
+        self.new_tree()
+
+    # empties the tree; node 0 is the root. Children of a node are stored next to each other, so a node only keeps the
+    # index of its first child and its number of children (-1 while not expanded)
+    def new_tree(self):
+        self.parent = array("i", [-1])
+        self.first_child = array("i", [0])
+        self.child_count = array("i", [-1])
+        self.move_code = array("H", [0])  # move leading to the node, as a SearchBoard move code
+        self.visits = array("i", [0])
+        self.wins = array("d", [0.0])  # summed results for the side that made the node's move
+
+    def choose_move(self, board):
+        start = time.perf_counter()
+        self.stop_requested = False
+        self.new_tree()
+        root = SearchBoard.from_board(board)
+        fen = board.fen()
+        if self.workers > 1 and self.pool is None:
+            self.pool = multiprocessing.Pool(self.workers)
+
+        deadline = start + self.time_limit if self.time_limit is not None else None
+        done = 0
+        max_depth = 0
+        while not self.stop_requested and (self.playouts is None or done < self.playouts):
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            batch = self.batch_size if self.playouts is None else min(self.batch_size, self.playouts - done)
+            paths = []
+            tasks = []
+            results = []
+            for _ in range(batch):
+                path, result = self.select(root)
+                max_depth = max(max_depth, len(path) - 1)
+                paths.append(path)
+                results.append(result)
+                if result is None:
+                    codes = [self.move_code[node] for node in path[1:]]
+                    tasks.append((fen, codes, self.playouts_per_leaf, self.guided, self.rng.getrandbits(64)))
+
+            played = iter(self.pool.map(playout_task, tasks) if self.pool is not None else map(playout_task, tasks))
+            for path, result in zip(paths, results):
+                if result is None:
+                    self.backpropagate(path, next(played), self.playouts_per_leaf, board.turn)
+                else:  # finished game, no playout needed
+                    self.backpropagate(path, result * self.playouts_per_leaf, self.playouts_per_leaf, board.turn)
+            done += batch
+
+        best = self.best_root_child()
+        move = MOVES[self.move_code[best]] if best is not None else None
+        self.stats = SearchStats("mcts", max_depth)
+        self.stats.move = move
+        self.stats.nodes = len(self.visits)
+        self.stats.playouts = done * self.playouts_per_leaf
+        if best is not None and self.visits[best]:
+            self.stats.value = self.wins[best] / self.visits[best]
+        self.stats.seconds = time.perf_counter() - start
+        for observer in self.observers:
+            observer.on_move(self.stats)
+        return move
+
+    # walks down the tree from the root by UCT and expands the leaf it reaches; returns the path of node indices and
+    # the leaf's result for White when its game is over (None when it needs a playout)
+    # every node on the path counts as visited right away, so the other selections of a batch spread out
+    def select(self, board):
+        node = 0
+        path = [0]
+        while self.child_count[node] > 0:
+            node = self.best_child(node)
+            board.push(MOVES[self.move_code[node]])
+            path.append(node)
+
+        moves = board.legal_moves
+        result = game_result(board, len(moves) > 0)
+        if result is None and self.child_count[node] < 0 and (self.visits[node] > 0 or node == 0):
+            self.expand(node, moves)
+            node = self.first_child[node]
+            board.push(MOVES[self.move_code[node]])
+            path.append(node)
+            result = game_result(board, any(board.generate_legal_moves()))
+        elif result is not None:
+            self.child_count[node] = 0
+
+        for node in path:
+            self.visits[node] += 1
+        for _ in path[1:]:
+            board.pop()
+        return path, result
+
+    # the child of node with the highest UCT score (an unvisited child first)
+    def best_child(self, node):
+        first = self.first_child[node]
+        log_visits = math.log(self.visits[node])
+        visits = self.visits
+        wins = self.wins
+        best = first
+        best_score = -1.0
+        for child in range(first, first + self.child_count[node]):
+            child_visits = visits[child]
+            if child_visits == 0:
+                return child
+            score = wins[child] / child_visits + self.exploration * math.sqrt(log_visits / child_visits)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+    # adds a child for every move
+    def expand(self, node, moves):
+        self.first_child[node] = len(self.visits)
+        self.child_count[node] = len(moves)
+        for move in moves:
+            self.parent.append(node)
+            self.first_child.append(0)
+            self.child_count.append(-1)
+            self.move_code.append(move.from_square | move.to_square << 6 | (move.promotion or 0) << 12)
+            self.visits.append(0)
+            self.wins.append(0.0)
+
+    # adds the summed result for White of count playouts to every node of path (the visits were counted by select)
+    def backpropagate(self, path, total, count, root_turn):
+        white_moved = root_turn == chess.WHITE  # side that made the move into the first node below the root
+        for node in path[1:]:
+            self.wins[node] += total if white_moved else count - total
+            white_moved = not white_moved
+        if count > 1:
+            for node in path:
+                self.visits[node] += count - 1
+
+    # the most visited move at the root
+    def best_root_child(self):
+        count = self.child_count[0]
+        if count <= 0:
+            return None
+        first = self.first_child[0]
+        return max(range(first, first + count), key=lambda child: self.visits[child])
+
+    # asks the running search to stop (from another thread); choose_move returns the best move so far
+    def stop(self):
+        self.stop_requested = True
+
+    # shuts down the worker processes
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
@@ -6,79 +6,151 @@ Description: Minimax AI
 
 import chess
 import math
+import time
+from AlphaBetaAI import SearchAborted
+from OpeningBook import book_move_stats
+from PositionHistory import PositionHistory
+from SearchBoard import SearchBoard
+from SearchStats import SearchStats, default_observers
 
 
 class MinimaxAI:
-    def __init__(self, depth, color):
+    def __init__(self, depth, color, compact_board=True, observers=None, book=None, profile=False):
         self.depth = depth   # decremented until reaches depth limit of 0
         self.color = color   # color of the player (true is white, false is black)
         self.opponent_color = not color
         self.min_max_calls = 0   # keeps track of calls to min and max each iteration
+        self.leaf_evals = 0   # calls to utility
+        self.history = PositionHistory()  # zobrist keys of the game and search path, for repetition detection
+        self.compact_board = compact_board  # search a SearchBoard copy instead of the chess.Board itself
+        self.stop_requested = False  # set from another thread to abort the search
+        # told about every chosen move (see SearchStats.py); None prints the usual progress lines
+        self.observers = default_observers(observers)
+        self.stats = None  # SearchStats of the last choose_move call
+        self.book = book  # OpeningBook probed before searching (None always searches)
+        # samples every choose_move call and writes its call stacks to profiles/ (see SearchProfiler.py); without the
+        # flag choose_move isn't wrapped at all
+        self.profiler = None
+        if profile:
+            from SearchProfiler import SearchProfiler
+            self.profiler = SearchProfiler("minimax_" + ("white" if color else "black"))
+            self.choose_move = self.profiler.wrap(self.choose_move)
 
     # goes through options at given depth and returns best move
     def choose_move(self, board):
         self.min_max_calls = 0  # resetting min/max calls before move decision process
+        self.leaf_evals = 0
+        self.stop_requested = False
+        start = time.perf_counter()
+        move = self.book.probe(board) if self.book is not None else None
+        if move is not None:
+            self.stats = book_move_stats("minimax", move, time.perf_counter() - start)
+            for observer in self.observers:
+                observer.on_move(self.stats)
+            return move
         move = self.minimax_decision(board)
-        print("Minimax AI recommending move " + str(move) + " | depth = " + str(self.depth) +
-              " | min/max calls = " + str(self.min_max_calls))
+
+        self.stats = SearchStats("minimax", self.depth)
+        self.stats.move = move
+        self.stats.nodes = self.min_max_calls
+        self.stats.leaf_evals = self.leaf_evals
+        self.stats.heuristic_calls = self.leaf_evals  # every leaf is scored with the simple heuristic
+        self.stats.seconds = time.perf_counter() - start
+        for observer in self.observers:
+            observer.on_move(self.stats)
         return move
 
-    # checks if the game is over or depth is over
-    def cutoff_test(self, board):
-        if self.depth == 0 or board.is_game_over():   # if at depth limit or no legal moves
-            return True
-        return False
+    # checks if the game is over; moves is the node's legal move list, generated once per node
+    def cutoff_test(self, board, moves):
+        return self.history.is_game_over(board, moves)
+
+    # makes a search move and records the new position for repetition detection
+    def push_move(self, board, move):
+        # also pushes the move onto board; leaves (depth 1 before the move) never check repetition, so skip their key
+        self.history.push(board, move, self.depth > 1)
+
+    def pop_move(self, board):
+        board.pop()
+        self.history.pop()
+
+    # asks the running search to stop (from another thread); choose_move raises SearchAborted
+    def stop(self):
+        self.stop_requested = True
 
     # take the min value of each move and return the highest scoring move
     def minimax_decision(self, board):
         max_move = None
         max_move_value = -math.inf
+        if self.compact_board:
+            board = SearchBoard.from_board(board)
+        self.history.reset(board)
+        depth = self.depth
+        stack_size = len(board.move_stack)
 
         for move in board.legal_moves:
-            board.push(move)
+            self.push_move(board, move)
             self.depth -= 1  # decrement depth
-            min_move_value = self.min_value(board)
+            try:
+                min_move_value = self.min_value(board)
+            except SearchAborted:
+                # unwind the moves the aborted search left on the board
+                while len(board.move_stack) > stack_size:
+                    board.pop()
+                self.depth = depth
+                raise
             # check if the min value of the current move is better than min value of the best (max) move so far
             if min_move_value > max_move_value:  # if so, update move and value
                 max_move = move
                 max_move_value = min_move_value
             self.depth += 1  # move explored, increment depth back and pop move
-            board.pop()
+            self.pop_move(board)
 
         return max_move
 
     # try to maximize the value of a board
     def max_value(self, board):
         self.min_max_calls += 1  # increment min/max call tracking variable
+        if self.min_max_calls & 255 == 0 and self.stop_requested:
+            raise SearchAborted()
+
+        if self.depth == 0:  # depth limit reached
+            return self.utility(board)
 
-        if self.cutoff_test(board):  # game over or depth limit reached
+        moves = list(board.legal_moves)  # the only move generation for this node
+        if self.cutoff_test(board, moves):  # game over
             return self.utility(board)
 
         v = -math.inf
         # loop through board moves and calculate value
-        for move in board.legal_moves:
-            board.push(move)
+        for move in moves:
+            self.push_move(board, move)
             self.depth -= 1
             v = max(v, self.min_value(board))   # max value is the max of current max and the min value of new board
             self.depth += 1
-            board.pop()
+            self.pop_move(board)
         return v
 
     # try to minimize the value of a board
     def min_value(self, board):
         self.min_max_calls += 1  # increment min/max call tracking variable
+        if self.min_max_calls & 255 == 0 and self.stop_requested:
+            raise SearchAborted()
 
-        if self.cutoff_test(board):  # game over or depth limit reached
+        if self.depth == 0:  # depth limit reached
+            return self.utility(board)
+
+        moves = list(board.legal_moves)  # the only move generation for this node
+        if self.cutoff_test(board, moves):  # game over
             return self.utility(board)
 
         v = math.inf
         # loop through board moves and calculate value
-        for move in board.legal_moves:
-            board.push(move)
+        for move in moves:
+            self.push_move(board, move)
             self.depth -= 1
             v = min(v, self.max_value(board))  # min value is the min of current min and the max value of new board
             self.depth += 1
-            board.pop()
+            self.pop_move(board)
         return v
 
     def calculate_player_score(self, board, color):
@@ -92,6 +164,7 @@ class MinimaxAI:
 
     # a simple heuristic function as explained in the textbook
     def utility(self, board):
+        self.leaf_evals += 1
         player_score = self.calculate_player_score(board, self.color)               # value of player's pieces
         opponent_score = self.calculate_player_score(board, self.opponent_color)    # value of opponent's pieces
         return player_score - opponent_score
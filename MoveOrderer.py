@@ -0,0 +1,124 @@
+"""
+Description: Move ordering without making moves (MVV-LVA captures, promotions, checks, killer moves, history heuristic)
+"""
+
+import chess
+
+# ordering score bands; a move's score is its band plus a tie-breaker within the band
+HASH_MOVE_SCORE = 1000000
+CAPTURE_SCORE = 100000  # captures and promotions, ranked by MVV-LVA / promoted piece
+KILLER_SCORES = [90000, 89000]  # first and second killer slot
+CHECK_SCORE = 80000
+HISTORY_LIMIT = 60000  # history scores are halved once one reaches this so quiet moves stay below checks
+
+MAX_PLY = 64
+
+
+# true if move attacks the enemy king from its destination square (discovered checks are not detected)
+def gives_direct_check(board, move, piece_type):
+    king = board.king(not board.turn)
+    if king is None:
+        return False
+    king_mask = chess.BB_SQUARES[king]
+    to_square = move.to_square
+    piece_type = move.promotion or piece_type
+
+    if piece_type == chess.PAWN:
+        return bool(chess.BB_PAWN_ATTACKS[board.turn][to_square] & king_mask)
+    if piece_type == chess.KNIGHT:
+        return bool(chess.BB_KNIGHT_ATTACKS[to_square] & king_mask)
+    if piece_type == chess.KING:
+        return False
+
+    occupied = (board.occupied & ~chess.BB_SQUARES[move.from_square]) | chess.BB_SQUARES[to_square]
+    attacks = 0
+    if piece_type != chess.ROOK:  # bishop or queen
+        attacks |= chess.BB_DIAG_ATTACKS[to_square][chess.BB_DIAG_MASKS[to_square] & occupied]
+    if piece_type != chess.BISHOP:  # rook or queen
+        attacks |= chess.BB_RANK_ATTACKS[to_square][chess.BB_RANK_MASKS[to_square] & occupied]
+        attacks |= chess.BB_FILE_ATTACKS[to_square][chess.BB_FILE_MASKS[to_square] & occupied]
+    return bool(attacks & king_mask)
+
+
+class MoveOrderer:
+    def __init__(self):
+        self.killers = [[None, None] for _ in range(MAX_PLY)]  # two quiet moves per ply that caused a cutoff
+        self.history = [0] * (2 * 64 * 64)  # indexed by color, from square and to square
+        # ordering quality statistics
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.cutoffs_by_ply = [0] * MAX_PLY
+        self.last_cutoff_index = -1  # index of the move of the last recorded cutoff, read and reset by search traces
+
+    # clears killers and statistics before a new search; history is aged rather than thrown away
+    def new_search(self):
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.history = [score // 2 for score in self.history]
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.cutoffs_by_ply = [0] * MAX_PLY
+        self.last_cutoff_index = -1
+
+    @staticmethod
+    def history_index(color, move):
+        return (int(color) * 64 + move.from_square) * 64 + move.to_square
+
+    # ordering score of a legal move for the side to move; higher scores are searched first
+    def score_move(self, board, move, ply, hash_move):
+        if move == hash_move:
+            return HASH_MOVE_SCORE
+
+        piece_type = board.piece_type_at(move.from_square)
+        victim_type = board.piece_type_at(move.to_square)
+        if victim_type is None and piece_type == chess.PAWN and move.to_square == board.ep_square:
+            victim_type = chess.PAWN  # en passant captures a pawn that isn't on the destination square
+
+        if victim_type is not None or move.promotion:
+            # most valuable victim first, least valuable attacker breaks ties
+            score = CAPTURE_SCORE + 10 * (victim_type or 0) - piece_type
+            if move.promotion:
+                score += 10 * move.promotion
+            return score
+
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if move == killers[0]:
+                return KILLER_SCORES[0]
+            if move == killers[1]:
+                return KILLER_SCORES[1]
+
+        if gives_direct_check(board, move, piece_type):
+            return CHECK_SCORE
+
+        return self.history[self.history_index(board.turn, move)]
+
+    # returns the legal moves of board sorted best first
+    def order(self, board, moves, ply, hash_move=None):
+        return sorted(moves, key=lambda move: self.score_move(board, move, ply, hash_move), reverse=True)
+
+    # records a beta cutoff caused by the index-th searched move at ply with depth plies left
+    def record_cutoff(self, board, move, ply, depth, index):
+        self.cutoffs += 1
+        self.last_cutoff_index = index
+        if index == 0:
+            self.first_move_cutoffs += 1
+        if ply < MAX_PLY:
+            self.cutoffs_by_ply[ply] += 1
+
+        if board.is_capture(move) or move.promotion:
+            return  # captures are already ordered well by MVV-LVA
+
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+
+        index = self.history_index(board.turn, move)
+        self.history[index] += depth * depth
+        if self.history[index] >= HISTORY_LIMIT:
+            self.history = [score // 2 for score in self.history]
+
+    # fraction of beta cutoffs produced by the first move searched
+    def first_move_cutoff_rate(self):
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
@@ -0,0 +1,45 @@
+"""
+Description: Polyglot opening book; known opening positions are answered with a weighted book move instead of a search
+"""
+
+import chess.polyglot
+from SearchStats import SearchStats
+
+
+class OpeningBook:
+    def __init__(self, path, random_choice=True):
+        # python-chess memory-maps the .bin file and binary searches its entries, which are sorted by Zobrist key,
+        # so a probe reads a few pages of the file instead of loading the whole book
+        self.reader = chess.polyglot.open_reader(path)
+        self.path = path
+        self.random_choice = random_choice  # pick moves at random by weight, otherwise always the heaviest move
+        self.hits = 0
+        self.misses = 0
+
+    # a legal book move for board, or None when the position is not in the book
+    def probe(self, board):
+        try:
+            entry = self.reader.weighted_choice(board) if self.random_choice else self.reader.find(board)
+        except IndexError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry.move
+
+    # fraction of probes that found a book move
+    @property
+    def hit_rate(self):
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.0
+
+    def close(self):
+        self.reader.close()
+
+
+# statistics of a move taken from the book by engine ("minimax", "alphabeta" or "iterative_deepening")
+def book_move_stats(engine, move, seconds):
+    stats = SearchStats(engine, 0)
+    stats.move = move
+    stats.book = True
+    stats.seconds = seconds
+    return stats
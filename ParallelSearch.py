@@ -0,0 +1,174 @@
+"""
+Description: Parallel Alpha Beta search that splits the root moves across a pool of worker processes
+"""
+
+import multiprocessing
+import sys
+import time
+
+import chess
+from AlphaBetaAI import AlphaBetaAI, SearchAborted, INFINITE_SCORE
+
+# state of a worker process, set up once by init_worker
+worker_ai = None
+shared_alpha = None  # best root score found so far by any worker
+shared_nodes = None  # min/max calls of the search so far: the main AI's plus those of every finished root move
+
+
+def init_worker(alpha, nodes, stop_event, depth, color, simple, options):
+    global worker_ai, shared_alpha, shared_nodes
+    shared_alpha = alpha
+    shared_nodes = nodes
+    worker_ai = AlphaBetaAI(depth, color, simple, **options)
+    worker_ai.stop_event = stop_event
+
+
+# searches the reply to one root move with the best root score so far as alpha; with a node limit (go nodes), the
+# move may use what the finished root moves left of it (moves searched at the same time may overshoot it together)
+# returns (index, value, min/max calls, heuristic calls, leaf evaluations); value is None when the search was aborted
+def search_root_move(task):
+    index, board, move, depth, deadline, max_nodes = task
+    worker_ai.depth = depth - 1
+    worker_ai.deadline = deadline
+    worker_ai.max_nodes = max_nodes - shared_nodes.value if max_nodes is not None else None
+    worker_ai.min_max_calls = 0
+    worker_ai.heuristic_calls = 0
+    worker_ai.leaf_evals = 0
+
+    board.push(move)
+    board = worker_ai.search_position(board)
+    worker_ai.start_search(board)
+    worker_ai.root_keys -= 1  # the real root is the position before move, one ply up
+    worker_ai.root_turn = not board.turn
+    worker_ai.pv_node = index == 0  # only the first root move continues the principal variation
+    try:
+        if worker_ai.pvs:
+            value = -worker_ai.negamax(board, -INFINITE_SCORE, -shared_alpha.value)[0]
+        else:
+            value, reply = worker_ai.min_value(board, shared_alpha.value, INFINITE_SCORE)
+    except SearchAborted:
+        value = None
+    with shared_nodes.get_lock():
+        shared_nodes.value += worker_ai.min_max_calls
+    return index, value, worker_ai.min_max_calls, worker_ai.heuristic_calls, worker_ai.leaf_evals
+
+
+class ParallelSearch:
+    def __init__(self, ai):
+        self.ai = ai
+        self.alpha = multiprocessing.Value("q", -INFINITE_SCORE)
+        self.nodes = multiprocessing.Value("q", 0)
+        self.stop_event = multiprocessing.Event()
+        self.pool = multiprocessing.Pool(ai.workers, initializer=init_worker,
+                                         initargs=(self.alpha, self.nodes, self.stop_event, ai.depth, ai.color,
+                                                   ai.simple, ai.options))
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+
+    # raises the shared alpha if value beats it
+    def update_alpha(self, value):
+        if value is None:
+            return
+        with self.alpha.get_lock():
+            if value > self.alpha.value:
+                self.alpha.value = value
+
+    # waits for the next finished root move, passing a stop request from the main AI on to the workers
+    def next_result(self, results):
+        while True:
+            if self.ai.stop_requested:
+                self.stop_event.set()
+            try:
+                return results.next(timeout=0.05)
+            except multiprocessing.TimeoutError:
+                continue
+
+    # same contract as AlphaBetaAI.minimax_decision
+    def minimax_decision(self, board):
+        ai = self.ai
+        ai.start_search(board)
+        # root ordering uses the main AI's tables and principal variation
+        moves = ai.order_moves(board, list(board.legal_moves), None, True)
+        if not moves:
+            return None  # game already over
+        ai.min_max_calls += 1  # the root node
+        self.alpha.value = -INFINITE_SCORE
+        self.nodes.value = ai.min_max_calls
+        self.stop_event.clear()
+
+        tasks = [(index, board, move, ai.depth, ai.deadline, ai.max_nodes) for index, move in enumerate(moves)]
+        values = [None] * len(moves)
+
+        # the first (most likely best) move is searched alone so the others start with a good alpha
+        results = [self.next_result(self.pool.imap_unordered(search_root_move, tasks[:1]))]
+        self.update_alpha(results[0][1])
+        remaining = self.pool.imap_unordered(search_root_move, tasks[1:])
+        for _ in tasks[1:]:
+            result = self.next_result(remaining)
+            self.update_alpha(result[1])
+            results.append(result)
+
+        aborted = False
+        for index, value, min_max_calls, heuristic_calls, leaf_evals in results:
+            ai.min_max_calls += min_max_calls
+            ai.heuristic_calls += heuristic_calls
+            ai.leaf_evals += leaf_evals
+            values[index] = value
+            aborted = aborted or value is None
+        if aborted:
+            raise SearchAborted()
+
+        # ties go to the earlier move in the search order, like the sequential search
+        best_index = max(range(len(moves)), key=lambda index: (values[index], -index))
+        ai.best_value = values[best_index]
+        return moves[best_index]
+
+
+# nodes per second of a parallel search over positions for each number of workers
+def measure_scaling(positions, depth, worker_counts):
+    rows = []
+    for workers in worker_counts:
+        nodes = 0
+        elapsed = 0.0
+        for fen in positions:
+            board = chess.Board(fen)
+            ai = AlphaBetaAI(depth, board.turn, False, workers=workers)
+            if workers > 1:
+                ai.parallel = ParallelSearch(ai)  # start the pool before timing
+            start = time.perf_counter()
+            ai.minimax_decision(board)
+            elapsed += time.perf_counter() - start
+            nodes += ai.min_max_calls
+            ai.close()
+        rows.append((workers, nodes, elapsed, nodes / elapsed))
+    return rows
+
+
+SCALING_POSITIONS = [
+    chess.STARTING_FEN,
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+]
+
+if __name__ == "__main__":
+    # usage: python3 ParallelSearch.py [depth] [max workers]
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else multiprocessing.cpu_count()
+
+    worker_counts = [1]
+    while worker_counts[-1] * 2 <= max_workers:
+        worker_counts.append(worker_counts[-1] * 2)
+    if worker_counts[-1] != max_workers:
+        worker_counts.append(max_workers)
+
+    base_nps = None
+    base_elapsed = None
+    print("workers | nodes | seconds | nodes/second | nps scaling | time speedup")
+    for workers, nodes, elapsed, nps in measure_scaling(SCALING_POSITIONS, depth, worker_counts):
+        base_nps = base_nps or nps
+        base_elapsed = base_elapsed or elapsed
+        print(str(workers) + " | " + str(nodes) + " | " + str(round(elapsed, 2)) + " | " + str(round(nps)) +
+              " | " + str(round(nps / base_nps, 2)) + "x | " + str(round(base_elapsed / elapsed, 2)) + "x")
@@ -0,0 +1,117 @@
+"""
+Description: Transposition table in a memory-mapped file, so search results survive between runs and are shared by
+every process that opens the same file
+"""
+
+import mmap
+import os
+import struct
+
+from SearchBoard import MOVES
+
+MAGIC = b"CHAITT01"
+HEADER = struct.Struct("<8sQII")  # magic, buckets, generation, evaluation tag
+ENTRY = struct.Struct("<QQ")  # key ^ data, data
+ENTRY_BYTES = ENTRY.size
+BUCKET_BYTES = 2 * ENTRY_BYTES  # every bucket holds two entries, like TranspositionTable
+SCORE_OFFSET = 1 << 23  # scores are kept as unsigned 24 bit numbers
+
+
+# packs one entry's fields into 64 bits: move code (16), depth (8), bound (8), generation (8), score (24)
+def pack_data(depth, score, bound, move, generation):
+    code = 0 if move is None else move.from_square | move.to_square << 6 | (move.promotion or 0) << 12
+    return code | min(depth, 255) << 16 | bound << 24 | generation << 32 | (score + SCORE_OFFSET) << 40
+
+
+class PersistentTable:
+    shared = True  # scores are stored from White's point of view so AIs of either color can use them
+
+    def __init__(self, path, size_mb=64, tag=0):
+        self.path = path
+        # tag tells apart evaluations whose scores can't be mixed (AlphaBetaAI uses 1 for the simple heuristic)
+        self.tag = tag
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0  # probes that found the bucket occupied by a different position
+
+        # the size only applies when the file is created; an existing file keeps its own
+        if not os.path.exists(path) or os.path.getsize(path) < HEADER.size:
+            buckets = max(1, int(size_mb * 1024 * 1024) // BUCKET_BYTES)
+            with open(path, "wb") as table_file:
+                table_file.write(HEADER.pack(MAGIC, buckets, 0, tag))
+                table_file.truncate(HEADER.size + buckets * BUCKET_BYTES)
+
+        self.file = open(path, "r+b")
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        magic, self.num_buckets, generation, file_tag = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or len(self.map) < HEADER.size + self.num_buckets * BUCKET_BYTES:
+            self.close()
+            raise ValueError(path + " is not a persistent transposition table")
+        if file_tag != tag:
+            self.close()
+            raise ValueError(path + " holds scores of a different evaluation (tag " + str(file_tag) + ")")
+
+        # every opening of the file starts a new generation; entries of older generations are replaced first
+        self.generation = (generation + 1) & 255
+        HEADER.pack_into(self.map, 0, MAGIC, self.num_buckets, self.generation, tag)
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def clear(self):
+        self.map[HEADER.size:] = bytes(len(self.map) - HEADER.size)
+        self.reset_stats()
+
+    # the (key, data) pair of the entry at offset; data is 0 for an empty slot, and the key doesn't match the position
+    # when two processes wrote the entry at once
+    def read(self, offset):
+        checked_key, data = ENTRY.unpack_from(self.map, offset)
+        return checked_key ^ data, data
+
+    # returns the (key, depth, score, bound, move) entry stored for key, or None
+    def probe(self, key):
+        offset = HEADER.size + (key % self.num_buckets) * BUCKET_BYTES
+        collided = False
+        for slot_offset in (offset, offset + ENTRY_BYTES):
+            entry_key, data = self.read(slot_offset)
+            if not data:
+                continue
+            if entry_key == key:
+                self.hits += 1
+                move = MOVES[data & 0xFFFF] if data & 0xFFFF else None
+                score = (data >> 40) - SCORE_OFFSET
+                return key, (data >> 16) & 255, score, (data >> 24) & 255, move
+            collided = True
+
+        if collided:
+            self.collisions += 1
+        self.misses += 1
+        return None
+
+    # stores a search result without locking: the key is saved XORed with the data, so an entry torn by a
+    # concurrent write no longer matches its key and reads as a miss; the depth-preferred slot is kept by deeper
+    # results of the current generation, everything else goes to always-replace
+    def store(self, key, depth, score, bound, move):
+        offset = HEADER.size + (key % self.num_buckets) * BUCKET_BYTES
+        data = pack_data(depth, score, bound, move, self.generation)
+
+        current_key, current = self.read(offset)
+        if not current or current_key == key or (current >> 32) & 255 != self.generation or \
+                depth >= (current >> 16) & 255:
+            ENTRY.pack_into(self.map, offset, key ^ data, data)
+        else:
+            ENTRY.pack_into(self.map, offset + ENTRY_BYTES, key ^ data, data)
+
+    # fraction of probes that found a matching entry
+    def hit_rate(self):
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.0
+
+    # writes the table back to the file and closes it
+    def close(self):
+        if not self.map.closed:
+            self.map.flush()
+            self.map.close()
+        self.file.close()
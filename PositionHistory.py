@@ -0,0 +1,132 @@
+"""
+Description: Zobrist key history used by the search for cheap repetition and game-over detection
+"""
+
+import chess
+import chess.polyglot
+from TranspositionTable import zobrist_key
+
+ZOBRIST = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+TURN_KEY = ZOBRIST[780]
+
+
+# Polyglot key of one piece on one square
+def piece_key(piece_type, color, square):
+    return ZOBRIST[64 * ((piece_type - 1) * 2 + int(color)) + square]
+
+
+# Polyglot castling part of the key of board
+def castling_key(board):
+    rights = board.clean_castling_rights()
+    key = 0
+    if rights & chess.BB_H1:
+        key ^= ZOBRIST[768]
+    if rights & chess.BB_A1:
+        key ^= ZOBRIST[769]
+    if rights & chess.BB_H8:
+        key ^= ZOBRIST[770]
+    if rights & chess.BB_A8:
+        key ^= ZOBRIST[771]
+    return key
+
+
+# Polyglot en passant part of the key of board (only counted when a pawn could capture)
+def en_passant_key(board):
+    if not board.ep_square:
+        return 0
+    if board.turn == chess.WHITE:
+        ep_mask = chess.shift_down(chess.BB_SQUARES[board.ep_square])
+    else:
+        ep_mask = chess.shift_up(chess.BB_SQUARES[board.ep_square])
+    ep_mask = chess.shift_left(ep_mask) | chess.shift_right(ep_mask)
+    if ep_mask & board.pawns & board.occupied_co[board.turn]:
+        return ZOBRIST[772 + chess.square_file(board.ep_square)]
+    return 0
+
+
+class PositionHistory:
+    def __init__(self):
+        self.keys = []  # key of every position since the last capture or pawn move, current position last
+
+    # rebuilds the history from the moves already played on board; called once at the root of each search
+    def reset(self, board):
+        board = board.copy()
+        keys = [zobrist_key(board)]
+        # positions before the last capture or pawn move can't repeat, so only look back that far
+        for _ in range(min(board.halfmove_clock, len(board.move_stack))):
+            board.pop()
+            keys.append(zobrist_key(board))
+        keys.reverse()
+        self.keys = keys
+
+    # pushes move onto board and records the new position's key, updated from the previous key
+    # instead of rehashing every piece; with record False only a placeholder is kept (for leaves that need no key)
+    def push(self, board, move, record=True):
+        if not record:
+            board.push(move)
+            self.keys.append(None)
+            return
+
+        key = self.keys[-1] ^ TURN_KEY ^ en_passant_key(board)
+        turn = board.turn
+        from_square = move.from_square
+        to_square = move.to_square
+        piece_type = board.piece_type_at(from_square)
+
+        if piece_type == chess.KING and board.is_castling(move):
+            rank = chess.square_rank(from_square)
+            if board.is_kingside_castling(move):
+                king_to, rook_from, rook_to = chess.square(6, rank), chess.square(7, rank), chess.square(5, rank)
+            else:
+                king_to, rook_from, rook_to = chess.square(2, rank), chess.square(0, rank), chess.square(3, rank)
+            key ^= piece_key(chess.KING, turn, from_square) ^ piece_key(chess.KING, turn, king_to)
+            key ^= piece_key(chess.ROOK, turn, rook_from) ^ piece_key(chess.ROOK, turn, rook_to)
+        else:
+            if board.is_en_passant(move):
+                captured_square = chess.square(chess.square_file(to_square), chess.square_rank(from_square))
+                key ^= piece_key(chess.PAWN, not turn, captured_square)
+            else:
+                captured_type = board.piece_type_at(to_square)
+                if captured_type is not None:
+                    key ^= piece_key(captured_type, not turn, to_square)
+            key ^= piece_key(piece_type, turn, from_square) ^ piece_key(move.promotion or piece_type, turn, to_square)
+
+        castling_rights = board.castling_rights
+        if castling_rights:
+            key ^= castling_key(board)
+        board.push(move)
+        if castling_rights:
+            key ^= castling_key(board)
+        key ^= en_passant_key(board)
+
+        self.keys.append(key)
+
+    # pushes a null move (the side to move passes) onto board and records the new key
+    def push_null(self, board):
+        key = self.keys[-1] ^ TURN_KEY ^ en_passant_key(board)
+        board.push(chess.Move.null())
+        self.keys.append(key)
+
+    def pop(self):
+        self.keys.pop()
+
+    # zobrist key of the current position
+    def current(self):
+        return self.keys[-1]
+
+    # number of times the current position has occurred, counting itself (replaces board.is_repetition)
+    def repetitions(self, board):
+        keys = self.keys
+        key = keys[-1]
+        count = 0
+        # a position can only repeat with the same side to move, and not across a capture or pawn move
+        oldest = max(len(keys) - 1 - board.halfmove_clock, 0)
+        for index in range(len(keys) - 1, oldest - 1, -2):
+            if keys[index] == key:
+                count += 1
+        return count
+
+    # same result as board.is_game_over() for a node whose legal moves were already generated
+    def is_game_over(self, board, moves):
+        return (not moves or board.halfmove_clock >= 150 or self.repetitions(board) >= 5 or
+                board.is_insufficient_material())
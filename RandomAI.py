@@ -7,13 +7,28 @@ Description: Random AI
 import random
 from time import sleep
 
+
+# picks one of moves, the legal moves of board, at random; guided picks among the captures of an equal or more
+# valuable piece (and promotions) when there are any (also used for the playouts of MCTSAI)
+def random_move(board, moves, guided=False, rng=random):
+    if guided:
+        good_moves = [move for move in moves if move.promotion or
+                      (board.piece_type_at(move.to_square) or 0) >= board.piece_type_at(move.from_square)]
+        if good_moves:
+            return rng.choice(good_moves)
+    return rng.choice(moves)
+
+
 class RandomAI():
-    def __init__(self):
-        pass
+    def __init__(self, delay=1, quiet=False):
+        self.delay = delay  # seconds to wait before moving, so a human can follow the game
+        self.quiet = quiet  # true to skip printing the chosen move
 
     def choose_move(self, board):
         moves = list(board.legal_moves)
-        move = random.choice(moves)
-        sleep(1)
-        print("Random AI recommending move " + str(move))
+        move = random_move(board, moves)
+        if self.delay:
+            sleep(self.delay)
+        if not self.quiet:
+            print("Random AI recommending move " + str(move))
         return move
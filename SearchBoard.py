@@ -0,0 +1,602 @@
+"""
+Description: Compact position used inside the Minimax and Alpha Beta searches in place of chess.Board
+"""
+
+from array import array
+import sys
+import time
+
+import chess
+
+# every move the search can produce, created once and indexed by its integer code
+# (from square | to square << 6 | promotion piece type << 12), so generating moves allocates no Move objects
+MOVES = [chess.Move(code & 63, (code >> 6) & 63, (code >> 12) or None) for code in range(6 * 4096)]
+
+PROMOTION_TYPES = [chess.QUEEN, chess.ROOK, chess.BISHOP, chess.KNIGHT]  # same order as python-chess
+BACK_RANKS = chess.BB_RANK_1 | chess.BB_RANK_8
+
+BB_SQUARES = chess.BB_SQUARES
+BB_RAYS = chess.BB_RAYS
+BB_KNIGHT_ATTACKS = chess.BB_KNIGHT_ATTACKS
+BB_KING_ATTACKS = chess.BB_KING_ATTACKS
+BB_PAWN_ATTACKS = chess.BB_PAWN_ATTACKS
+BB_DIAG_MASKS = chess.BB_DIAG_MASKS
+BB_DIAG_ATTACKS = chess.BB_DIAG_ATTACKS
+BB_FILE_MASKS = chess.BB_FILE_MASKS
+BB_FILE_ATTACKS = chess.BB_FILE_ATTACKS
+BB_RANK_MASKS = chess.BB_RANK_MASKS
+BB_RANK_ATTACKS = chess.BB_RANK_ATTACKS
+
+
+# squares strictly between a and b on a shared line (0 if they don't share one)
+def between(a, b):
+    bb = BB_RAYS[a][b] & ((chess.BB_ALL << a) ^ (chess.BB_ALL << b))
+    return bb & (bb - 1)
+
+
+def msb(bb):
+    return bb.bit_length() - 1
+
+
+# squares of bb from highest to lowest, the order python-chess generates moves in
+def scan_reversed(bb):
+    while bb:
+        square = bb.bit_length() - 1
+        yield square
+        bb ^= BB_SQUARES[square]
+
+
+class SearchBoard:
+    __slots__ = ("masks", "occupied_co", "occupied", "mailbox", "turn", "castling_rights", "ep_square",
+                 "halfmove_clock", "fullmove_number", "move_stack", "undo_stack", "root_fen")
+
+    def __init__(self):
+        self.masks = [0] * 7  # bitboard of each piece type (index 0 unused)
+        self.occupied_co = [0, 0]  # black pieces, white pieces
+        self.occupied = 0
+        self.mailbox = array("b", [0] * 64)  # piece type on each square, negative for black pieces
+        self.turn = chess.WHITE
+        self.castling_rights = 0  # rook squares that still have castling rights, like python-chess
+        self.ep_square = None
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+        self.move_stack = []
+        self.undo_stack = []  # one tuple per pushed move with everything needed to take it back
+        self.root_fen = chess.STARTING_FEN
+
+    # builds a search board holding the same position and move history as a chess.Board
+    @classmethod
+    def from_board(cls, board):
+        root = board.root()
+        search_board = cls()
+        search_board.root_fen = root.fen()
+        for piece_type in chess.PIECE_TYPES:
+            search_board.masks[piece_type] = root.pieces_mask(piece_type, chess.WHITE) | \
+                                             root.pieces_mask(piece_type, chess.BLACK)
+        search_board.occupied_co = [root.occupied_co[chess.BLACK], root.occupied_co[chess.WHITE]]
+        search_board.occupied = root.occupied
+        for square in range(64):
+            piece = root.piece_at(square)
+            if piece is not None:
+                search_board.mailbox[square] = piece.piece_type if piece.color else -piece.piece_type
+        search_board.turn = root.turn
+        search_board.castling_rights = root.clean_castling_rights()
+        search_board.ep_square = root.ep_square
+        search_board.halfmove_clock = root.halfmove_clock
+        search_board.fullmove_number = root.fullmove_number
+
+        for move in board.move_stack:
+            search_board.push(move)
+        return search_board
+
+    # the same position (and history) as a chess.Board
+    def to_board(self):
+        board = chess.Board(self.root_fen)
+        for move in self.move_stack:
+            board.push(move)
+        return board
+
+    def fen(self):
+        return self.to_board().fen()
+
+    # the current position alone as a chess.Board, without replaying the move history
+    def position(self):
+        board = chess.Board(None)
+        board.set_piece_map({square: self.piece_at(square) for square in chess.scan_forward(self.occupied)})
+        board.turn = self.turn
+        board.castling_rights = self.castling_rights
+        board.ep_square = self.ep_square
+        board.halfmove_clock = self.halfmove_clock
+        board.fullmove_number = self.fullmove_number
+        return board
+
+    def copy(self):
+        board = SearchBoard.__new__(SearchBoard)
+        board.masks = self.masks[:]
+        board.occupied_co = self.occupied_co[:]
+        board.occupied = self.occupied
+        board.mailbox = array("b", self.mailbox)
+        board.turn = self.turn
+        board.castling_rights = self.castling_rights
+        board.ep_square = self.ep_square
+        board.halfmove_clock = self.halfmove_clock
+        board.fullmove_number = self.fullmove_number
+        board.move_stack = self.move_stack[:]
+        board.undo_stack = self.undo_stack[:]
+        board.root_fen = self.root_fen
+        return board
+
+    # piece bitboards under python-chess's names
+    @property
+    def pawns(self):
+        return self.masks[chess.PAWN]
+
+    @property
+    def knights(self):
+        return self.masks[chess.KNIGHT]
+
+    @property
+    def bishops(self):
+        return self.masks[chess.BISHOP]
+
+    @property
+    def rooks(self):
+        return self.masks[chess.ROOK]
+
+    @property
+    def queens(self):
+        return self.masks[chess.QUEEN]
+
+    @property
+    def kings(self):
+        return self.masks[chess.KING]
+
+    def piece_type_at(self, square):
+        piece = self.mailbox[square]
+        return (piece if piece > 0 else -piece) or None
+
+    def color_at(self, square):
+        piece = self.mailbox[square]
+        return None if piece == 0 else piece > 0
+
+    def piece_at(self, square):
+        piece = self.mailbox[square]
+        if piece == 0:
+            return None
+        return chess.Piece(piece if piece > 0 else -piece, piece > 0)
+
+    def pieces_mask(self, piece_type, color):
+        return self.masks[piece_type] & self.occupied_co[color]
+
+    def pieces(self, piece_type, color):
+        return chess.SquareSet(self.masks[piece_type] & self.occupied_co[color])
+
+    def king(self, color):
+        king_mask = self.masks[chess.KING] & self.occupied_co[color]
+        return msb(king_mask) if king_mask else None
+
+    def clean_castling_rights(self):
+        return self.castling_rights  # only ever lowered from clean rights, so always clean
+
+    def has_kingside_castling_rights(self, color):
+        return bool(self.castling_rights & (chess.BB_H1 if color else chess.BB_H8))
+
+    def has_queenside_castling_rights(self, color):
+        return bool(self.castling_rights & (chess.BB_A1 if color else chess.BB_A8))
+
+    # pieces of color attacking square, with an optional occupancy instead of the board's
+    def attackers_mask(self, color, square, occupied=None):
+        if occupied is None:
+            occupied = self.occupied
+        masks = self.masks
+        queens_and_rooks = masks[chess.QUEEN] | masks[chess.ROOK]
+        queens_and_bishops = masks[chess.QUEEN] | masks[chess.BISHOP]
+        attackers = ((BB_KING_ATTACKS[square] & masks[chess.KING]) |
+                     (BB_KNIGHT_ATTACKS[square] & masks[chess.KNIGHT]) |
+                     (BB_RANK_ATTACKS[square][BB_RANK_MASKS[square] & occupied] & queens_and_rooks) |
+                     (BB_FILE_ATTACKS[square][BB_FILE_MASKS[square] & occupied] & queens_and_rooks) |
+                     (BB_DIAG_ATTACKS[square][BB_DIAG_MASKS[square] & occupied] & queens_and_bishops) |
+                     (BB_PAWN_ATTACKS[not color][square] & masks[chess.PAWN]))
+        return attackers & self.occupied_co[color]
+
+    def is_check(self):
+        king = self.king(self.turn)
+        return king is not None and bool(self.attackers_mask(not self.turn, king))
+
+    def is_castling(self, move):
+        if self.masks[chess.KING] & BB_SQUARES[move.from_square]:
+            return abs((move.from_square & 7) - (move.to_square & 7)) > 1
+        return False
+
+    def is_kingside_castling(self, move):
+        return self.is_castling(move) and (move.to_square & 7) > (move.from_square & 7)
+
+    def is_queenside_castling(self, move):
+        return self.is_castling(move) and (move.to_square & 7) < (move.from_square & 7)
+
+    def is_en_passant(self, move):
+        return (self.ep_square == move.to_square and
+                bool(self.masks[chess.PAWN] & BB_SQUARES[move.from_square]) and
+                abs(move.to_square - move.from_square) in (7, 9) and
+                not self.occupied & BB_SQUARES[move.to_square])
+
+    def is_capture(self, move):
+        return bool(BB_SQUARES[move.to_square] & self.occupied_co[not self.turn]) or self.is_en_passant(move)
+
+    # same rules as chess.Board.has_insufficient_material
+    def has_insufficient_material(self, color):
+        masks = self.masks
+        own = self.occupied_co[color]
+        if own & (masks[chess.PAWN] | masks[chess.ROOK] | masks[chess.QUEEN]):
+            return False
+        if own & masks[chess.KNIGHT]:
+            return (chess.popcount(own) <= 2 and
+                    not (self.occupied_co[not color] & ~masks[chess.KING] & ~masks[chess.QUEEN]))
+        if own & masks[chess.BISHOP]:
+            bishops = masks[chess.BISHOP]
+            same_color = (not bishops & chess.BB_DARK_SQUARES) or (not bishops & chess.BB_LIGHT_SQUARES)
+            return same_color and not masks[chess.PAWN] and not masks[chess.KNIGHT]
+        return True
+
+    def is_insufficient_material(self):
+        return self.has_insufficient_material(chess.WHITE) and self.has_insufficient_material(chess.BLACK)
+
+    def remove_piece(self, square):
+        piece = self.mailbox[square]
+        mask = BB_SQUARES[square]
+        self.masks[piece if piece > 0 else -piece] ^= mask
+        self.occupied_co[piece > 0] ^= mask
+        self.occupied ^= mask
+        self.mailbox[square] = 0
+        return piece
+
+    def put_piece(self, square, piece):
+        mask = BB_SQUARES[square]
+        self.masks[piece if piece > 0 else -piece] |= mask
+        self.occupied_co[piece > 0] |= mask
+        self.occupied |= mask
+        self.mailbox[square] = piece
+
+    # makes a legal move (or a null move)
+    def push(self, move):
+        from_square = move.from_square
+        to_square = move.to_square
+        turn = self.turn
+        undo = (self.castling_rights, self.ep_square, self.halfmove_clock, 0, None)  # no capture, no rook move
+        self.ep_square = None
+        self.move_stack.append(move)
+        if not move:  # null move
+            self.undo_stack.append(undo)
+            self.halfmove_clock += 1
+            if not turn:
+                self.fullmove_number += 1
+            self.turn = not turn
+            return
+
+        piece = self.remove_piece(from_square)
+        piece_type = piece if piece > 0 else -piece
+        captured_square = to_square
+        captured = self.mailbox[to_square]
+        rook_move = None
+
+        if piece_type == chess.PAWN:
+            if to_square == undo[1] and not captured and (to_square - from_square) % 8 != 0:  # en passant
+                captured_square = to_square - 8 if turn else to_square + 8
+                captured = self.mailbox[captured_square]
+            elif abs(to_square - from_square) == 16:
+                self.ep_square = (from_square + to_square) // 2
+        elif piece_type == chess.KING and abs((from_square & 7) - (to_square & 7)) > 1:  # castling
+            rank_start = from_square & 56
+            if to_square > from_square:
+                rook_move = (rank_start + 7, rank_start + 5)
+            else:
+                rook_move = (rank_start, rank_start + 3)
+
+        if captured:
+            self.remove_piece(captured_square)
+        if rook_move is not None:
+            self.put_piece(rook_move[1], self.remove_piece(rook_move[0]))
+        if move.promotion:
+            piece = move.promotion if turn else -move.promotion
+        self.put_piece(to_square, piece)
+
+        self.castling_rights &= ~(BB_SQUARES[from_square] | BB_SQUARES[to_square])
+        if piece_type == chess.KING:
+            self.castling_rights &= ~(chess.BB_RANK_1 if turn else chess.BB_RANK_8)
+        if piece_type == chess.PAWN or captured:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        if not turn:
+            self.fullmove_number += 1
+        self.turn = not turn
+        self.undo_stack.append((undo[0], undo[1], undo[2], (captured, captured_square) if captured else 0, rook_move))
+
+    # takes back the last move and returns it
+    def pop(self):
+        move = self.move_stack.pop()
+        castling_rights, ep_square, halfmove_clock, capture, rook_move = self.undo_stack.pop()
+        self.turn = not self.turn
+        if not self.turn:
+            self.fullmove_number -= 1
+        self.castling_rights = castling_rights
+        self.ep_square = ep_square
+        self.halfmove_clock = halfmove_clock
+        if not move:
+            return move
+
+        piece = self.remove_piece(move.to_square)
+        if move.promotion:
+            piece = chess.PAWN if self.turn else -chess.PAWN
+        self.put_piece(move.from_square, piece)
+        if rook_move is not None:
+            self.put_piece(rook_move[0], self.remove_piece(rook_move[1]))
+        if capture:
+            self.put_piece(capture[1], capture[0])
+        return move
+
+    def peek(self):
+        return self.move_stack[-1]
+
+    # our pieces that are pinned to our king
+    def slider_blockers(self, king):
+        masks = self.masks
+        queens_and_rooks = masks[chess.QUEEN] | masks[chess.ROOK]
+        queens_and_bishops = masks[chess.QUEEN] | masks[chess.BISHOP]
+        snipers = ((BB_RANK_ATTACKS[king][0] & queens_and_rooks) |
+                   (BB_FILE_ATTACKS[king][0] & queens_and_rooks) |
+                   (BB_DIAG_ATTACKS[king][0] & queens_and_bishops))
+
+        blockers = 0
+        for sniper in scan_reversed(snipers & self.occupied_co[not self.turn]):
+            b = between(king, sniper) & self.occupied
+            if b and BB_SQUARES[msb(b)] == b:
+                blockers |= b
+        return blockers & self.occupied_co[self.turn]
+
+    # generates the integer codes of the pseudo-legal moves of pieces in from_mask to squares in to_mask,
+    # in python-chess's order (pieces, castling, pawn captures, pawn pushes, en passant)
+    def pseudo_legal_codes(self, from_mask, to_mask, castling):
+        turn = self.turn
+        masks = self.masks
+        own = self.occupied_co[turn]
+        enemy = self.occupied_co[not turn]
+        occupied = self.occupied
+
+        pieces = own & ~masks[chess.PAWN] & from_mask
+        while pieces:
+            from_square = pieces.bit_length() - 1
+            pieces ^= BB_SQUARES[from_square]
+            piece_type = self.mailbox[from_square]
+            piece_type = piece_type if piece_type > 0 else -piece_type
+            if piece_type == chess.KNIGHT:
+                attacks = BB_KNIGHT_ATTACKS[from_square]
+            elif piece_type == chess.KING:
+                attacks = BB_KING_ATTACKS[from_square]
+            else:
+                attacks = 0
+                if piece_type != chess.ROOK:
+                    attacks |= BB_DIAG_ATTACKS[from_square][BB_DIAG_MASKS[from_square] & occupied]
+                if piece_type != chess.BISHOP:
+                    attacks |= (BB_RANK_ATTACKS[from_square][BB_RANK_MASKS[from_square] & occupied] |
+                                BB_FILE_ATTACKS[from_square][BB_FILE_MASKS[from_square] & occupied])
+            targets = attacks & ~own & to_mask
+            while targets:
+                to_square = targets.bit_length() - 1
+                targets ^= BB_SQUARES[to_square]
+                yield from_square | to_square << 6
+
+        if castling:
+            yield from self.castling_codes()
+
+        pawns = masks[chess.PAWN] & own & from_mask
+        if not pawns:
+            return
+
+        capturers = pawns
+        while capturers:
+            from_square = capturers.bit_length() - 1
+            capturers ^= BB_SQUARES[from_square]
+            targets = BB_PAWN_ATTACKS[turn][from_square] & enemy & to_mask
+            while targets:
+                to_square = targets.bit_length() - 1
+                targets ^= BB_SQUARES[to_square]
+                yield from self.pawn_codes(from_square, to_square)
+
+        if turn:
+            single_moves = pawns << 8 & ~occupied
+            double_moves = single_moves << 8 & ~occupied & (chess.BB_RANK_3 | chess.BB_RANK_4)
+            step = 8
+        else:
+            single_moves = pawns >> 8 & ~occupied
+            double_moves = single_moves >> 8 & ~occupied & (chess.BB_RANK_6 | chess.BB_RANK_5)
+            step = -8
+        single_moves &= to_mask
+        double_moves &= to_mask
+        while single_moves:
+            to_square = single_moves.bit_length() - 1
+            single_moves ^= BB_SQUARES[to_square]
+            yield from self.pawn_codes(to_square - step, to_square)
+        while double_moves:
+            to_square = double_moves.bit_length() - 1
+            double_moves ^= BB_SQUARES[to_square]
+            yield (to_square - 2 * step) | to_square << 6
+
+        if self.ep_square is not None:
+            yield from self.en_passant_codes(from_mask, to_mask)
+
+    @staticmethod
+    def pawn_codes(from_square, to_square):
+        if BB_SQUARES[to_square] & BACK_RANKS:
+            return [from_square | to_square << 6 | promotion << 12 for promotion in PROMOTION_TYPES]
+        return [from_square | to_square << 6]
+
+    def en_passant_codes(self, from_mask, to_mask):
+        ep_square = self.ep_square
+        turn = self.turn
+        if self.occupied & BB_SQUARES[ep_square] or not to_mask & BB_SQUARES[ep_square]:
+            return
+        if not self.masks[chess.PAWN] & self.occupied_co[not turn] & BB_SQUARES[ep_square + (-8 if turn else 8)]:
+            return
+        capturers = (self.masks[chess.PAWN] & self.occupied_co[turn] & from_mask &
+                     BB_PAWN_ATTACKS[not turn][ep_square] & chess.BB_RANKS[4 if turn else 3])
+        while capturers:
+            from_square = capturers.bit_length() - 1
+            capturers ^= BB_SQUARES[from_square]
+            yield from_square | ep_square << 6
+
+    # standard castling moves; the king may not be in check or pass through an attacked square
+    def castling_codes(self):
+        turn = self.turn
+        king = self.king(turn)
+        if king is None:
+            return
+        backrank = chess.BB_RANK_1 if turn else chess.BB_RANK_8
+        rights = self.castling_rights & backrank
+        while rights:
+            rook = rights.bit_length() - 1
+            rights ^= BB_SQUARES[rook]
+            rank_start = king & 56
+            king_to = rank_start + (6 if rook > king else 2)
+            rook_to = rank_start + (5 if rook > king else 3)
+            path = between(king, rook) | BB_SQUARES[king_to] | BB_SQUARES[rook_to]
+            if (path & ~BB_SQUARES[king] & ~BB_SQUARES[rook]) & self.occupied:
+                continue
+            king_path = between(king, king_to) | BB_SQUARES[king_to] | BB_SQUARES[king]
+            attacked = False
+            while king_path:
+                square = king_path.bit_length() - 1
+                king_path ^= BB_SQUARES[square]
+                if self.attackers_mask(not turn, square):
+                    attacked = True
+                    break
+            if not attacked:
+                yield king | king_to << 6
+
+    # true if the pseudo-legal move with code leaves our king safe
+    def is_safe(self, king, blockers, code):
+        from_square = code & 63
+        to_square = (code >> 6) & 63
+        if from_square == king:
+            if abs((from_square & 7) - (to_square & 7)) > 1:
+                return True  # castling was checked while generating
+            occupied = self.occupied & ~BB_SQUARES[king]
+            return not self.attackers_mask(not self.turn, to_square, occupied)
+        if to_square == self.ep_square and self.mailbox[from_square] in (chess.PAWN, -chess.PAWN) and \
+                not self.occupied & BB_SQUARES[to_square]:
+            move = MOVES[code]
+            self.push(move)
+            safe = not self.attackers_mask(self.turn, king)
+            self.pop()
+            return safe
+        return not blockers & BB_SQUARES[from_square] or bool(BB_RAYS[from_square][to_square] & BB_SQUARES[king])
+
+    # generates the integer codes of every legal move, in python-chess's order
+    def legal_codes(self):
+        turn = self.turn
+        king = self.king(turn)
+        if king is None:
+            yield from self.pseudo_legal_codes(chess.BB_ALL, chess.BB_ALL, True)
+            return
+        blockers = self.slider_blockers(king)
+        checkers = self.attackers_mask(not turn, king)
+
+        if not checkers:
+            for code in self.pseudo_legal_codes(chess.BB_ALL, chess.BB_ALL, True):
+                if self.is_safe(king, blockers, code):
+                    yield code
+        else:
+            codes = []
+            own = self.occupied_co[turn]
+            masks = self.masks
+            sliders = checkers & (masks[chess.BISHOP] | masks[chess.ROOK] | masks[chess.QUEEN])
+            attacked = 0
+            for checker in scan_reversed(sliders):
+                attacked |= BB_RAYS[king][checker] & ~BB_SQUARES[checker]
+            targets = BB_KING_ATTACKS[king] & ~own & ~attacked
+            while targets:
+                to_square = targets.bit_length() - 1
+                targets ^= BB_SQUARES[to_square]
+                codes.append(king | to_square << 6)
+
+            checker = msb(checkers)
+            if BB_SQUARES[checker] == checkers:  # a single checker can also be captured or blocked
+                target = between(king, checker) | checkers
+                codes.extend(self.pseudo_legal_codes(~masks[chess.KING], target, False))
+                if self.ep_square is not None and not BB_SQUARES[self.ep_square] & target:
+                    last_double = self.ep_square + (-8 if turn else 8)
+                    if last_double == checker:
+                        codes.extend(self.en_passant_codes(chess.BB_ALL, chess.BB_ALL))
+            for code in codes:
+                if self.is_safe(king, blockers, code):
+                    yield code
+
+    # legal moves as shared chess.Move objects, generated lazily so any() stops at the first one
+    def generate_legal_moves(self):
+        for code in self.legal_codes():
+            yield MOVES[code]
+
+    @property
+    def legal_moves(self):
+        return [MOVES[code] for code in self.legal_codes()]
+
+    def is_legal(self, move):
+        return move in self.legal_moves
+
+    # number of leaf nodes depth plies below this position
+    def perft(self, depth):
+        codes = list(self.legal_codes())
+        if depth <= 1:
+            return len(codes) if depth == 1 else 1
+        count = 0
+        for code in codes:
+            self.push(MOVES[code])
+            count += self.perft(depth - 1)
+            self.pop()
+        return count
+
+
+# standard perft positions (https://www.chessprogramming.org/Perft_Results) with node counts per depth
+PERFT_SUITE = [
+    (chess.STARTING_FEN, [20, 400, 8902, 197281]),
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", [48, 2039, 97862]),
+    ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812, 43238]),
+    ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", [6, 264, 9467]),
+    ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", [44, 1486, 62379]),
+    ("r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10", [46, 2079, 89890]),
+]
+
+
+# leaf node count of a python-chess board, for comparison
+def chess_perft(board, depth):
+    if depth <= 1:
+        return board.legal_moves.count() if depth == 1 else 1
+    count = 0
+    for move in board.legal_moves:
+        board.push(move)
+        count += chess_perft(board, depth - 1)
+        board.pop()
+    return count
+
+
+if __name__ == "__main__":
+    # usage: python3 SearchBoard.py [max depth]; compares perft counts with the known values and python-chess
+    max_depth = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    failures = 0
+    for fen, expected_counts in PERFT_SUITE:
+        for depth, expected in enumerate(expected_counts[:max_depth], start=1):
+            search_board = SearchBoard.from_board(chess.Board(fen))
+            start = time.perf_counter()
+            count = search_board.perft(depth)
+            search_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            reference = chess_perft(chess.Board(fen), depth)
+            chess_seconds = time.perf_counter() - start
+
+            ok = count == expected == reference
+            failures += not ok
+            print(("ok  " if ok else "FAIL") + " depth " + str(depth) + " | " + str(count) + " nodes (expected " +
+                  str(expected) + ", python-chess " + str(reference) + ") | search board " +
+                  str(round(search_seconds, 3)) + "s vs python-chess " + str(round(chess_seconds, 3)) + "s | " + fen)
+    sys.exit(1 if failures else 0)
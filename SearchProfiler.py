@@ -0,0 +1,115 @@
+"""
+Description: Sampling profiler for choose_move; writes the sampled call stacks of every move in collapsed form (one
+"frame;frame;frame count" line per stack, the input of flamegraph.pl and speedscope) and sums up where the time went
+"""
+
+import os
+import sys
+import threading
+
+import chess
+
+SAMPLE_INTERVAL = 0.002  # seconds between samples (the interpreter only switches threads every 5 ms by default)
+CHESS_DIRECTORY = os.path.dirname(os.path.abspath(chess.__file__))
+
+# parts of the search the summary splits the time into; a sample counts for the outermost of these functions on its
+# stack, otherwise for python-chess when its innermost frame is python-chess code, otherwise for the search itself
+CATEGORIES = [
+    ("move_reorderer/order_moves", ("move_reorderer", "order_moves")),
+    ("michniewski_heuristic/evaluation", ("michniewski_heuristic", "simple_heuristic", "evaluate", "frontier_value",
+                                          "utility")),
+    ("cutoff_test", ("cutoff_test",)),
+]
+CATEGORY_OF = {function: name for name, functions in CATEGORIES for function in functions}
+PYTHON_CHESS = "python-chess"
+SEARCH = "rest of the search"
+
+
+class SearchProfiler:
+    def __init__(self, name, directory="profiles", interval=SAMPLE_INTERVAL):
+        self.name = name  # prefix of the files written, e.g. "alphabeta_white"
+        self.directory = directory
+        self.interval = interval
+        self.moves = 0
+        self.samples = 0
+        self.totals = {}  # samples per category over every profiled move
+        self.chess_samples = 0  # samples whose innermost frame was python-chess code, in any category
+
+    # returns choose_move wrapped so every call is profiled; installed over choose_move by the AIs' profile flag, so
+    # AIs without it run exactly as before
+    def wrap(self, choose_move):
+        def profiled_choose_move(board):
+            return self.profile(choose_move, board)
+        return profiled_choose_move
+
+    # calls function(*args) while a thread samples the calling thread's stack, then writes the move's profile
+    def profile(self, function, *args):
+        stacks = {}
+        done = threading.Event()
+        sampler = threading.Thread(target=self.sample,
+                                   args=(threading.get_ident(), sys._getframe(), stacks, done), daemon=True)
+        sampler.start()
+        try:
+            return function(*args)
+        finally:
+            done.set()
+            sampler.join()
+            self.moves += 1
+            self.write_stacks(stacks)
+            self.add_to_totals(stacks)
+            self.write_summary()
+
+    # records the stack of thread_id below root_frame every interval until done is set
+    def sample(self, thread_id, root_frame, stacks, done):
+        while not done.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None and frame is not root_frame:
+                stack.append((frame.f_code.co_filename, frame.f_code.co_name))
+                frame = frame.f_back
+            if stack:
+                stack = tuple(reversed(stack))
+                stacks[stack] = stacks.get(stack, 0) + 1
+
+    # the summary category of a stack (outermost frame first)
+    @staticmethod
+    def category(stack):
+        for filename, function in stack:
+            if function in CATEGORY_OF:
+                return CATEGORY_OF[function]
+        if stack[-1][0].startswith(CHESS_DIRECTORY):
+            return PYTHON_CHESS
+        return SEARCH
+
+    # one move's stacks in collapsed form, e.g. "AlphaBetaAI.py:max_value;AlphaBetaAI.py:evaluate 12"
+    def write_stacks(self, stacks):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, self.name + "_move" + str(self.moves).zfill(3) + ".folded")
+        with open(path, "w") as folded:
+            for stack, count in sorted(stacks.items()):
+                frames = ";".join(os.path.basename(filename) + ":" + function for filename, function in stack)
+                folded.write(frames + " " + str(count) + "\n")
+
+    def add_to_totals(self, stacks):
+        for stack, count in stacks.items():
+            category = self.category(stack)
+            self.totals[category] = self.totals.get(category, 0) + count
+            self.samples += count
+            if stack[-1][0].startswith(CHESS_DIRECTORY):
+                self.chess_samples += count
+
+    # share of the samples of every category over all moves so far
+    def summary(self):
+        lines = [self.name + ": " + str(self.samples) + " samples over " + str(self.moves) + " moves"]
+        for name in [category for category, functions in CATEGORIES] + [PYTHON_CHESS, SEARCH]:
+            count = self.totals.get(name, 0)
+            lines.append("  " + name + ": " + str(round(100 * count / self.samples, 1) if self.samples else 0.0) +
+                         "% (" + str(count) + ")")
+        if self.samples:
+            lines.append("  inside python-chess code, all categories: " +
+                         str(round(100 * self.chess_samples / self.samples, 1)) + "%")
+        return "\n".join(lines)
+
+    def write_summary(self):
+        with open(os.path.join(self.directory, self.name + "_summary.txt"), "w") as summary_file:
+            summary_file.write(self.summary() + "\n")
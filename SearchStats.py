@@ -0,0 +1,135 @@
+"""
+Description: Per-search statistics and the observers that are told about completed iterations and moves
+"""
+
+
+# one completed iterative deepening iteration
+class IterationStats:
+    def __init__(self, depth, move, value, nodes, seconds):
+        self.depth = depth
+        self.move = move
+        self.value = value
+        self.nodes = nodes  # min/max calls of this iteration only
+        self.seconds = seconds
+
+
+# statistics of one choose_move call, filled in from the AI's counters once the search is over
+class SearchStats:
+    def __init__(self, engine, depth):
+        self.engine = engine  # "minimax", "alphabeta", "iterative_deepening" or "mcts"
+        self.depth = depth  # depth limit (deepest completed iteration for iterative deepening, deepest leaf for mcts)
+        self.move = None
+        self.value = None  # score of the chosen move, when the search keeps it (expected result for mcts)
+        self.book = False  # the move came from the opening book without searching
+        self.tablebase_move = False  # the move came from the endgame tablebase without searching
+        self.nodes = 0  # min/max calls (tree nodes for mcts)
+        self.playouts = 0  # random playouts of a Monte Carlo tree search
+        self.leaf_evals = 0  # heuristic evaluations of nodes where the search stopped
+        self.heuristic_calls = 0  # calls of the simple heuristic (kept for the old printout)
+        self.cutoffs_by_ply = []  # beta cutoffs at each distance from the root
+        self.first_move_cutoffs = 0  # cutoffs produced by the first move searched
+        self.table = None  # (hits, misses, collisions) of the transposition table, None without a table
+        self.tablebase = None  # (probes, hits) of the endgame tablebase, None without one
+        self.seconds = 0.0
+        self.eval_seconds = None  # time spent in evaluate, None unless the AI was built with time_evaluations=True
+        self.iterations = []  # IterationStats of each completed iterative deepening iteration
+        self.aborted_depth = None  # depth whose iteration ran out of time
+        self.ponder_depth = None  # depth already searched while pondering, on a ponder hit
+        self.aspiration_failures = 0  # iterations searched again because the score fell outside the aspiration window
+
+    # adds the cutoff counters of a MoveOrderer after one search
+    def add_cutoffs(self, orderer):
+        counts = orderer.cutoffs_by_ply
+        if len(self.cutoffs_by_ply) < len(counts):
+            self.cutoffs_by_ply.extend([0] * (len(counts) - len(self.cutoffs_by_ply)))
+        for ply, count in enumerate(counts):
+            self.cutoffs_by_ply[ply] += count
+        self.first_move_cutoffs += orderer.first_move_cutoffs
+        while self.cutoffs_by_ply and self.cutoffs_by_ply[-1] == 0:
+            self.cutoffs_by_ply.pop()
+
+    @property
+    def cutoffs(self):
+        return sum(self.cutoffs_by_ply)
+
+    # fraction of beta cutoffs produced by the first move searched
+    @property
+    def first_move_cutoff_rate(self):
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    @property
+    def nps(self):
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+    # node growth per ply: the ratio of the last two iterations when there are two, otherwise nodes ** (1 / depth)
+    @property
+    def effective_branching_factor(self):
+        if len(self.iterations) >= 2 and self.iterations[-2].nodes:
+            return self.iterations[-1].nodes / self.iterations[-2].nodes
+        if self.depth and self.nodes:
+            return self.nodes ** (1 / self.depth)
+        return 0.0
+
+    # fraction of the search time spent evaluating leaves (None when evaluations weren't timed)
+    @property
+    def eval_time_share(self):
+        if self.eval_seconds is None or not self.seconds:
+            return None
+        return self.eval_seconds / self.seconds
+
+
+# receives statistics from an AI; subclasses override the events they care about
+class SearchObserver:
+    # an iterative deepening iteration completed
+    def on_iteration(self, stats, iteration):
+        pass
+
+    # an iterative deepening iteration was aborted by the time limit
+    def on_abort(self, stats, depth, elapsed):
+        pass
+
+    # the AI chose its move
+    def on_move(self, stats):
+        pass
+
+
+# prints the same progress lines the AIs have always printed; the default observer of every AI
+class PrintObserver(SearchObserver):
+    def on_iteration(self, stats, iteration):
+        print("Depth: " + str(iteration.depth) + " | Move: " + str(iteration.move) +
+              " | recommended by Iterative Deepening AI (using Alpha Beta)")
+
+    def on_abort(self, stats, depth, elapsed):
+        print("Depth: " + str(depth) + " | aborted after " + str(round(elapsed, 2)) +
+              "s | keeping move from depth " + str(depth - 1))
+
+    def on_move(self, stats):
+        if stats.book:
+            print("Opening book move " + str(stats.move) + " | no search needed")
+        elif stats.tablebase_move:
+            print("Tablebase move " + str(stats.move) + " | no search needed")
+        elif stats.engine == "minimax":
+            print("Minimax AI recommending move " + str(stats.move) + " | depth = " + str(stats.depth) +
+                  " | min/max calls = " + str(stats.nodes))
+        elif stats.engine == "alphabeta":
+            print("Alpha Beta AI recommending move " + str(stats.move) + " | depth = " + str(stats.depth) +
+                  " | min/max calls = " + str(stats.nodes))
+            print("heuristic calls: " + str(stats.heuristic_calls) + " | first move cutoffs: " +
+                  str(round(100 * stats.first_move_cutoff_rate, 1)) + "%")
+            if stats.table is not None:
+                print("table hits: " + str(stats.table[0]) + " | misses: " + str(stats.table[1]) +
+                      " | collisions: " + str(stats.table[2]))
+            if stats.tablebase is not None:
+                print("tablebase probes: " + str(stats.tablebase[0]) + " | hits: " + str(stats.tablebase[1]))
+        elif stats.engine == "mcts":
+            print("MCTS AI recommending move " + str(stats.move) + " | playouts = " + str(stats.playouts) +
+                  " | expected result = " + str(round(stats.value or 0, 3)) + " | tree depth = " + str(stats.depth))
+        else:
+            if stats.ponder_depth is not None:
+                print("ponder hit | depth " + str(stats.ponder_depth) + " searched on the opponent's time")
+            print("\nIterative Deepening AI (using Alpha Beta) recommending move " + str(stats.move))
+
+
+# default observer list of an AI built without one
+def default_observers(observers):
+    return [PrintObserver()] if observers is None else list(observers)
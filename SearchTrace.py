@@ -0,0 +1,137 @@
+"""
+Description: Search trace; records every node an Alpha Beta search visits as a fixed-width binary record, and reads
+trace files back to measure branching factor, move ordering and the nodes a perfect ordering would have saved
+"""
+
+import argparse
+import os
+import struct
+
+MAGIC = b"CHAITR01"
+# one visited node, written when the node returns: Zobrist key, ply from the root, depth left, alpha and beta it was
+# called with, score it returned, index of the move that caused its cutoff (NO_CUTOFF without one)
+RECORD = struct.Struct("<QHhiiih")
+NO_CUTOFF = -1
+SEARCH_START = -2  # cutoff index of the record written before every search (key and depth of the root)
+BUFFER_SIZE = 1 << 20  # bytes collected before a write to the file
+
+
+class SearchTracer:
+    def __init__(self, path):
+        self.path = path
+        # appends, so every search of a run (or of several AIs used one after the other) lands in the same file;
+        # the buffered file writes in BUFFER_SIZE chunks instead of once per node
+        self.file = open(path, "ab", buffering=BUFFER_SIZE)
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+        self.pack = RECORD.pack
+        self.write = self.file.write
+
+    # marks the start of a search from the root with the given key and depth
+    def start(self, key, depth):
+        self.write(self.pack(key, 0, depth, 0, 0, 0, SEARCH_START))
+
+    def record(self, key, ply, depth, alpha, beta, value, cutoff_index):
+        self.write(self.pack(key, ply, depth, alpha, beta, value, cutoff_index))
+
+    # writes out the buffered records (AlphaBetaAI calls this after every search)
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+# yields the records of a trace file as (key, ply, depth, alpha, beta, value, cutoff index) tuples
+def read_trace(path):
+    with open(path, "rb") as trace_file:
+        if trace_file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(path + " is not a search trace")
+        while True:
+            data = trace_file.read(RECORD.size * 4096)
+            if not data:
+                return
+            yield from RECORD.iter_unpack(data[:len(data) - len(data) % RECORD.size])
+
+
+class TraceSummary:
+    def __init__(self):
+        self.searches = 0
+        self.nodes = 0
+        self.nodes_by_ply = []
+        self.interior_by_ply = []  # nodes with at least one searched child
+        self.children_by_ply = []  # searched children (re-searches count again)
+        self.cutoffs_by_ply = []
+        self.first_move_cutoffs_by_ply = []
+        self.wasted_by_ply = []  # nodes below the children a cut node searched before the child that cut off
+
+    # grows the per ply lists to hold ply
+    def add_ply(self, ply):
+        while len(self.nodes_by_ply) <= ply:
+            for counts in (self.nodes_by_ply, self.interior_by_ply, self.children_by_ply, self.cutoffs_by_ply,
+                           self.first_move_cutoffs_by_ply, self.wasted_by_ply):
+                counts.append(0)
+
+    # rebuilds the tree from the records, which come in post order: when a node at ply p is written, the subtrees
+    # pending at ply p + 1 are its children, and the last of them is the one searched last (at a cut node, the move
+    # that caused the cutoff). Everything the cut node searched before it is counted as wasted
+    def add(self, records):
+        pending = [[]]  # subtree sizes of finished nodes at every ply that are waiting for their parent
+        for key, ply, depth, alpha, beta, value, cutoff_index in records:
+            if cutoff_index == SEARCH_START:
+                self.searches += 1
+                pending = [[]]  # drops what an aborted search left behind
+                continue
+            while len(pending) <= ply + 1:
+                pending.append([])
+            del pending[ply + 2:]  # left by an aborted search
+            children = pending[ply + 1]
+            pending[ply + 1] = []
+
+            self.add_ply(ply)
+            self.nodes += 1
+            self.nodes_by_ply[ply] += 1
+            if children:
+                self.interior_by_ply[ply] += 1
+                self.children_by_ply[ply] += len(children)
+            if cutoff_index >= 0:
+                self.cutoffs_by_ply[ply] += 1
+                if cutoff_index == 0:
+                    self.first_move_cutoffs_by_ply[ply] += 1
+                self.wasted_by_ply[ply] += sum(children) - children[-1] if children else 0
+            pending[ply].append(1 + sum(children))
+
+    def report(self):
+        cutoffs = sum(self.cutoffs_by_ply)
+        first_move_cutoffs = sum(self.first_move_cutoffs_by_ply)
+        wasted = sum(self.wasted_by_ply)
+        lines = [str(self.searches) + " searches | " + str(self.nodes) + " nodes | " + str(cutoffs) + " cutoffs | " +
+                 "first move cutoff rate: " + str(round(100 * first_move_cutoffs / cutoffs, 1) if cutoffs else 0.0) +
+                 "% | wasted nodes: " + str(wasted) + " (" +
+                 str(round(100 * wasted / self.nodes, 1) if self.nodes else 0.0) + "%)",
+                 "ply | nodes | branching factor | cutoffs | first move cutoff rate | wasted nodes"]
+        for ply, nodes in enumerate(self.nodes_by_ply):
+            interior = self.interior_by_ply[ply]
+            ply_cutoffs = self.cutoffs_by_ply[ply]
+            lines.append(str(ply) + " | " + str(nodes) + " | " +
+                         str(round(self.children_by_ply[ply] / interior, 2) if interior else 0.0) + " | " +
+                         str(ply_cutoffs) + " | " +
+                         str(round(100 * self.first_move_cutoffs_by_ply[ply] / ply_cutoffs, 1) if ply_cutoffs
+                             else 0.0) + "% | " + str(self.wasted_by_ply[ply]))
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize search trace files written with trace_path.")
+    parser.add_argument("paths", nargs="+", help="trace files (a directory reads every .trace file in it)")
+    args = parser.parse_args()
+
+    for path in args.paths:
+        paths = [path]
+        if os.path.isdir(path):
+            paths = sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".trace"))
+        for trace_path in paths:
+            summary = TraceSummary()
+            summary.add(read_trace(trace_path))
+            print(trace_path)
+            print(summary.report() + "\n")
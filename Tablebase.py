@@ -0,0 +1,98 @@
+"""
+Description: Syzygy endgame tablebases; perfect moves at the root and exact win/draw/loss scores inside the search
+once few enough pieces are left
+"""
+
+import os
+
+import chess
+import chess.syzygy
+from AlphaBetaAI import MATE_BOUND
+from SearchStats import SearchStats
+
+# score of a tablebase win for the side to move; below the mate scores, so a mate the search can see still wins out
+TABLEBASE_WIN = MATE_BOUND - 1
+
+
+class Tablebase:
+    def __init__(self, directory):
+        self.directory = directory
+        self.tables = None  # stays None when there are no tables; every probe then misses
+        self.max_pieces = 0  # pieces (kings included) of the largest table found
+        self.probes = 0
+        self.hits = 0
+        if not os.path.isdir(directory):
+            print("Syzygy directory " + directory + " not found; searching without tablebases")
+            return
+        tables = chess.syzygy.Tablebase()
+        if tables.add_directory(directory) == 0 or not tables.wdl:
+            print("no Syzygy WDL tables in " + directory + "; searching without tablebases")
+            tables.close()
+            return
+        self.tables = tables
+        self.max_pieces = max(len(name) - 1 for name in tables.wdl)  # e.g. "KRPvKR" has 5 pieces
+
+    def reset_stats(self):
+        self.probes = 0
+        self.hits = 0
+
+    # win (2), cursed win (1), draw (0), blessed loss (-1) or loss (-2) for the side to move, or None when board isn't
+    # covered by the tables; board may be a chess.Board or a SearchBoard
+    def probe_wdl(self, board):
+        if self.tables is None or chess.popcount(board.occupied) > self.max_pieces or board.castling_rights:
+            return None
+        self.probes += 1
+        if not isinstance(board, chess.Board):
+            board = board.position()
+        try:
+            wdl = self.tables.probe_wdl(board)
+        except KeyError:  # table missing from the directory
+            return None
+        self.hits += 1
+        return wdl
+
+    # search score of board for the side to move, or None when board isn't covered; cursed wins and blessed losses
+    # are draws under the fifty move rule
+    def score(self, board):
+        wdl = self.probe_wdl(board)
+        if wdl is None:
+            return None
+        if wdl == 2:
+            return TABLEBASE_WIN
+        if wdl == -2:
+            return -TABLEBASE_WIN
+        return 0
+
+    # the best move of a chess.Board covered by the tables, or None: the best win/draw/loss result first, then the
+    # fastest way to the next capture or pawn move when winning and the slowest when losing (distance to zeroing)
+    def root_move(self, board):
+        if self.probe_wdl(board) is None:
+            return None
+        best_move = None
+        best_rank = None
+        for move in board.legal_moves:
+            board.push(move)
+            try:
+                wdl = -self.tables.probe_wdl(board)
+                dtz = abs(self.tables.probe_dtz(board))
+            except KeyError:  # DTZ table missing
+                return None
+            finally:
+                board.pop()
+            rank = (wdl, -dtz if wdl > 0 else dtz)
+            if best_rank is None or rank > best_rank:
+                best_move, best_rank = move, rank
+        return best_move
+
+    def close(self):
+        if self.tables is not None:
+            self.tables.close()
+
+
+# statistics of a move taken from the tablebase by engine ("alphabeta" or "iterative_deepening")
+def tablebase_move_stats(engine, move, seconds):
+    stats = SearchStats(engine, 0)
+    stats.move = move
+    stats.tablebase_move = True
+    stats.seconds = seconds
+    return stats
@@ -0,0 +1,77 @@
+"""
+Description: Zobrist-keyed transposition table used by the Alpha Beta AI
+"""
+
+import chess.polyglot
+
+# bound types describing how a stored score relates to the true value of the position
+EXACT = 0
+LOWER_BOUND = 1  # search failed high, true value >= score
+UPPER_BOUND = 2  # search failed low, true value <= score
+
+ENTRY_BYTES = 160  # rough size of one stored entry (tuple, key int, score, list slot)
+
+
+# computes the Polyglot Zobrist key of a board
+def zobrist_key(board):
+    return chess.polyglot.zobrist_hash(board)
+
+
+class TranspositionTable:
+    shared = False  # scores are stored as the AI's search sees them (see PersistentTable.py for a shared table)
+
+    def __init__(self, size_mb=16):
+        # every bucket holds two entries: one kept by depth and one always overwritten
+        self.num_buckets = max(1, int(size_mb * 1024 * 1024) // (2 * ENTRY_BYTES))
+        self.depth_preferred = [None] * self.num_buckets
+        self.always_replace = [None] * self.num_buckets
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0  # probes that found the bucket occupied by a different position
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def clear(self):
+        self.depth_preferred = [None] * self.num_buckets
+        self.always_replace = [None] * self.num_buckets
+        self.reset_stats()
+
+    # returns the (key, depth, score, bound, move) entry stored for key, or None
+    def probe(self, key):
+        index = key % self.num_buckets
+
+        entry = self.depth_preferred[index]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        collided = entry is not None
+
+        entry = self.always_replace[index]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        collided = collided or entry is not None
+
+        if collided:
+            self.collisions += 1
+        self.misses += 1
+        return None
+
+    # stores a search result; deeper results keep the depth-preferred slot, everything else goes to always-replace
+    def store(self, key, depth, score, bound, move):
+        index = key % self.num_buckets
+        entry = (key, depth, score, bound, move)
+
+        current = self.depth_preferred[index]
+        if current is None or current[0] == key or depth >= current[1]:
+            self.depth_preferred[index] = entry
+        else:
+            self.always_replace[index] = entry
+
+    # fraction of probes that found a matching entry
+    def hit_rate(self):
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.0
@@ -0,0 +1,82 @@
+"""
+Description: NumPy evaluation backend that scores one or many positions from their bitboards
+"""
+
+# pip3 install numpy
+import numpy as np
+import chess
+import PieceSquareTables as pst
+
+# material values from Tomasz Michniewski's Simplified Evaluation Function, indexed by piece type
+MATERIAL_VALUES = [0, 100, 320, 330, 500, 900, 20000]
+
+# rows of the 12x64 tables: white pawn..king are rows 0-5, black pawn..king are rows 6-11
+WHITE_TABLES = [pst.pawn_values_white, pst.knight_values_white, pst.bishop_values_white,
+                pst.rook_values_white, pst.queen_values_white]
+BLACK_TABLES = [pst.pawn_values_black, pst.knight_values_black, pst.bishop_values_black,
+                pst.rook_values_black, pst.queen_values_black]
+
+QUEEN_ROW = chess.QUEEN - 1
+MINOR_ROWS = [chess.PAWN - 1, chess.KNIGHT - 1, chess.BISHOP - 1, chess.ROOK - 1]
+
+
+# the twelve piece bitboards of a board, in table row order
+def position_masks(board):
+    white = board.occupied_co[chess.WHITE]
+    black = board.occupied_co[chess.BLACK]
+    return (board.pawns & white, board.knights & white, board.bishops & white,
+            board.rooks & white, board.queens & white, board.kings & white,
+            board.pawns & black, board.knights & black, board.bishops & black,
+            board.rooks & black, board.queens & black, board.kings & black)
+
+
+# builds a 12x64 table of material plus position values, positive for white and negative for black
+def build_table(white_king, black_king):
+    table = np.zeros((12, 64), dtype=np.int64)
+    for row, values in enumerate(WHITE_TABLES + [white_king]):
+        table[row] = np.array(values) + MATERIAL_VALUES[row + 1]
+    for row, values in enumerate(BLACK_TABLES + [black_king]):
+        table[row + 6] = -(np.array(values) + MATERIAL_VALUES[row + 1])
+    return table
+
+
+class VectorizedEvaluator:
+    def __init__(self):
+        # the two tables only differ in the king rows
+        self.middlegame_table = build_table(pst.king_values_white_middlegame, pst.king_values_black_middlegame)
+        self.endgame_table = build_table(pst.king_values_white_endgame, pst.king_values_black_endgame)
+        # both tables side by side so one matrix product scores a batch for middle-game and end-game at once
+        self.tables = np.stack([self.middlegame_table.reshape(768), self.endgame_table.reshape(768)], axis=1)
+
+    position_masks = staticmethod(position_masks)  # lets callers collect masks without importing this module
+
+    # expands an (N, 12) array of bitboards into an (N, 12, 64) array of 0/1 square occupancy
+    @staticmethod
+    def expand(masks):
+        masks = np.ascontiguousarray(masks, dtype="<u8")
+        bits = np.unpackbits(masks.view(np.uint8), axis=1, bitorder="little")
+        return bits.reshape(len(masks), 12, 64)
+
+    # same king end-game test as AlphaBetaAI.michniewski_player_position_score, for each row of piece counts
+    @staticmethod
+    def king_endgame(counts):
+        white_queen = counts[:, QUEEN_ROW] > 0
+        black_queen = counts[:, QUEEN_ROW + 6] > 0
+        white_minor = counts[:, MINOR_ROWS].sum(axis=1)
+        black_minor = counts[:, [row + 6 for row in MINOR_ROWS]].sum(axis=1)
+        return ((~white_queen & ~black_queen) |
+                (white_queen & ~black_queen & (white_minor <= 1)) |
+                (~white_queen & black_queen & (black_minor <= 1)) |
+                ((white_minor <= 1) & (black_minor <= 1)))
+
+    # material plus position score of every position in masks_list, from color's point of view
+    def score_batch(self, masks_list, color):
+        bits = self.expand(np.array(masks_list, dtype=np.uint64))
+        counts = bits.sum(axis=2)
+        both_scores = bits.reshape(len(bits), 768).astype(np.int64) @ self.tables
+        scores = np.where(self.king_endgame(counts), both_scores[:, 1], both_scores[:, 0])
+        return scores if color else -scores
+
+    # material plus position score of a single board from color's point of view
+    def score(self, board, color):
+        return int(self.score_batch([position_masks(board)], color)[0])
@@ -0,0 +1,222 @@
+"""
+Description: Local analysis server; answers HTTP/JSON requests for a position's best move, score and principal
+variation from a pool of warm Alpha Beta worker processes, with a bounded request queue and an LRU result cache
+"""
+
+import argparse
+import collections
+import json
+import multiprocessing
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import chess
+from AlphaBetaAI import AlphaBetaAI, mate_distance
+from IterativeDeepeningAI import IterativeDeepeningAI
+
+MAX_DEPTH = 60  # depth limit of time-limited searches
+
+# AIs of a worker process, kept between requests so their tables stay warm
+worker_ais = {}
+
+
+# the worker's AI for positions with color to move, searched to a fixed depth or with a time limit
+def worker_ai(color, timed, simple):
+    key = (color, timed, simple)
+    if key not in worker_ais:
+        if timed:
+            worker_ais[key] = IterativeDeepeningAI(MAX_DEPTH, color, simple, observers=[], pvs=True,
+                                                    aspiration_window=50)
+        else:
+            worker_ais[key] = AlphaBetaAI(1, color, simple, observers=[], pvs=True)
+    return worker_ais[key]
+
+
+# searches one position in a worker process; task is (fen, depth, seconds, simple), with seconds None for a fixed
+# depth search; returns the answer as a dictionary
+def search_position(task):
+    fen, depth, seconds, simple = task
+    board = chess.Board(fen)
+    result = {"fen": fen, "move": None, "score": None, "mate": None, "pv": [], "depth": 0, "nodes": 0,
+              "seconds": 0.0}
+    if board.is_game_over():
+        result["result"] = board.result()
+        return result
+
+    ai = worker_ai(board.turn, seconds is not None, simple)
+    if seconds is not None:
+        ai.time_limit = seconds
+        ai.max_depth = depth or MAX_DEPTH
+        move = ai.choose_move(board)
+        pv = ai.AI.pv
+    else:
+        ai.depth = depth
+        move = ai.choose_move(board)
+        pv = ai.principal_variation(board, depth)
+        if not pv or pv[0] != move:
+            pv = [move]
+    stats = ai.stats
+    result.update({"move": move.uci(), "score": stats.value, "mate": mate_distance(stats.value),
+                   "pv": [pv_move.uci() for pv_move in pv], "depth": stats.depth, "nodes": stats.nodes,
+                   "seconds": round(stats.seconds, 4)})
+    return result
+
+
+# least recently used cache of answers, shared by the request threads
+class ResultCache:
+    def __init__(self, size):
+        self.size = size
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+    def put(self, key, value):
+        if self.size <= 0:
+            return
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+
+class AnalysisService:
+    def __init__(self, workers, queue_size, cache_size, max_depth, max_seconds, simple=False):
+        self.pool = multiprocessing.Pool(workers)
+        # requests searching or waiting for a worker; further requests are turned away instead of queueing forever
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+        self.cache = ResultCache(cache_size)
+        self.max_depth = max_depth
+        self.max_seconds = max_seconds
+        self.simple = simple
+        self.counter_lock = threading.Lock()  # answered and rejected are counted by every request thread
+        self.answered = 0
+        self.rejected = 0
+
+    # answers a request (a dictionary with fen and depth or time); returns (HTTP status, answer dictionary)
+    def analyze(self, request):
+        fen = request.get("fen", chess.STARTING_FEN)
+        if not isinstance(fen, str):
+            return 400, {"error": "fen must be a string"}
+        try:
+            fen = chess.Board(fen).fen()  # also normalizes the FEN
+            depth = int(request["depth"]) if request.get("depth") is not None else None
+            seconds = float(request["time"]) if request.get("time") is not None else None
+        except (ValueError, TypeError) as error:
+            return 400, {"error": str(error)}
+        if seconds is None:
+            depth = depth or 4
+        if (depth is not None and not 1 <= depth <= self.max_depth) or \
+                (seconds is not None and not 0 < seconds <= self.max_seconds):
+            return 400, {"error": "depth must be 1-" + str(self.max_depth) + " and time at most " +
+                                  str(self.max_seconds) + " seconds"}
+
+        key = (fen, depth, seconds)
+        answer = self.cache.get(key)
+        if answer is not None:
+            return 200, dict(answer, cached=True)
+
+        if not self.slots.acquire(blocking=False):
+            with self.counter_lock:
+                self.rejected += 1
+            return 503, {"error": "all workers busy and the queue is full, try again later"}
+        try:
+            answer = self.pool.apply(search_position, ((fen, depth, seconds, self.simple),))
+        finally:
+            self.slots.release()
+        self.cache.put(key, answer)
+        with self.counter_lock:
+            self.answered += 1
+        return 200, dict(answer, cached=False)
+
+    def status(self):
+        return {"answered": self.answered, "rejected": self.rejected, "cache_entries": len(self.cache.entries),
+                "cache_hits": self.cache.hits, "cache_misses": self.cache.misses}
+
+    def close(self):
+        self.pool.terminate()
+
+
+class AnalysisHandler(BaseHTTPRequestHandler):
+    service = None  # the AnalysisService, set by serve
+
+    # GET /analyze?fen=...&depth=4 (or &time=0.5), GET /status
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/status":
+            self.send_json(200, self.service.status())
+        elif url.path == "/analyze":
+            request = {name: values[0] for name, values in parse_qs(url.query).items()}
+            self.send_json(*self.service.analyze(request))
+        else:
+            self.send_json(404, {"error": "unknown path " + url.path})
+
+    # POST /analyze with a JSON body such as {"fen": "...", "depth": 4}
+    def do_POST(self):
+        if urlparse(self.path).path != "/analyze":
+            self.send_json(404, {"error": "unknown path " + self.path})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except ValueError as error:
+            self.send_json(400, {"error": "invalid JSON: " + str(error)})
+            return
+        if not isinstance(request, dict):
+            self.send_json(400, {"error": "expected a JSON object"})
+            return
+        self.send_json(*self.service.analyze(request))
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 503:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # no line per request
+
+
+# serves requests on host:port until interrupted
+def serve(host, port, service):
+    AnalysisHandler.service = service
+    server = ThreadingHTTPServer((host, port), AnalysisHandler)
+    server.daemon_threads = True
+    print("analysis server listening on http://" + host + ":" + str(server.server_port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve position analysis over HTTP/JSON on localhost.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: localhost only)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(), help="worker processes")
+    parser.add_argument("--queue", type=int, default=32, help="requests that may wait for a worker before 503s")
+    parser.add_argument("--cache", type=int, default=1024, help="answers kept in the LRU cache (0 disables it)")
+    parser.add_argument("--max-depth", type=int, default=6, help="deepest fixed depth a request may ask for")
+    parser.add_argument("--max-time", type=float, default=10.0, help="longest time a request may ask for")
+    parser.add_argument("--simple", action="store_true", help="use the material heuristic instead of Michniewski")
+    args = parser.parse_args()
+
+    serve(args.host, args.port,
+          AnalysisService(args.workers, args.queue, args.cache, args.max_depth, args.max_time, args.simple))
@@ -0,0 +1,163 @@
+"""
+Description: Batch analysis; streams positions from an EPD file or every ply of a PGN file through a pool of Alpha
+Beta workers and appends a best move and score per position to a JSON lines file, in input order
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import threading
+
+import chess
+import chess.pgn
+from AlphaBetaAI import AlphaBetaAI, mate_distance
+from IterativeDeepeningAI import IterativeDeepeningAI
+
+MAX_DEPTH = 60  # depth limit of time-limited searches
+WINDOW = 16  # positions per worker the pool may hold at once, so the input is never read ahead much further
+
+# state of a worker process, set up once by init_worker
+worker_settings = None
+worker_ais = {}  # one AI per side to move, since scores are kept from the AI's own point of view
+
+
+# yields (index, fen) for every position of an EPD file (FEN lines work too), skipping the first offset positions
+def read_epd(path, offset=0):
+    with open(path) as epd_file:
+        index = 0
+        for line in epd_file:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if index >= offset:
+                try:
+                    board = chess.Board(line)
+                except ValueError:
+                    board, operations = chess.Board.from_epd(line)
+                yield index, board.fen()
+            index += 1
+
+
+# yields (index, fen) for the position before every move of every game in a PGN file
+def read_pgn(path, offset=0):
+    with open(path) as pgn_file:
+        index = 0
+        while True:
+            game = chess.pgn.read_game(pgn_file)
+            if game is None:
+                return
+            board = game.board()
+            for move in game.mainline_moves():
+                if index >= offset:
+                    yield index, board.fen()
+                index += 1
+                board.push(move)
+
+
+def read_positions(path, offset=0):
+    if path.lower().endswith(".pgn"):
+        return read_pgn(path, offset)
+    return read_epd(path, offset)
+
+
+def init_worker(depth, time_limit, simple):
+    global worker_settings
+    worker_settings = (depth, time_limit, simple)
+
+
+# the worker's AI for positions with color to move
+def worker_ai(color):
+    if color not in worker_ais:
+        depth, time_limit, simple = worker_settings
+        if time_limit is None:
+            worker_ais[color] = AlphaBetaAI(depth, color, simple, observers=[])
+        else:
+            worker_ais[color] = IterativeDeepeningAI(depth or MAX_DEPTH, color, simple, time_limit=time_limit,
+                                                     observers=[])
+    return worker_ais[color]
+
+
+# searches one position in a worker process and returns its result record
+def analyze_position(task):
+    index, fen = task
+    board = chess.Board(fen)
+    result = {"index": index, "fen": fen, "move": None, "score": None, "mate": None, "depth": 0, "nodes": 0,
+              "seconds": 0.0}
+    if board.is_game_over():
+        return result
+
+    ai = worker_ai(board.turn)
+    move = ai.choose_move(board)
+    stats = ai.stats
+    result.update({"move": move.uci() if move is not None else None, "score": stats.value,
+                   "mate": mate_distance(stats.value), "depth": stats.depth, "nodes": stats.nodes,
+                   "seconds": round(stats.seconds, 4)})
+    return result
+
+
+# index of the first position without a result in output_path (offset when it has none yet), so a run started with
+# --offset resumes where it stopped; a line cut off by a killed run is removed
+def resume_offset(output_path, offset=0):
+    if not os.path.exists(output_path):
+        return offset
+    with open(output_path, "rb+") as output:
+        data = output.read()
+        complete = data.rfind(b"\n") + 1
+        if complete < len(data):
+            output.truncate(complete)
+    lines = data[:complete].splitlines()
+    if not lines:
+        return offset
+    return json.loads(lines[-1])["index"] + 1
+
+
+# yields the items of iterable, waiting for a free slot before each one; the caller releases a slot for every result
+# it takes, so a pool's task feeder never reads more than the semaphore's size ahead
+def bounded(iterable, slots, stopped):
+    for item in iterable:
+        slots.acquire()
+        if stopped.is_set():
+            return
+        yield item
+
+
+# analyzes every position of input_path from offset on, appending one JSON line per position to output_path
+def analyze(input_path, output_path, depth, time_limit, workers, offset=0, simple=False):
+    positions = read_positions(input_path, offset)
+    count = 0
+    # imap keeps every worker busy and the input order; bounded keeps it from reading the whole input ahead
+    slots = threading.Semaphore(WINDOW * workers)
+    stopped = threading.Event()
+    with open(output_path, "a" if offset else "w") as output, \
+            multiprocessing.Pool(workers, initializer=init_worker, initargs=(depth, time_limit, simple)) as pool:
+        try:
+            for result in pool.imap(analyze_position, bounded(positions, slots, stopped)):
+                slots.release()
+                output.write(json.dumps(result) + "\n")
+                output.flush()
+                count += 1
+                if count % (WINDOW * workers) == 0:
+                    print(str(offset + count) + " positions analyzed")
+        finally:
+            stopped.set()
+            slots.release()  # wakes the task feeder if it waits for a slot, so the pool can shut down
+    print(str(offset + count) + " positions analyzed")
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyze every position of an EPD or PGN file.")
+    parser.add_argument("input", help="EPD/FEN file, or PGN file (every ply of every game is analyzed)")
+    parser.add_argument("--output", default="analysis.jsonl", help="JSON lines file the results are written to")
+    parser.add_argument("--depth", type=int, help="fixed search depth (default 4, or the depth limit with --time)")
+    parser.add_argument("--time", type=float, help="seconds per position, searched with iterative deepening")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(), help="worker processes")
+    parser.add_argument("--offset", type=int, default=0, help="skip this many positions (appends to --output)")
+    parser.add_argument("--resume", action="store_true", help="continue after the results already in --output")
+    parser.add_argument("--simple", action="store_true", help="use the material heuristic instead of Michniewski")
+    args = parser.parse_args()
+
+    offset = resume_offset(args.output, args.offset) if args.resume else args.offset
+    depth = args.depth if args.depth is not None or args.time is not None else 4
+    analyze(args.input, args.output, depth, args.time, args.workers, offset, args.simple)
@@ -0,0 +1,235 @@
+"""
+Description: Reproducible engine benchmark; runs every AI over a fixed set of positions at fixed depths, writes the
+results as JSON and compares them against a saved baseline
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import chess
+from MinimaxAI import MinimaxAI
+from AlphaBetaAI import AlphaBetaAI
+from IterativeDeepeningAI import IterativeDeepeningAI
+
+# fixed benchmark positions: opening, middle-game and end-game positions (mostly standard perft positions)
+POSITIONS = [
+    chess.STARTING_FEN,
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+    "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+]
+
+
+# every benchmarked engine: name -> (depth, function building the AI for the side to move)
+# with trace_directory, the Alpha Beta engines append every node they visit to <engine>.trace there (see SearchTrace.py)
+def engines(scale, trace_directory=None):
+    def trace(name):
+        return os.path.join(trace_directory, name + ".trace") if trace_directory is not None else None
+
+    return {
+        "minimax": (2 + scale, lambda depth, color: MinimaxAI(depth, color, observers=[])),
+        "alphabeta_simple": (3 + scale, lambda depth, color: AlphaBetaAI(depth, color, True, observers=[],
+                                                                         trace_path=trace("alphabeta_simple"))),
+        "alphabeta_michniewski": (3 + scale,
+                                  lambda depth, color: AlphaBetaAI(depth, color, False, observers=[],
+                                                                   trace_path=trace("alphabeta_michniewski"))),
+        "iterative_deepening": (3 + scale,
+                                lambda depth, color: IterativeDeepeningAI(depth, color, False, observers=[],
+                                                                          trace_path=trace("iterative_deepening"))),
+    }
+
+
+# runs one engine on one position; returns the chosen move, node count, leaf evaluations, heuristic calls and seconds
+# the AI is closed afterwards, which also writes out its trace file
+def run_engine(make_ai, depth, fen):
+    board = chess.Board(fen)
+    ai = make_ai(depth, board.turn)
+    start = time.perf_counter()
+    move = ai.choose_move(board)
+    seconds = time.perf_counter() - start
+    if hasattr(ai, "close"):  # MinimaxAI holds nothing to close
+        ai.close()
+    return move.uci(), ai.stats.nodes, ai.stats.leaf_evals, ai.stats.heuristic_calls, seconds
+
+
+def run_benchmark(selected, scale, repeat, trace_directory=None):
+    results = []
+    for name, (depth, make_ai) in engines(scale, trace_directory).items():
+        if selected and name not in selected:
+            continue
+        for fen in POSITIONS:
+            best = None
+            for _ in range(repeat):  # searches are deterministic, so only the time varies; keep the fastest run
+                run = run_engine(make_ai, depth, fen)
+                if best is None or run[4] < best[4]:
+                    best = run
+            move, nodes, leaf_evals, heuristic_calls, seconds = best
+            results.append({"engine": name, "fen": fen, "depth": depth, "move": move, "nodes": nodes,
+                            "leaf_evals": leaf_evals, "heuristic_calls": heuristic_calls, "seconds": round(seconds, 4),
+                            "nps": round(nodes / seconds) if seconds else 0})
+            print(name + " | depth " + str(depth) + " | " + move + " | " + str(nodes) + " nodes | " +
+                  str(round(seconds, 3)) + "s | " + str(results[-1]["nps"]) + " nps | " + fen)
+    return results
+
+
+# totals per engine
+def summarize(results):
+    totals = {}
+    for result in results:
+        total = totals.setdefault(result["engine"], {"nodes": 0, "seconds": 0.0})
+        total["nodes"] += result["nodes"]
+        total["seconds"] += result["seconds"]
+    for total in totals.values():
+        total["seconds"] = round(total["seconds"], 4)
+        total["nps"] = round(total["nodes"] / total["seconds"]) if total["seconds"] else 0
+    return totals
+
+
+# returns (regressions, move drifts) of results compared with a baseline run
+def compare(results, baseline, tolerance):
+    regressions = []
+    drifts = []
+    baseline_results = {(result["engine"], result["fen"], result["depth"]): result for result in baseline["results"]}
+
+    for result in results:
+        old = baseline_results.get((result["engine"], result["fen"], result["depth"]))
+        if old is None:
+            continue
+        if result["move"] != old["move"]:
+            drifts.append(result["engine"] + " chose " + result["move"] + " instead of " + old["move"] +
+                          " | " + result["fen"])
+        if result["nodes"] > old["nodes"] * (1 + tolerance):
+            regressions.append(result["engine"] + " searched " + str(result["nodes"]) + " nodes, baseline " +
+                               str(old["nodes"]) + " | " + result["fen"])
+
+    # wall time is compared on engine totals, where timing noise of single positions averages out
+    baseline_totals = summarize(baseline["results"])
+    for engine, total in summarize(results).items():
+        old = baseline_totals.get(engine)
+        if old is not None and total["seconds"] > old["seconds"] * (1 + tolerance):
+            regressions.append(engine + " took " + str(total["seconds"]) + "s in total, baseline " +
+                               str(old["seconds"]) + "s")
+    return regressions, drifts
+
+
+# the search reductions compared by --reductions, as AlphaBetaAI constructor flags
+REDUCTIONS = [
+    ("none", {}),
+    ("null move", {"null_move": True}),
+    ("late move reductions", {"late_move_reductions": True}),
+    ("both", {"null_move": True, "late_move_reductions": True}),
+]
+
+
+# prints nodes, time and chosen moves of AlphaBetaAI (Michniewski) at a fixed depth with each search reduction
+def compare_reductions(depth):
+    rows = []
+    for name, options in REDUCTIONS:
+        nodes = 0
+        seconds = 0.0
+        moves = []
+        for fen in POSITIONS:
+            board = chess.Board(fen)
+            ai = AlphaBetaAI(depth, board.turn, False, observers=[], **options)
+            moves.append(ai.choose_move(board))
+            nodes += ai.stats.nodes
+            seconds += ai.stats.seconds
+        rows.append((name, nodes, seconds, moves))
+
+    base_nodes, base_seconds, base_moves = rows[0][1], rows[0][2], rows[0][3]
+    print("reductions | nodes | seconds | fewer nodes | less time | same move as without reductions")
+    for name, nodes, seconds, moves in rows:
+        same = sum(move == base_move for move, base_move in zip(moves, base_moves))
+        print(name + " | " + str(nodes) + " | " + str(round(seconds, 2)) + " | " +
+              str(round(100 * (1 - nodes / base_nodes), 1)) + "% | " +
+              str(round(100 * (1 - seconds / base_seconds), 1)) + "% | " + str(same) + "/" + str(len(moves)))
+
+
+# prints nodes, time and chosen moves of AlphaBetaAI (Michniewski) at a fixed depth with its usual table and with a
+# persistent table file, first empty (cold) and then reopened by new AIs as a later run would (warm)
+def compare_warm_start(depth):
+    path = os.path.join(tempfile.mkdtemp(), "table.bin")
+    rows = []
+    for name, options in (("in-memory table", {}), ("table file, cold", {"table_path": path}),
+                          ("table file, warm", {"table_path": path})):
+        nodes = 0
+        seconds = 0.0
+        moves = []
+        for fen in POSITIONS:
+            board = chess.Board(fen)
+            ai = AlphaBetaAI(depth, board.turn, False, observers=[], **options)
+            moves.append(ai.choose_move(board))
+            nodes += ai.stats.nodes
+            seconds += ai.stats.seconds
+            ai.close()
+        rows.append((name, nodes, seconds, moves))
+    os.remove(path)
+    os.rmdir(os.path.dirname(path))
+
+    base_nodes, base_seconds, base_moves = rows[0][1], rows[0][2], rows[0][3]
+    print("table | nodes | seconds | fewer nodes | less time | same move as the in-memory table")
+    for name, nodes, seconds, moves in rows:
+        same = sum(move == base_move for move, base_move in zip(moves, base_moves))
+        print(name + " | " + str(nodes) + " | " + str(round(seconds, 2)) + " | " +
+              str(round(100 * (1 - nodes / base_nodes), 1)) + "% | " +
+              str(round(100 * (1 - seconds / base_seconds), 1)) + "% | " + str(same) + "/" + str(len(moves)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the chess AIs over a fixed set of positions.")
+    parser.add_argument("--engines", nargs="*", help="engines to run (default: all)")
+    parser.add_argument("--scale", type=int, default=1, help="extra plies added to every engine's depth")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per position; the fastest one is kept")
+    parser.add_argument("--output", default="benchmark_results.json", help="where to write the results")
+    parser.add_argument("--baseline", help="baseline results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown before failing (0.15 = 15%%)")
+    parser.add_argument("--fail-on-drift", action="store_true", help="also fail when a chosen move changed")
+    parser.add_argument("--reductions", type=int, metavar="DEPTH",
+                        help="only compare null move pruning and late move reductions at this depth")
+    parser.add_argument("--warm-start", type=int, metavar="DEPTH",
+                        help="only compare a cold and a warm persistent table file at this depth")
+    parser.add_argument("--trace", metavar="DIRECTORY",
+                        help="write search traces of the Alpha Beta engines here (read them with SearchTrace.py)")
+    args = parser.parse_args()
+
+    if args.reductions:
+        compare_reductions(args.reductions)
+        sys.exit(0)
+    if args.warm_start:
+        compare_warm_start(args.warm_start)
+        sys.exit(0)
+
+    if args.trace:
+        os.makedirs(args.trace, exist_ok=True)
+    results = run_benchmark(args.engines, args.scale, args.repeat, args.trace)
+    totals = summarize(results)
+    with open(args.output, "w") as output:
+        json.dump({"positions": POSITIONS, "results": results, "totals": totals}, output, indent=2)
+
+    print()
+    for engine, total in totals.items():
+        print(engine + " total | " + str(total["nodes"]) + " nodes | " + str(total["seconds"]) + "s | " +
+              str(total["nps"]) + " nps")
+    print("results written to " + args.output)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions, drifts = compare(results, json.load(baseline_file), args.tolerance)
+        if drifts:
+            print("\nCHOSEN MOVE DRIFT (" + str(len(drifts)) + "):")
+            for drift in drifts:
+                print("  " + drift)
+        if regressions:
+            print("\nPERFORMANCE REGRESSIONS (" + str(len(regressions)) + "):")
+            for regression in regressions:
+                print("  " + regression)
+            sys.exit(1)
+        if drifts and args.fail_on_drift:
+            sys.exit(2)
+        print("\nno regressions against " + args.baseline)
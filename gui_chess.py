@@ -8,8 +8,10 @@ import sys
 import chess, chess.svg
 from RandomAI import RandomAI
 from MinimaxAI import MinimaxAI
+from IterativeDeepeningAI import IterativeDeepeningAI
 from ChessGame import ChessGame
 from HumanPlayer import HumanPlayer
+from AsyncEngine import AsyncEngine
 
 import random
 
@@ -20,8 +22,14 @@ class ChessGui:
         self.player2 = player2
 
         self.game = ChessGame(player1, player2)
-
-        self.app = QApplication(sys.argv)
+        # searches run in worker threads so the event loop keeps running while a player thinks
+        self.engines = [AsyncEngine(player1), AsyncEngine(player2)]
+        self.search = None  # future of the running search
+        self.best_so_far = None  # best move of the running search's last completed iteration (set by its thread)
+        self.shown_move = None  # best move currently drawn as an arrow
+
+        self.app = QApplication.instance() or QApplication(sys.argv)  # Qt allows one application per process
+        self.app.aboutToQuit.connect(self.cancel_search)
         self.svgWidget = QtSvg.QSvgWidget()
         self.svgWidget.setGeometry(50, 50, 400, 400)
         self.svgWidget.show()
@@ -34,20 +42,51 @@ class ChessGui:
 
         self.display_board()
 
-    def display_board(self):
-        svgboard = chess.svg.board(self.game.board)
+    def display_board(self, best_move=None):
+        arrows = [(best_move.from_square, best_move.to_square)] if best_move is not None else []
+        svgboard = chess.svg.board(self.game.board, arrows=arrows)
 
         svgbytes = QByteArray()
         svgbytes.append(svgboard)
         self.svgWidget.load(svgbytes)
 
 
+    # called by the timer: starts a search for the side to move, shows its progress and plays its move once done
     def make_move(self):
-
-        print("making move, white turn " + str(self.game.board.turn))
-
-        self.game.make_move()
-        self.display_board()
+        if self.search is None:
+            if self.game.is_game_over():
+                self.timer.stop()
+                return
+            self.svgWidget.setWindowTitle(("White" if self.game.board.turn else "Black") + " to move")
+            engine = self.engines[1 - int(self.game.board.turn)]
+            self.best_so_far = None
+            self.search = engine.choose_move_async(self.game.board, self.show_progress)
+        elif self.search.done():
+            search = self.search
+            self.search = None
+            if search.cancelled() or search.exception() is not None:
+                # there is no move to play; stop the game instead of raising out of the timer slot
+                self.timer.stop()
+                error = "search cancelled" if search.cancelled() else "search failed: " + repr(search.exception())
+                self.svgWidget.setWindowTitle(error)
+                print(error)
+                return
+            move = search.result()
+            self.shown_move = None
+            self.game.make_move(move)  # Make the move, keeping the player's search statistics
+            self.display_board()
+        elif self.best_so_far != self.shown_move:
+            self.shown_move = self.best_so_far
+            self.display_board(self.shown_move)
+
+    # progress callback, runs in the search thread; the timer picks the move up
+    def show_progress(self, iteration):
+        self.best_so_far = iteration.move
+
+    def cancel_search(self):
+        if self.search is not None:
+            self.search.cancel()
+            self.search = None
 
 
 
@@ -59,14 +98,14 @@ if __name__ == "__main__":
     #player_ronda = RandomAI()
 
     # to do: gui does not work well with HumanPlayer, due to input() use on stdin conflict
-    #   with event loop.
+    #   with event loop (the search thread keeps the board responsive, but moves are still typed on stdin).
 
     player1 = HumanPlayer()
     player2 = RandomAI()
     player3 = MinimaxAI(3, False)  # depth, if color == white
+    player4 = IterativeDeepeningAI(4, False, False)  # shows its best move so far as an arrow while searching
 
-    game = ChessGame(player2, player3)
-    gui = ChessGui(player2, player3)
+    gui = ChessGui(player2, player4)
 
     gui.start()
 
@@ -0,0 +1,78 @@
+"""
+Description: Load test for analysis_server.py; sends analysis requests from many concurrent clients and reports the
+latency percentiles, throughput, rejected requests and cache hits
+"""
+
+import argparse
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from analyze import read_positions
+from benchmark import POSITIONS
+
+
+# sends one request; returns (HTTP status, seconds, answer dictionary or None)
+def send_request(url, fen, depth, seconds):
+    request = {"fen": fen}
+    if depth is not None:
+        request["depth"] = depth
+    if seconds is not None:
+        request["time"] = seconds
+    data = json.dumps(request).encode()
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data, {"Content-Type": "application/json"})) as reply:
+            answer = json.loads(reply.read())
+            status = reply.status
+    except urllib.error.HTTPError as error:
+        answer = None
+        status = error.code
+    return status, time.perf_counter() - start, answer
+
+
+# the value below which fraction of the sorted values lie
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def load_test(url, positions, requests, clients, depth, seconds):
+    fens = [positions[index % len(positions)] for index in range(requests)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as executor:
+        results = list(executor.map(lambda fen: send_request(url, fen, depth, seconds), fens))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for status, latency, answer in results if status == 200)
+    rejected = sum(1 for status, latency, answer in results if status == 503)
+    errors = len(results) - len(latencies) - rejected
+    cached = sum(1 for status, latency, answer in results if answer is not None and answer.get("cached"))
+
+    print(str(requests) + " requests from " + str(clients) + " clients in " + str(round(elapsed, 2)) + "s | " +
+          str(round(len(latencies) / elapsed, 1)) + " answers/s")
+    print("answered: " + str(len(latencies)) + " (cached: " + str(cached) + ") | rejected (503): " + str(rejected) +
+          " | errors: " + str(errors))
+    if latencies:
+        print("latency p50: " + str(round(1000 * percentile(latencies, 0.5), 1)) + "ms | p90: " +
+              str(round(1000 * percentile(latencies, 0.9), 1)) + "ms | p99: " +
+              str(round(1000 * percentile(latencies, 0.99), 1)) + "ms | max: " +
+              str(round(1000 * latencies[-1], 1)) + "ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test a running analysis_server.py.")
+    parser.add_argument("--url", default="http://127.0.0.1:8765/analyze")
+    parser.add_argument("--positions", help="EPD/FEN or PGN file of positions (default: the benchmark positions)")
+    parser.add_argument("--requests", type=int, default=100, help="requests to send in total")
+    parser.add_argument("--clients", type=int, default=8, help="requests in flight at once")
+    parser.add_argument("--depth", type=int, help="plies per search (default: the server's 4), or the deepest "
+                                                  "iteration with --time")
+    parser.add_argument("--time", type=float, help="seconds per search, searched by iterative deepening")
+    args = parser.parse_args()
+
+    positions = [fen for index, fen in read_positions(args.positions)] if args.positions else POSITIONS
+    load_test(args.url, positions, args.requests, args.clients, args.depth, args.time)
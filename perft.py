@@ -0,0 +1,131 @@
+"""
+Description: Perft tool; counts the leaf nodes of the legal move tree of a position to a fixed depth, for measuring
+move generation speed and checking it against the known counts of the standard perft positions
+"""
+
+import argparse
+import sys
+import time
+
+import chess
+from PositionHistory import PositionHistory
+from SearchBoard import SearchBoard, MOVES, PERFT_SUITE, chess_perft
+
+
+class Perft:
+    def __init__(self, cache_size=0):
+        # optional cache of (Zobrist key, depth) -> count in cache_size slots, always replaced
+        self.cache = [None] * cache_size if cache_size > 0 else None
+        self.history = PositionHistory()  # incremental Zobrist keys for the cache
+        self.cache_hits = 0
+
+    # leaf count of board (a SearchBoard) at depth; the moves of the last ply are counted without being made
+    def count(self, board, depth):
+        if depth == 0:
+            return 1
+        cache = self.cache
+        if cache is not None and depth > 1:
+            key = self.history.current()
+            index = (key ^ depth) % len(cache)
+            entry = cache[index]
+            if entry is not None and entry[0] == key and entry[1] == depth:
+                self.cache_hits += 1
+                return entry[2]
+
+        codes = list(board.legal_codes())
+        if depth == 1:
+            return len(codes)
+        total = 0
+        for code in codes:
+            if cache is not None:
+                self.history.push(board, MOVES[code])
+                total += self.count(board, depth - 1)
+                self.history.pop()
+            else:
+                board.push(MOVES[code])
+                total += self.count(board, depth - 1)
+            board.pop()
+
+        if cache is not None:
+            cache[index] = (key, depth, total)
+        return total
+
+    # leaf count below every legal move of a chess.Board, as {move: count}
+    def divide(self, board, depth):
+        search_board = SearchBoard.from_board(board)
+        self.history.reset(search_board)
+        counts = {}
+        for move in search_board.legal_moves:
+            self.history.push(search_board, move)
+            counts[move] = self.count(search_board, depth - 1)
+            search_board.pop()
+            self.history.pop()
+        return counts
+
+    # leaf count of a chess.Board at depth
+    def run(self, board, depth):
+        search_board = SearchBoard.from_board(board)
+        self.history.reset(search_board)
+        return self.count(search_board, depth)
+
+
+# runs perft on fen and prints the count, time and nodes per second; returns the count
+def report(fen, depth, cache_size, divide=False, python_chess=False):
+    board = chess.Board(fen)
+    perft = Perft(cache_size)
+    start = time.perf_counter()
+    if python_chess:
+        count = chess_perft(board, depth)
+    elif divide and depth > 0:
+        counts = perft.divide(board, depth)
+        count = sum(counts.values())
+        for move in sorted(counts, key=lambda move: move.uci()):
+            print(move.uci() + ": " + str(counts[move]))
+    else:
+        count = perft.run(board, depth)
+    seconds = time.perf_counter() - start
+
+    line = "depth " + str(depth) + " | " + str(count) + " nodes | " + str(round(seconds, 3)) + "s | " + \
+        str(round(count / seconds) if seconds else 0) + " nps"
+    if perft.cache is not None:
+        line += " | cache hits: " + str(perft.cache_hits)
+    print(line)
+    return count
+
+
+# checks the standard perft positions up to max_depth; returns the number of wrong counts
+def run_suite(max_depth, cache_size, python_chess=False):
+    failures = 0
+    total_nodes = 0
+    start = time.perf_counter()
+    for fen, expected_counts in PERFT_SUITE:
+        print(fen)
+        for depth, expected in enumerate(expected_counts[:max_depth], start=1):
+            count = report(fen, depth, cache_size, python_chess=python_chess)
+            total_nodes += count
+            if count != expected:
+                failures += 1
+                print("FAIL: expected " + str(expected))
+    seconds = time.perf_counter() - start
+    print("\n" + ("all counts correct" if not failures else str(failures) + " wrong counts") + " | " +
+          str(total_nodes) + " nodes in " + str(round(seconds, 2)) + "s | " + str(round(total_nodes / seconds)) +
+          " nps")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count the leaf nodes of the legal move tree (perft).")
+    parser.add_argument("depth", type=int, help="plies to count (the highest depth checked with --suite)")
+    parser.add_argument("--fen", default=chess.STARTING_FEN, help="position to count from (default: the start)")
+    parser.add_argument("--divide", action="store_true", help="print the count below every root move")
+    parser.add_argument("--cache", type=int, default=0, metavar="ENTRIES",
+                        help="cache subtree counts by Zobrist key and depth in this many slots (default: off)")
+    parser.add_argument("--suite", action="store_true",
+                        help="check the standard perft positions against their known counts instead")
+    parser.add_argument("--python-chess", action="store_true",
+                        help="count with python-chess's Board instead of the search board, for comparison")
+    args = parser.parse_args()
+
+    if args.suite:
+        sys.exit(1 if run_suite(args.depth, args.cache, args.python_chess) else 0)
+    report(args.fen, args.depth, args.cache, args.divide, args.python_chess)
@@ -12,10 +12,15 @@ from HumanPlayer import HumanPlayer
 from RandomAI import RandomAI
 
 if __name__ == "__main__":
+    # --profile samples every AI move and writes call stacks and a summary to profiles/ (see SearchProfiler.py)
+    profile = "--profile" in sys.argv
+    if profile:
+        sys.argv.remove("--profile")
+
     # check length of arguments
     if len(sys.argv) != 5:
         print("expected 5 args; received " + str(len(sys.argv)) +
-              "\nInput: python3 [player1] [depth1] [player2] [depth2]")
+              "\nInput: python3 [player1] [depth1] [player2] [depth2] [--profile]")
         sys.exit()
 
     # check if AI1 uses recursive depth limit
@@ -40,9 +45,9 @@ if __name__ == "__main__":
     elif str(sys.argv[1]).lower() == "random" and not isDepthAI1:
         player1 = RandomAI()
     elif str(sys.argv[1]).lower() == "minimax" and isDepthAI1:
-        player1 = MinimaxAI(int(sys.argv[2]), True)
+        player1 = MinimaxAI(int(sys.argv[2]), True, profile=profile)
     elif str(sys.argv[1]).lower() == "alphabeta" and isDepthAI1:
-        player1 = AlphaBetaAI(int(sys.argv[2]), True)
+        player1 = AlphaBetaAI(int(sys.argv[2]), True, False, profile=profile)
     else:
         print("Usage: 'human' and 'random' with depth -1, 'minimax' and 'alphabeta' with depth > 0")
         sys.exit()
@@ -53,9 +58,9 @@ if __name__ == "__main__":
     elif str(sys.argv[3]).lower() == "random" and not isDepthAI2:
         player2 = RandomAI()
     elif str(sys.argv[3]).lower() == "minimax" and isDepthAI2:
-        player2 = MinimaxAI(int(sys.argv[4]), False)
+        player2 = MinimaxAI(int(sys.argv[4]), False, profile=profile)
     elif str(sys.argv[3]).lower() == "alphabeta" and isDepthAI2:
-        player2 = AlphaBetaAI(int(sys.argv[4]), False, True)
+        player2 = AlphaBetaAI(int(sys.argv[4]), False, True, profile=profile)
     else:
         print("Usage: 'human' and 'random' with depth -1, 'minimax' and 'alphabeta' with depth > 0")
         sys.exit()
@@ -65,3 +70,7 @@ if __name__ == "__main__":
     while not game.is_game_over():
         print(game)
         game.make_move()
+
+    for player in (player1, player2):
+        if getattr(player, "profiler", None) is not None:
+            print(player.profiler.summary())
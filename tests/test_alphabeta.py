@@ -0,0 +1,104 @@
+"""
+Description: Tests of the Alpha Beta search
+"""
+
+import importlib.util
+
+import chess
+import pytest
+from AlphaBetaAI import AlphaBetaAI, DRAW_PENALTY
+from benchmark import POSITIONS
+
+NUMPY = importlib.util.find_spec("numpy") is not None  # the vectorized evaluator needs numpy
+
+
+# hash_size=0 disables the transposition table; every search mode has to run without one
+@pytest.mark.parametrize("options", [{}, {"pvs": True},
+                                     pytest.param({"vectorized": True},
+                                                  marks=pytest.mark.skipif(not NUMPY, reason="needs numpy")),
+                                     {"ordering": "material"},
+                                     {"null_move": True, "late_move_reductions": True}])
+def test_search_without_transposition_table(options):
+    board = chess.Board("r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3")
+    ai = AlphaBetaAI(3, board.turn, False, hash_size=0, observers=[], **options)
+    move = ai.choose_move(board)
+    assert ai.table is None
+    assert move in board.legal_moves
+    assert move == AlphaBetaAI(3, board.turn, False, observers=[], **options).choose_move(board)
+
+
+# a stalemate is bad for the AI whichever side it plays, except with a table shared by both colors, where scores have
+# to be zero-sum
+def test_draw_penalty_only_without_shared_table(tmp_path):
+    board = chess.Board("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1")  # black is stalemated
+    for color in chess.COLORS:
+        ai = AlphaBetaAI(1, color, False, observers=[])
+        ai.history.reset(board)
+        assert ai.michniewski_terminal_score(board, False) == -DRAW_PENALTY
+
+        shared_ai = AlphaBetaAI(1, color, False, observers=[], table_path=str(tmp_path / "table.bin"))
+        shared_ai.history.reset(board)
+        assert shared_ai.michniewski_terminal_score(board, False) == 0
+        shared_ai.close()
+
+
+# nodes and chosen moves of every benchmark position searched to depth with the given AlphaBetaAI flags
+def search_positions(depth, **options):
+    results = []
+    for fen in POSITIONS:
+        board = chess.Board(fen)
+        ai = AlphaBetaAI(depth, board.turn, False, observers=[], **options)
+        results.append((ai.choose_move(board), ai.stats.nodes))
+    return results
+
+
+def test_null_move_saves_nodes():
+    plain = search_positions(4)
+    pruned = search_positions(4, null_move=True)
+    assert [move for move, nodes in pruned] == [move for move, nodes in plain]
+    assert sum(nodes for move, nodes in pruned) < sum(nodes for move, nodes in plain)
+
+
+# moves of the root and of principal variation nodes are never reduced, so a depth 3 search doesn't change at all
+def test_late_move_reductions_save_nodes():
+    assert search_positions(3, late_move_reductions=True) == search_positions(3)
+    plain = search_positions(4)
+    reduced = search_positions(4, late_move_reductions=True)
+    assert all(reduced_nodes <= nodes for (move, nodes), (reduced_move, reduced_nodes) in zip(plain, reduced))
+    assert sum(nodes for move, nodes in reduced) < sum(nodes for move, nodes in plain)
+
+
+# the AI below the root of a null move search, with board one ply into the search
+def null_move_ai(board):
+    ai = AlphaBetaAI(4, board.turn, False, observers=[], null_move=True)
+    ai.root_depth = 4
+    ai.depth = 3
+    return ai
+
+
+def test_null_move_skipped_in_check():
+    board = chess.Board()
+    board.push_uci("e2e4")
+    assert null_move_ai(board).null_move_allowed(board)
+    board = chess.Board("rnbqkbnr/pppp1ppp/8/4p3/6P1/5P2/PPPPP2P/RNBQKBNR b KQkq - 0 2")
+    board.push_uci("d8h4")  # checkmate, but the side to move is in check all the same
+    assert not null_move_ai(board).null_move_allowed(board)
+
+
+def test_null_move_skipped_with_only_pawns():
+    board = chess.Board("4k3/pppp4/8/8/8/8/PPPP4/4KN2 b - - 0 1")
+    board.push_uci("a7a6")
+    assert null_move_ai(board).null_move_allowed(board)  # white still has its knight
+    board.push_uci("f1e3")
+    assert not null_move_ai(board).null_move_allowed(board)  # black has only pawns
+
+
+# principal variation search only saves work: every position gets the same move and score as the default search
+@pytest.mark.parametrize("fen", POSITIONS)
+def test_pvs_keeps_results(fen):
+    board = chess.Board(fen)
+    results = []
+    for pvs in (False, True):
+        ai = AlphaBetaAI(4, board.turn, False, observers=[], pvs=pvs)
+        results.append((ai.choose_move(board), ai.stats.value))
+    assert results[0] == results[1]
@@ -0,0 +1,48 @@
+"""
+Description: Tests of the local analysis server
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import chess
+import pytest
+from analysis_server import AnalysisService
+
+
+@pytest.fixture
+def service():
+    analysis_service = AnalysisService(1, 64, 16, 4, 2.0, simple=True)
+    yield analysis_service
+    analysis_service.close()
+
+
+@pytest.mark.parametrize("request_body", [{"fen": 123}, {"fen": ["a"]}, {"fen": "not a fen"}, {"depth": "deep"},
+                                          {"depth": 9}, {"time": 0}])
+def test_bad_request(service, request_body):
+    status, answer = service.analyze(request_body)
+    assert status == 400
+    assert "error" in answer
+
+
+def test_answer_and_cache(service):
+    status, answer = service.analyze({"depth": 2})
+    assert status == 200 and not answer["cached"]
+    assert chess.Move.from_uci(answer["move"]) in chess.Board().legal_moves
+    status, cached = service.analyze({"fen": chess.STARTING_FEN, "depth": 2})
+    assert status == 200 and cached["cached"] and cached["move"] == answer["move"]
+    assert service.status()["answered"] == 1
+
+
+# every answer from concurrent request threads is counted
+def test_concurrent_requests_are_counted(service):
+    board = chess.Board()
+    fens = []
+    for move in list(board.legal_moves)[:12]:
+        board.push(move)
+        fens.append(board.fen())
+        board.pop()
+    with ThreadPoolExecutor(6) as executor:
+        statuses = [status for status, answer in executor.map(lambda fen: service.analyze({"fen": fen, "depth": 1}),
+                                                               fens)]
+    assert statuses == [200] * len(fens)
+    assert service.status()["answered"] == len(fens)
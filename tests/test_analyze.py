@@ -0,0 +1,61 @@
+"""
+Description: Tests of the batch analysis
+"""
+
+import json
+import threading
+
+import chess
+from analyze import analyze, bounded, resume_offset
+from benchmark import POSITIONS
+
+
+def write_epd(path, count):
+    path.write_text("".join(fen + "\n" for fen in (POSITIONS * count)[:count]))
+
+
+def read_results(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+# results come out in input order with one record per position
+def test_analyze_keeps_input_order(tmp_path):
+    epd = tmp_path / "positions.epd"
+    output = tmp_path / "results.jsonl"
+    write_epd(epd, 5)
+    assert analyze(str(epd), str(output), 1, None, 1) == 5
+    results = read_results(output)
+    assert [result["index"] for result in results] == list(range(5))
+    for result, fen in zip(results, POSITIONS):
+        assert result["fen"] == chess.Board(fen).fen()
+        assert chess.Move.from_uci(result["move"]) in chess.Board(fen).legal_moves
+
+
+# a run started with an offset resumes after the last record it wrote, not after as many records as it wrote
+def test_resume_after_offset(tmp_path):
+    epd = tmp_path / "positions.epd"
+    output = tmp_path / "results.jsonl"
+    write_epd(epd, 6)
+    assert resume_offset(str(output), 2) == 2
+    analyze(str(epd), str(output), 1, None, 1, offset=2)
+    lines = output.read_text().splitlines()
+    output.write_text("\n".join(lines[:2]) + "\n" + lines[2][:10])  # a killed run left half a line behind
+    offset = resume_offset(str(output), 2)
+    assert offset == 4
+    assert output.read_text() == "\n".join(lines[:2]) + "\n"
+    analyze(str(epd), str(output), 1, None, 1, offset=offset)
+    assert [result["index"] for result in read_results(output)] == [2, 3, 4, 5]
+
+
+# the task feeder takes a new item only after a slot has been released for an earlier one
+def test_bounded_waits_for_slots():
+    slots = threading.Semaphore(2)
+    stopped = threading.Event()
+    items = bounded(iter(range(5)), slots, stopped)
+    assert [next(items), next(items)] == [0, 1]
+    assert not slots.acquire(blocking=False)
+    slots.release()
+    assert next(items) == 2
+    stopped.set()
+    slots.release()
+    assert list(items) == []
@@ -0,0 +1,84 @@
+"""
+Description: Tests of the asynchronous engine API and the GUI built on it
+"""
+
+import importlib.util
+import os
+import time
+
+import chess
+import pytest
+from AlphaBetaAI import AlphaBetaAI
+from AsyncEngine import AsyncEngine
+from RandomAI import RandomAI
+
+PYQT = importlib.util.find_spec("PyQt5") is not None
+
+
+def test_move_future():
+    board = chess.Board()
+    future = AsyncEngine(AlphaBetaAI(2, True, False, observers=[])).choose_move_async(board)
+    assert future.result(timeout=60) in board.legal_moves
+
+
+# cancelling the future stops the search
+def test_cancel():
+    ai = AlphaBetaAI(8, True, False, observers=[])
+    engine = AsyncEngine(ai)
+    future = engine.choose_move_async(chess.Board())
+    time.sleep(0.2)
+    assert future.cancel()
+    engine.thread.join(timeout=60)
+    assert not engine.busy()
+    assert future.cancelled()
+
+
+# stopping the player instead of the future still releases everyone waiting on the future
+def test_player_stop_releases_future():
+    ai = AlphaBetaAI(8, True, False, observers=[])
+    engine = AsyncEngine(ai)
+    future = engine.choose_move_async(chess.Board())
+    time.sleep(0.2)
+    ai.stop()
+    engine.thread.join(timeout=60)
+    assert future.done()
+    assert future.cancelled()
+
+
+# the GUI plays through ChessGame.make_move, so the players' search statistics are kept
+@pytest.mark.skipif(not PYQT, reason="needs PyQt5")
+def test_gui_records_move_stats():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from gui_chess import ChessGui
+
+    gui = ChessGui(RandomAI(delay=0, quiet=True), AlphaBetaAI(1, False, True, observers=[]))
+    deadline = time.perf_counter() + 60
+    while len(gui.game.board.move_stack) < 16 and not gui.game.is_game_over() and time.perf_counter() < deadline:
+        gui.make_move()
+        gui.app.processEvents()
+        time.sleep(0.001)
+    gui.cancel_search()
+    assert len(gui.game.board.move_stack) >= 16 or gui.game.is_game_over()
+    assert len(gui.game.move_stats[1]) == len(gui.game.board.move_stack) // 2
+
+
+class FailingPlayer:
+    def choose_move(self, board):
+        raise RuntimeError("no move")
+
+
+# a search that raises stops the game and is reported instead of raising out of the timer slot
+@pytest.mark.skipif(not PYQT, reason="needs PyQt5")
+def test_gui_reports_failed_search():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from gui_chess import ChessGui
+
+    gui = ChessGui(FailingPlayer(), RandomAI(delay=0, quiet=True))
+    gui.start()
+    deadline = time.perf_counter() + 60
+    while gui.timer.isActive() and time.perf_counter() < deadline:
+        gui.app.processEvents()
+        time.sleep(0.001)
+    assert not gui.timer.isActive()
+    assert "no move" in gui.svgWidget.windowTitle()
+    assert not gui.game.board.move_stack
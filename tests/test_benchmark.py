@@ -0,0 +1,19 @@
+"""
+Description: Tests of the engine benchmark
+"""
+
+import os
+
+from benchmark import POSITIONS, run_benchmark
+from SearchTrace import TraceSummary, read_trace
+
+
+# every result records the heuristic calls, and every traced search lands in the engine's trace file
+def test_results_and_traces(tmp_path):
+    results = run_benchmark(["alphabeta_simple"], -1, 1, str(tmp_path))
+    assert len(results) == len(POSITIONS)
+    assert all(result["heuristic_calls"] > 0 for result in results)
+    summary = TraceSummary()
+    summary.add(read_trace(os.path.join(str(tmp_path), "alphabeta_simple.trace")))
+    assert summary.searches == len(POSITIONS)
+    assert summary.nodes == sum(result["nodes"] for result in results)
@@ -0,0 +1,83 @@
+"""
+Description: Differential tests of the Michniewski evaluation backends against the full board scan
+"""
+
+import importlib.util
+import random
+
+import chess
+import pytest
+from AlphaBetaAI import AlphaBetaAI
+from IncrementalEvaluator import IncrementalEvaluator
+from SearchBoard import SearchBoard, PERFT_SUITE
+
+PLAYOUTS = 40
+PLIES = 80
+NUMPY = importlib.util.find_spec("numpy") is not None  # the vectorized evaluator needs numpy
+
+
+# AIs evaluating by scanning every square (the evaluation without any backend), by color
+FULL_SCAN_AIS = {color: AlphaBetaAI(1, color, False, incremental=False, hash_size=0, observers=[])
+                 for color in chess.COLORS}
+
+
+# material plus position of board for color from the full scan
+def full_scan_score(board, color):
+    ai = FULL_SCAN_AIS[color]
+    return ai.michniewski_player_material_score(board, color) - \
+        ai.michniewski_player_material_score(board, not color) + ai.michniewski_player_position_score(board, color)
+
+
+@pytest.mark.parametrize("fen", [fen for fen, counts in PERFT_SUITE])
+def test_incremental_evaluator_matches_full_scan(fen):
+    rng = random.Random(fen)
+    for _ in range(PLAYOUTS):
+        board = SearchBoard.from_board(chess.Board(fen))
+        reference = chess.Board(fen)
+        evaluator = IncrementalEvaluator()
+        evaluator.reset(board)
+        for _ in range(PLIES):
+            moves = list(board.legal_moves)
+            if not moves:
+                break
+            # take back a move now and then, so the restored totals are checked too
+            if board.move_stack and rng.random() < 0.2:
+                evaluator.pop()
+                board.pop()
+                reference.pop()
+            else:
+                move = rng.choice(moves)
+                evaluator.push(board, move)
+                board.push(move)
+                reference.push(move)
+            for color in chess.COLORS:
+                assert evaluator.score(color) == full_scan_score(reference, color), reference.fen()
+
+
+# the NumPy backend scores single boards and whole batches like the full scan
+@pytest.mark.skipif(not NUMPY, reason="needs numpy")
+@pytest.mark.parametrize("fen", [fen for fen, counts in PERFT_SUITE])
+def test_vectorized_evaluator_matches_full_scan(fen):
+    from VectorizedEvaluator import VectorizedEvaluator, position_masks
+    vectorizer = VectorizedEvaluator()
+    rng = random.Random(fen)
+    for _ in range(PLAYOUTS // 4):
+        board = chess.Board(fen)
+        for _ in range(PLIES):
+            moves = list(board.legal_moves)
+            if not moves:
+                break
+            board.push(rng.choice(moves))
+            for color in chess.COLORS:
+                assert vectorizer.score(board, color) == full_scan_score(board, color), board.fen()
+
+            if len(board.move_stack) % 8:
+                continue  # a batch of every child now and then
+            children = []
+            for move in board.legal_moves:
+                board.push(move)
+                children.append(board.copy(stack=False))
+                board.pop()
+            if children:
+                scores = vectorizer.score_batch([position_masks(child) for child in children], board.turn).tolist()
+                assert scores == [full_scan_score(child, board.turn) for child in children], board.fen()
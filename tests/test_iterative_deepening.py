@@ -0,0 +1,103 @@
+"""
+Description: Tests of the Iterative Deepening AI
+"""
+
+import time
+
+import chess
+import pytest
+from AlphaBetaAI import SearchAborted
+from benchmark import POSITIONS
+from IterativeDeepeningAI import IterativeDeepeningAI
+from TranspositionTable import EXACT, zobrist_key
+
+
+def abort_iteration(board, values, stats=None):
+    raise SearchAborted()
+
+
+# a search stopped before its first iteration completes still returns a legal move
+def test_stopped_first_iteration_returns_legal_move(monkeypatch):
+    ai = IterativeDeepeningAI(4, chess.WHITE, False, observers=[])
+    monkeypatch.setattr(ai, "search_iteration", abort_iteration)
+    board = chess.Board()
+    assert ai.choose_move(board) in board.legal_moves
+
+
+# the fallback is the transposition table's move when there is one
+def test_stopped_first_iteration_prefers_table_move(monkeypatch):
+    ai = IterativeDeepeningAI(4, chess.WHITE, False, observers=[])
+    monkeypatch.setattr(ai, "search_iteration", abort_iteration)
+    board = chess.Board()
+    move = chess.Move.from_uci("g1f3")
+    ai.AI.table.store(zobrist_key(board), 1, 0, EXACT, move)
+    assert ai.choose_move(board) == move
+
+
+# aspiration windows only save work: every position gets the same move and score as with the full window
+@pytest.mark.parametrize("fen", POSITIONS)
+def test_aspiration_window_keeps_results(fen):
+    board = chess.Board(fen)
+    results = []
+    for window in (None, 50):
+        ai = IterativeDeepeningAI(4, board.turn, False, observers=[], pvs=True, aspiration_window=window)
+        results.append((ai.choose_move(board), ai.stats.value))
+    assert results[0] == results[1]
+
+
+def test_time_budget():
+    ai = IterativeDeepeningAI(4, chess.WHITE, False, observers=[])
+    assert ai.time_budget() is None
+    ai.time_limit = 2.0
+    assert ai.time_budget() == 2.0
+    ai.time_limit = None
+    ai.clock, ai.increment = 60.0, 1.0
+    assert ai.time_budget() == pytest.approx(60.0 / 30 + 0.8)
+    ai.time_limit = 1.0
+    assert ai.time_budget() == 1.0  # the smaller of both budgets
+    ai.time_limit = None
+    ai.clock, ai.increment = 1.0, 10.0
+    assert ai.time_budget() == 0.5  # never more than half the clock
+
+
+# the search stops at its time budget, returns the move of its last completed iteration and charges the clock
+def test_search_stops_at_time_budget():
+    board = chess.Board(POSITIONS[2])
+    ai = IterativeDeepeningAI(60, board.turn, False, observers=[], clock=6.0, increment=0.1)
+    budget = ai.time_budget()
+    start = time.perf_counter()
+    move = ai.choose_move(board)
+    elapsed = time.perf_counter() - start
+    assert move in board.legal_moves
+    assert elapsed < budget + 1.0
+    assert 1 <= ai.stats.depth < 60
+    assert ai.clock == pytest.approx(6.0 + 0.1 - elapsed, abs=0.05)
+
+
+# the AI after its first move from the starting position, pondering on the reply it expects; returns the AI, the
+# board after its move and the expected reply
+def pondering_ai():
+    board = chess.Board()
+    ai = IterativeDeepeningAI(3, chess.WHITE, False, observers=[], ponder=True)
+    board.push(ai.choose_move(board))
+    assert ai.ponder_move is not None
+    ai.ponder_thread.join(timeout=60)  # max_depth 3: the ponder search finishes on its own
+    return ai, board, ai.ponder_move
+
+
+def test_ponder_hit():
+    ai, board, reply = pondering_ai()
+    board.push(reply)
+    move = ai.choose_move(board)
+    assert move in board.legal_moves
+    assert ai.stats.ponder_depth == 3 and ai.stats.depth == 3
+    ai.close()
+
+
+def test_ponder_miss():
+    ai, board, reply = pondering_ai()
+    board.push(next(move for move in board.legal_moves if move != reply))
+    move = ai.choose_move(board)
+    assert move in board.legal_moves
+    assert ai.stats.ponder_depth is None and ai.stats.depth == 3
+    ai.close()
@@ -0,0 +1,43 @@
+"""
+Description: Tests of the Monte Carlo tree search AI
+"""
+
+import random
+
+import chess
+import pytest
+from benchmark import POSITIONS
+from MCTSAI import MCTSAI
+
+
+@pytest.mark.parametrize("fen, mate", [("6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1", "a1a8"),
+                                       ("r5k1/5ppp/8/8/8/8/5PPP/6K1 b - - 0 1", "a8a1")])
+def test_mate_in_one(fen, mate):
+    board = chess.Board(fen)
+    ai = MCTSAI(board.turn, playouts=1000, observers=[])
+    ai.rng = random.Random(1)
+    assert ai.choose_move(board) == chess.Move.from_uci(mate)
+    assert ai.stats.value > 0.9
+    assert ai.stats.playouts == 1000
+
+
+# playouts are seeded per leaf, so a pool of workers grows exactly the tree a single process grows
+def test_workers_grow_the_same_tree():
+    board = chess.Board(POSITIONS[1])
+    results = []
+    for workers in (1, 2):
+        ai = MCTSAI(board.turn, playouts=256, workers=workers, batch_size=16, observers=[])
+        ai.rng = random.Random(7)
+        try:
+            move = ai.choose_move(board)
+        finally:
+            ai.close()
+        results.append((move, ai.stats.value, ai.stats.nodes, list(ai.visits)))
+    assert results[0] == results[1]
+    assert results[0][0] in board.legal_moves
+
+
+def test_time_limit():
+    ai = MCTSAI(chess.WHITE, playouts=None, time_limit=0.2, observers=[])
+    assert ai.choose_move(chess.Board()) in chess.Board().legal_moves
+    assert ai.stats.playouts > 0 and ai.stats.seconds < 2.0
@@ -0,0 +1,79 @@
+"""
+Description: Tests of the move ordering
+"""
+
+import chess
+from MoveOrderer import MoveOrderer
+
+# white's e4 pawn can take the queen on d5 or the rook on f5, and its queen can take the queen as well
+CAPTURES_FEN = "4k3/8/8/3q1r2/4P3/8/8/3QK3 w - - 0 1"
+
+
+def ordered(orderer, board, ply=0, hash_move=None):
+    return [move.uci() for move in orderer.order(board, list(board.legal_moves), ply, hash_move)]
+
+
+def test_captures_by_mvv_lva():
+    board = chess.Board(CAPTURES_FEN)
+    assert ordered(MoveOrderer(), board)[:3] == ["e4d5", "d1d5", "e4f5"]
+
+
+def test_hash_move_first():
+    board = chess.Board(CAPTURES_FEN)
+    assert ordered(MoveOrderer(), board, hash_move=chess.Move.from_uci("e1e2"))[:2] == ["e1e2", "e4d5"]
+
+
+def test_promotions_with_captures():
+    board = chess.Board("1r2k3/P7/8/8/8/8/8/4K3 w - - 0 1")
+    moves = ordered(MoveOrderer(), board)
+    assert moves[0] == "a7b8q"  # capture and queen promotion
+    assert moves.index("a7a8q") < moves.index("a7a8n") < moves.index("e1e2")
+
+
+# killers come after the captures and before the other quiet moves, but only at the ply they cut off
+def test_killer_moves():
+    board = chess.Board(CAPTURES_FEN)
+    orderer = MoveOrderer()
+    first, second = chess.Move.from_uci("e1e2"), chess.Move.from_uci("d1b3")
+    orderer.record_cutoff(board, second, 3, 1, 5)
+    orderer.record_cutoff(board, first, 3, 1, 5)
+    moves = ordered(orderer, board, 3)
+    assert moves[3:5] == ["e1e2", "d1b3"]
+    assert ordered(orderer, board, 4)[3:5] != ["e1e2", "d1b3"]
+    assert orderer.cutoffs == 2 and orderer.first_move_cutoffs == 0
+
+
+# a capture causing a cutoff doesn't become a killer or gain history
+def test_capture_cutoff_is_not_a_killer():
+    board = chess.Board(CAPTURES_FEN)
+    orderer = MoveOrderer()
+    orderer.record_cutoff(board, chess.Move.from_uci("e4f5"), 0, 3, 0)
+    assert orderer.killers[0] == [None, None]
+    assert not any(orderer.history)
+    assert orderer.first_move_cutoffs == 1
+
+
+# quiet moves that caused cutoffs deeper in the tree are tried first, after checks
+def test_history_orders_quiet_moves():
+    board = chess.Board()
+    orderer = MoveOrderer()
+    orderer.record_cutoff(board, chess.Move.from_uci("b1c3"), 5, 1, 2)
+    orderer.record_cutoff(board, chess.Move.from_uci("g1f3"), 6, 3, 2)
+    moves = ordered(orderer, board, 0)
+    assert moves[:2] == ["g1f3", "b1c3"]
+
+    board = chess.Board("4k3/8/8/8/8/8/8/R3K3 w - - 0 1")  # a1a8 is the only check
+    orderer = MoveOrderer()
+    orderer.record_cutoff(board, chess.Move.from_uci("e1d2"), 5, 4, 2)
+    assert ordered(orderer, board, 0)[:2] == ["a1a8", "e1d2"]
+
+
+# a new search forgets the killers but keeps half of the history
+def test_new_search():
+    board = chess.Board()
+    orderer = MoveOrderer()
+    move = chess.Move.from_uci("g1f3")
+    orderer.record_cutoff(board, move, 2, 4, 1)
+    orderer.new_search()
+    assert orderer.killers[2] == [None, None]
+    assert orderer.history[orderer.history_index(chess.WHITE, move)] == 8
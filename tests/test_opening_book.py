@@ -0,0 +1,69 @@
+"""
+Description: Tests of the Polyglot opening book
+"""
+
+import struct
+
+import chess
+import chess.polyglot
+from AlphaBetaAI import AlphaBetaAI
+from IterativeDeepeningAI import IterativeDeepeningAI
+from OpeningBook import OpeningBook
+
+
+# Polyglot move code: to square in the low bits, from square above it
+def polyglot_move(uci):
+    move = chess.Move.from_uci(uci)
+    return move.to_square | move.from_square << 6
+
+
+# writes a Polyglot book of (position moves played, book move, weight) entries, sorted by key like the format needs
+def write_book(path, entries):
+    records = []
+    for played, uci, weight in entries:
+        board = chess.Board()
+        for move in played:
+            board.push_uci(move)
+        records.append(struct.pack(">QHHI", chess.polyglot.zobrist_hash(board), polyglot_move(uci), weight, 0))
+    with open(path, "wb") as book_file:
+        book_file.write(b"".join(sorted(records)))
+
+
+def make_book(tmp_path):
+    path = str(tmp_path / "book.bin")
+    write_book(path, [([], "e2e4", 10), ([], "d2d4", 1), (["e2e4"], "c7c5", 5)])
+    return path
+
+
+def test_heaviest_move_without_random_choice(tmp_path):
+    book = OpeningBook(make_book(tmp_path), random_choice=False)
+    assert book.probe(chess.Board()) == chess.Move.from_uci("e2e4")
+    board = chess.Board()
+    board.push_uci("e2e4")
+    assert book.probe(board) == chess.Move.from_uci("c7c5")
+    board.push_uci("c7c5")
+    assert book.probe(board) is None
+    assert book.hits == 2 and book.misses == 1 and book.hit_rate == 2 / 3
+    book.close()
+
+
+def test_weighted_choice_stays_in_book(tmp_path):
+    book = OpeningBook(make_book(tmp_path))
+    moves = {book.probe(chess.Board()) for _ in range(50)}
+    assert moves <= {chess.Move.from_uci("e2e4"), chess.Move.from_uci("d2d4")}
+    book.close()
+
+
+# the AIs play a book move without searching, and search once the book runs out
+def test_ais_play_book_moves(tmp_path):
+    book = OpeningBook(make_book(tmp_path), random_choice=False)
+    for ai in (AlphaBetaAI(2, chess.WHITE, False, observers=[], book=book),
+               IterativeDeepeningAI(2, chess.WHITE, False, observers=[], book=book)):
+        assert ai.choose_move(chess.Board()) == chess.Move.from_uci("e2e4")
+        assert ai.stats.book and ai.stats.nodes == 0
+        board = chess.Board()
+        board.push_uci("d2d4")
+        board.push_uci("d7d5")
+        assert ai.choose_move(board) in board.legal_moves
+        assert not ai.stats.book and ai.stats.nodes > 0
+    book.close()
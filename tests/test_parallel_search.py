@@ -0,0 +1,35 @@
+"""
+Description: Tests of the parallel Alpha Beta search
+"""
+
+import chess
+import pytest
+from AlphaBetaAI import AlphaBetaAI, SearchAborted
+from benchmark import POSITIONS
+
+
+# the root moves split over two workers give the same move and score as the sequential search
+@pytest.mark.parametrize("pvs", [False, True])
+def test_same_result_as_sequential_search(pvs):
+    for fen in POSITIONS:
+        board = chess.Board(fen)
+        sequential = AlphaBetaAI(3, board.turn, False, observers=[], pvs=pvs)
+        parallel = AlphaBetaAI(3, board.turn, False, observers=[], pvs=pvs, workers=2)
+        try:
+            assert parallel.choose_move(board) == sequential.choose_move(board)
+            assert parallel.best_value == sequential.best_value
+            assert parallel.stats.nodes > 1  # the workers' nodes are counted too
+        finally:
+            parallel.close()
+
+
+def test_node_limit_aborts_workers():
+    board = chess.Board(POSITIONS[2])
+    ai = AlphaBetaAI(5, board.turn, False, observers=[], workers=2)
+    ai.max_nodes = 500
+    try:
+        with pytest.raises(SearchAborted):
+            ai.minimax_decision(board)
+    finally:
+        ai.close()
+    assert ai.parallel is None
@@ -0,0 +1,88 @@
+"""
+Description: Tests of the transposition table kept in a memory-mapped file
+"""
+
+import multiprocessing
+
+import chess
+from AlphaBetaAI import AlphaBetaAI
+from PersistentTable import ENTRY, HEADER, PersistentTable, pack_data
+from TranspositionTable import EXACT, LOWER_BOUND
+
+SIZE_MB = 0.001  # a few dozen buckets, so the writers keep overwriting each other
+KEYS = [0x9E3779B97F4A7C15 * index & 0xFFFFFFFFFFFFFFFF for index in range(1, 200)]
+MOVE = chess.Move.from_uci("e2e4")
+
+
+# the entry writer number writes for key: its depth and score identify the writer
+def written_entry(key, writer):
+    return key, 1 + writer, 1000 * writer + key % 997, EXACT, MOVE
+
+
+def write_entries(path, writer, rounds):
+    table = PersistentTable(path, SIZE_MB)
+    for _ in range(rounds):
+        for key in KEYS:
+            table.store(*written_entry(key, writer))
+    table.close()
+
+
+# two processes writing the same buckets at once never leave an entry that reads back mixed
+def test_concurrent_writers_leave_consistent_entries(tmp_path):
+    path = str(tmp_path / "table.bin")
+    PersistentTable(path, SIZE_MB).close()
+    writers = [multiprocessing.Process(target=write_entries, args=(path, writer, 200)) for writer in (1, 2)]
+    for writer in writers:
+        writer.start()
+
+    table = PersistentTable(path, SIZE_MB)
+    while any(writer.is_alive() for writer in writers):
+        for key in KEYS:
+            entry = table.probe(key)
+            assert entry is None or entry in (written_entry(key, 1), written_entry(key, 2))
+    for writer in writers:
+        writer.join()
+        assert writer.exitcode == 0
+    for key in KEYS:
+        entry = table.probe(key)
+        assert entry is None or entry in (written_entry(key, 1), written_entry(key, 2))
+    table.close()
+
+
+# an entry whose key and data halves come from different writes reads as a miss
+def test_torn_entry_is_a_miss(tmp_path):
+    table = PersistentTable(str(tmp_path / "table.bin"), SIZE_MB)
+    key = KEYS[0]
+    table.store(key, 3, 50, EXACT, MOVE)
+    assert table.probe(key) == (key, 3, 50, EXACT, MOVE)
+    offset = HEADER.size + (key % table.num_buckets) * 2 * ENTRY.size
+    other_data = pack_data(4, -20, LOWER_BOUND, None, table.generation)
+    ENTRY.pack_into(table.map, offset, key ^ pack_data(3, 50, EXACT, MOVE, table.generation), other_data)
+    assert table.probe(key) is None
+    table.close()
+
+
+# a deeper entry keeps its slot during its own generation, but entries of an older run are replaced first
+def test_older_generation_is_replaced(tmp_path):
+    path = str(tmp_path / "table.bin")
+    table = PersistentTable(path, SIZE_MB)
+    deep, shallow, later = (5 + index * table.num_buckets for index in range(3))
+    table.store(deep, 10, 0, EXACT, MOVE)
+    table.store(shallow, 1, 0, EXACT, MOVE)  # same bucket: goes to the always-replace slot
+    assert table.probe(deep) is not None and table.probe(shallow) is not None
+    table.close()
+
+    table = PersistentTable(path, SIZE_MB)
+    assert table.probe(deep) is not None  # the file keeps the entries between runs
+    table.store(later, 1, 0, EXACT, MOVE)
+    assert table.probe(deep) is None
+    assert table.probe(shallow) is not None and table.probe(later) is not None
+    table.close()
+
+
+def test_ai_close_closes_table_file(tmp_path):
+    ai = AlphaBetaAI(2, chess.WHITE, False, observers=[], table_path=str(tmp_path / "table.bin"))
+    ai.choose_move(chess.Board())
+    table = ai.table
+    ai.close()
+    assert table.map.closed and ai.table is None
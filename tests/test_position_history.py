@@ -0,0 +1,74 @@
+"""
+Description: Tests of the incrementally updated Zobrist keys of PositionHistory against python-chess's Polyglot hash
+"""
+
+import random
+
+import chess
+import chess.polyglot
+import pytest
+from PositionHistory import PositionHistory
+from SearchBoard import SearchBoard, PERFT_SUITE
+
+PLAYOUTS = 30
+PLIES = 100
+
+
+# walks random moves on board (a chess.Board or SearchBoard), taking some back and passing now and then, and checks
+# the key after every push and pop; the position itself is followed on a chess.Board for the reference hash
+def check_random_walk(board, fen, rng):
+    reference = chess.Board(fen)
+    history = PositionHistory()
+    history.reset(board)
+    assert history.current() == chess.polyglot.zobrist_hash(reference)
+    for _ in range(PLIES):
+        moves = list(board.legal_moves)
+        if not moves:
+            break
+        roll = rng.random()
+        if board.move_stack and roll < 0.2:
+            board.pop()
+            history.pop()
+            reference.pop()
+        elif roll < 0.25 and not board.is_check():
+            history.push_null(board)
+            reference.push(chess.Move.null())
+        else:
+            move = rng.choice(moves)
+            history.push(board, move)
+            reference.push(move)
+        assert history.current() == chess.polyglot.zobrist_hash(reference), reference.fen()
+
+
+@pytest.mark.parametrize("fen", [fen for fen, counts in PERFT_SUITE])
+def test_keys_on_chess_board(fen):
+    rng = random.Random(fen)
+    for _ in range(PLAYOUTS):
+        check_random_walk(chess.Board(fen), fen, rng)
+
+
+@pytest.mark.parametrize("fen", [fen for fen, counts in PERFT_SUITE])
+def test_keys_on_search_board(fen):
+    rng = random.Random(fen)
+    for _ in range(PLAYOUTS):
+        check_random_walk(SearchBoard.from_board(chess.Board(fen)), fen, rng)
+
+
+# reset rebuilds the keys of the positions since the last capture or pawn move from the board's move stack
+def test_reset_from_played_moves():
+    board = chess.Board()
+    for uci in ["e2e4", "g8f6", "g1f3", "f6g8", "f3g1"]:
+        board.push_uci(uci)
+    history = PositionHistory()
+    history.reset(board)
+    keys = []
+    replay = board.copy()
+    for _ in range(replay.halfmove_clock + 1):
+        keys.append(chess.polyglot.zobrist_hash(replay))
+        replay.pop()
+    assert history.keys == keys[::-1]
+
+    # g8f6 g1f3 brings back the position after e2e4 g8f6 g1f3
+    history.push(board, chess.Move.from_uci("g8f6"))
+    history.push(board, chess.Move.from_uci("g1f3"))
+    assert history.repetitions(board) == 2
@@ -0,0 +1,54 @@
+"""
+Description: Tests of SearchBoard's move generation against python-chess and the known perft counts
+"""
+
+import random
+
+import chess
+import pytest
+from perft import Perft
+from SearchBoard import SearchBoard, PERFT_SUITE, chess_perft
+
+MAX_DEPTH = 3  # deepest perft count checked for every suite position
+
+
+@pytest.mark.parametrize("fen, expected_counts", PERFT_SUITE)
+def test_perft_suite(fen, expected_counts):
+    for depth, expected in enumerate(expected_counts[:MAX_DEPTH], start=1):
+        assert SearchBoard.from_board(chess.Board(fen)).perft(depth) == expected
+        assert Perft(1 << 12).run(chess.Board(fen), depth) == expected  # perft.py, with its subtree cache
+
+
+# the count below every root move agrees with python-chess, so a wrong count shows the move it comes from
+@pytest.mark.parametrize("fen, expected_counts", PERFT_SUITE)
+def test_divide_matches_python_chess(fen, expected_counts):
+    board = chess.Board(fen)
+    counts = Perft().divide(board, 2)
+    assert set(counts) == set(board.legal_moves)
+    for move, count in counts.items():
+        board.push(move)
+        assert count == chess_perft(board, 1), move.uci()
+        board.pop()
+
+
+# legal moves, check, game state and FEN stay equal to python-chess along random games with moves taken back
+@pytest.mark.parametrize("fen, expected_counts", PERFT_SUITE)
+def test_random_games_match_python_chess(fen, expected_counts):
+    rng = random.Random(fen)
+    for _ in range(20):
+        board = SearchBoard.from_board(chess.Board(fen))
+        reference = chess.Board(fen)
+        for _ in range(100):
+            assert set(board.legal_moves) == set(reference.legal_moves), reference.fen()
+            assert board.is_check() == reference.is_check()
+            assert board.position().board_fen() == reference.board_fen()
+            moves = list(reference.legal_moves)
+            if not moves:
+                break
+            if reference.move_stack and rng.random() < 0.2:
+                board.pop()
+                reference.pop()
+            else:
+                move = rng.choice(moves)
+                board.push(move)
+                reference.push(move)
@@ -0,0 +1,51 @@
+"""
+Description: Tests of the sampling profiler
+"""
+
+import os
+import time
+
+import chess
+from AlphaBetaAI import AlphaBetaAI
+from SearchProfiler import CHESS_DIRECTORY, PYTHON_CHESS, SEARCH, SearchProfiler
+
+
+def busy_evaluate(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+    return 42
+
+
+def test_categories():
+    chess_file = os.path.join(CHESS_DIRECTORY, "__init__.py")
+    assert SearchProfiler.category((("AlphaBetaAI.py", "max_value"), ("AlphaBetaAI.py", "evaluate"),
+                                    (chess_file, "pieces"))) == "michniewski_heuristic/evaluation"
+    assert SearchProfiler.category((("AlphaBetaAI.py", "max_value"), ("AlphaBetaAI.py", "order_moves"),
+                                    ("AlphaBetaAI.py", "evaluate"))) == "move_reorderer/order_moves"
+    assert SearchProfiler.category((("AlphaBetaAI.py", "max_value"), (chess_file, "legal_moves"))) == PYTHON_CHESS
+    assert SearchProfiler.category((("AlphaBetaAI.py", "max_value"),)) == SEARCH
+
+
+# the sampled stacks of a call are written in collapsed form, and the summary counts them
+def test_profile_writes_stacks_and_summary(tmp_path):
+    profiler = SearchProfiler("test", str(tmp_path))
+    assert profiler.profile(busy_evaluate, 0.2) == 42
+    assert profiler.moves == 1 and profiler.samples > 10
+    with open(os.path.join(str(tmp_path), "test_move001.folded")) as folded:
+        lines = folded.read().splitlines()
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == profiler.samples
+    assert any("busy_evaluate" in line for line in lines)
+    with open(os.path.join(str(tmp_path), "test_summary.txt")) as summary:
+        assert summary.readline().startswith("test: " + str(profiler.samples) + " samples over 1 moves")
+
+
+# the profile flag wraps choose_move; the move is the same as without it
+def test_profiled_ai(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    board = chess.Board()
+    ai = AlphaBetaAI(3, chess.WHITE, False, observers=[], profile=True)
+    assert ai.choose_move(board) == AlphaBetaAI(3, chess.WHITE, False, observers=[]).choose_move(board)
+    assert ai.profiler.moves == 1
+    assert os.path.exists(os.path.join("profiles", "alphabeta_white_move001.folded"))
+    assert os.path.exists(os.path.join("profiles", "alphabeta_white_summary.txt"))
@@ -0,0 +1,71 @@
+"""
+Description: Tests of the search statistics and their observers
+"""
+
+import chess
+from AlphaBetaAI import AlphaBetaAI
+from IterativeDeepeningAI import IterativeDeepeningAI
+from MinimaxAI import MinimaxAI
+from SearchStats import PrintObserver, SearchObserver, SearchStats, default_observers
+
+
+# records every event it is told about
+class RecordingObserver(SearchObserver):
+    def __init__(self):
+        self.events = []
+
+    def on_iteration(self, stats, iteration):
+        self.events.append(("iteration", iteration.depth))
+
+    def on_abort(self, stats, depth, elapsed):
+        self.events.append(("abort", depth))
+
+    def on_move(self, stats):
+        self.events.append(("move", stats.move))
+
+
+def test_iterations_then_move():
+    observer = RecordingObserver()
+    ai = IterativeDeepeningAI(3, chess.WHITE, False, observers=[observer])
+    move = ai.choose_move(chess.Board())
+    assert observer.events == [("iteration", 1), ("iteration", 2), ("iteration", 3), ("move", move)]
+    assert [iteration.depth for iteration in ai.stats.iterations] == [1, 2, 3]
+    assert ai.stats.nodes == sum(iteration.nodes for iteration in ai.stats.iterations)
+
+
+def test_abort_is_reported():
+    observer = RecordingObserver()
+    ai = IterativeDeepeningAI(60, chess.WHITE, False, observers=[observer], node_limit=3000)
+    ai.choose_move(chess.Board())
+    assert observer.events[-2] == ("abort", ai.stats.aborted_depth)
+    assert observer.events[-1][0] == "move"
+
+
+def test_every_engine_reports_its_move():
+    for ai in (MinimaxAI(2, chess.WHITE, observers=[RecordingObserver()]),
+               AlphaBetaAI(2, chess.WHITE, False, observers=[RecordingObserver()])):
+        move = ai.choose_move(chess.Board())
+        assert ai.observers[0].events == [("move", move)]
+        assert ai.stats.move == move and ai.stats.nodes > 0 and ai.stats.seconds > 0
+
+
+# without observers the AIs print their usual progress lines, and an empty list keeps them quiet
+def test_default_observers(capsys):
+    assert isinstance(default_observers(None)[0], PrintObserver)
+    assert default_observers([]) == []
+    AlphaBetaAI(2, chess.WHITE, False).choose_move(chess.Board())
+    assert "Alpha Beta AI recommending move" in capsys.readouterr().out
+    AlphaBetaAI(2, chess.WHITE, False, observers=[]).choose_move(chess.Board())
+    assert capsys.readouterr().out == ""
+
+
+def test_derived_statistics():
+    stats = SearchStats("alphabeta", 2)
+    assert stats.first_move_cutoff_rate == 0.0 and stats.nps == 0.0 and stats.eval_time_share is None
+    stats.cutoffs_by_ply = [3, 1]
+    stats.first_move_cutoffs = 3
+    stats.nodes, stats.seconds, stats.eval_seconds = 400, 2.0, 0.5
+    assert stats.first_move_cutoff_rate == 0.75
+    assert stats.nps == 200.0
+    assert stats.effective_branching_factor == 20.0
+    assert stats.eval_time_share == 0.25
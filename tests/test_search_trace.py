@@ -0,0 +1,59 @@
+"""
+Description: Tests of the search trace and of its summary
+"""
+
+import chess
+import pytest
+from AlphaBetaAI import AlphaBetaAI
+from SearchTrace import MAGIC, NO_CUTOFF, SearchTracer, TraceSummary, read_trace
+
+
+def test_records_round_trip(tmp_path):
+    path = str(tmp_path / "search.trace")
+    tracer = SearchTracer(path)
+    tracer.start(0xFFFFFFFFFFFFFFFF, 3)
+    tracer.record(12345, 2, -1, -100000, 100000, -250, NO_CUTOFF)
+    tracer.record(678, 1, 2, -30, -29, 40, 0)
+    tracer.close()
+    tracer = SearchTracer(path)  # appends to the file without a second header
+    tracer.record(9, 0, 3, -50, 50, 40, 1)
+    tracer.close()
+    assert list(read_trace(path)) == [(0xFFFFFFFFFFFFFFFF, 0, 3, 0, 0, 0, -2),
+                                      (12345, 2, -1, -100000, 100000, -250, -1),
+                                      (678, 1, 2, -30, -29, 40, 0), (9, 0, 3, -50, 50, 40, 1)]
+    with open(path, "rb") as trace_file:
+        assert trace_file.read().count(MAGIC) == 1
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.trace"
+    path.write_bytes(b"not a trace file")
+    with pytest.raises(ValueError):
+        list(read_trace(str(path)))
+
+
+# a root with two children: the first is a leaf, the second cuts off after searching two leaves, the first wasted
+def test_summary_of_a_small_tree():
+    summary = TraceSummary()
+    summary.add([(1, 0, 2, 0, 0, 0, -2), (2, 1, 1, -50, 50, 10, NO_CUTOFF), (3, 2, 0, -50, -10, 5, NO_CUTOFF),
+                 (4, 2, 0, -50, -10, -20, NO_CUTOFF), (5, 1, 1, -50, -10, -20, 1), (1, 0, 2, -50, 50, 10, NO_CUTOFF)])
+    assert summary.searches == 1 and summary.nodes == 5
+    assert summary.nodes_by_ply == [1, 2, 2]
+    assert summary.children_by_ply == [2, 2, 0]
+    assert summary.cutoffs_by_ply == [0, 1, 0] and summary.first_move_cutoffs_by_ply == [0, 0, 0]
+    assert summary.wasted_by_ply == [0, 1, 0]
+
+
+# the summary of a traced search counts the same nodes and cutoffs as the search itself
+def test_summary_matches_search_stats(tmp_path):
+    path = str(tmp_path / "search.trace")
+    ai = AlphaBetaAI(3, chess.WHITE, False, observers=[], trace_path=path)
+    ai.choose_move(chess.Board())
+    ai.close()
+    summary = TraceSummary()
+    summary.add(read_trace(path))
+    assert summary.searches == 1
+    assert summary.nodes == ai.stats.nodes
+    assert summary.cutoffs_by_ply[:len(ai.stats.cutoffs_by_ply)] == ai.stats.cutoffs_by_ply
+    assert sum(summary.first_move_cutoffs_by_ply) == ai.stats.first_move_cutoffs
+    assert "1 searches | " + str(ai.stats.nodes) + " nodes" in summary.report()
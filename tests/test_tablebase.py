@@ -0,0 +1,82 @@
+"""
+Description: Tests of the Syzygy tablebase probing
+"""
+
+import chess
+from AlphaBetaAI import AlphaBetaAI
+from Tablebase import TABLEBASE_WIN, Tablebase
+
+ROOK_ENDGAME = "4k3/8/8/8/8/8/8/4K2R w - - 0 1"
+
+
+# stands in for chess.syzygy tables: results of the side to move after each of the root's moves, (wdl, dtz) by move
+class FakeTables:
+    def __init__(self, root_wdl, results, default=(0, 0)):
+        self.root_wdl = root_wdl
+        self.results = results
+        self.default = default
+
+    def result(self, board):
+        return self.results.get(board.peek().uci(), self.default)
+
+    def probe_wdl(self, board):
+        return self.result(board)[0] if board.move_stack else self.root_wdl
+
+    def probe_dtz(self, board):
+        dtz = self.result(board)[1]
+        if dtz is None:
+            raise KeyError("no DTZ table")
+        return dtz
+
+    def close(self):
+        pass
+
+
+def fake_tablebase(tmp_path, tables):
+    tablebase = Tablebase(str(tmp_path))
+    tablebase.tables = tables
+    tablebase.max_pieces = 5
+    return tablebase
+
+
+# without tables every probe misses and the AI simply searches
+def test_missing_tables_fall_back_to_search(tmp_path, capsys):
+    for path in (str(tmp_path / "missing"), str(tmp_path)):
+        tablebase = Tablebase(path)
+        assert tablebase.tables is None
+        assert tablebase.probe_wdl(chess.Board(ROOK_ENDGAME)) is None
+    assert "searching without tablebases" in capsys.readouterr().out
+    board = chess.Board(ROOK_ENDGAME)
+    ai = AlphaBetaAI(2, chess.WHITE, False, observers=[], syzygy_path=str(tmp_path))
+    assert ai.choose_move(board) in board.legal_moves
+    assert not ai.stats.tablebase_move and ai.stats.tablebase == (0, 0)
+
+
+# winning, the fastest way to zeroing the fifty move counter is preferred; a draw is never picked over a win
+def test_root_move_wins_fastest(tmp_path):
+    tablebase = fake_tablebase(tmp_path, FakeTables(2, {"h1h8": (-2, 5), "h1h7": (-2, 1), "e1d1": (0, 0)},
+                                                    default=(-2, 9)))
+    assert tablebase.root_move(chess.Board(ROOK_ENDGAME)) == chess.Move.from_uci("h1h7")
+
+
+# losing, the slowest way is preferred, and a draw beats every loss
+def test_root_move_loses_slowest(tmp_path):
+    tablebase = fake_tablebase(tmp_path, FakeTables(-2, {"h1h8": (2, 3), "h1h7": (2, 12)}, default=(2, 1)))
+    assert tablebase.root_move(chess.Board(ROOK_ENDGAME)) == chess.Move.from_uci("h1h7")
+    tablebase = fake_tablebase(tmp_path, FakeTables(0, {"h1h8": (2, 3), "e1f1": (0, 0)}, default=(2, 1)))
+    assert tablebase.root_move(chess.Board(ROOK_ENDGAME)) == chess.Move.from_uci("e1f1")
+
+
+def test_root_move_without_dtz_tables(tmp_path):
+    tablebase = fake_tablebase(tmp_path, FakeTables(2, {"h1h7": (-2, None)}, default=(-2, 3)))
+    assert tablebase.root_move(chess.Board(ROOK_ENDGAME)) is None
+
+
+def test_scores_and_coverage(tmp_path):
+    tablebase = fake_tablebase(tmp_path, FakeTables(2, {}))
+    assert tablebase.score(chess.Board(ROOK_ENDGAME)) == TABLEBASE_WIN
+    assert tablebase.probe_wdl(chess.Board()) is None  # too many pieces
+    assert tablebase.probe_wdl(chess.Board("4k3/8/8/8/8/8/8/4K2R w K - 0 1")) is None  # castling rights
+    tablebase.tables.root_wdl = 1
+    assert tablebase.score(chess.Board(ROOK_ENDGAME)) == 0  # a cursed win is a draw under the fifty move rule
+    assert tablebase.probes == 2 and tablebase.hits == 2
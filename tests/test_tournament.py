@@ -0,0 +1,47 @@
+"""
+Description: Tests of the engine vs engine tournament
+"""
+
+import math
+
+import chess.pgn
+import pytest
+from tournament import DEFAULT_OPENINGS, elo_difference, elo_with_error, run_tournament
+
+
+def test_elo_difference():
+    assert elo_difference(0.5) == 0
+    assert elo_difference(0.75) == pytest.approx(400 * math.log10(3))
+    assert elo_difference(0.25) == pytest.approx(-elo_difference(0.75))
+    assert elo_difference(0.0) is None and elo_difference(1.0) is None
+
+
+def test_error_bars():
+    scores = [1.0, 0.0, 0.5, 1.0, 0.5, 1.0, 0.0, 1.0]
+    elo, error = elo_with_error(scores)
+    mean = sum(scores) / len(scores)
+    margin = 1.96 * math.sqrt(sum((score - mean) ** 2 for score in scores) / len(scores)) / math.sqrt(len(scores))
+    assert elo == pytest.approx(elo_difference(mean))
+    assert error == pytest.approx((elo_difference(mean + margin) - elo_difference(mean - margin)) / 2)
+    assert elo_with_error([0.5] * 6) == (0, 0)  # all draws: no doubt about the difference
+    assert elo_with_error([1.0] * 6) == (None, None)  # one engine won every game
+    assert elo_with_error([1.0, 1.0, 1.0, 0.5])[1] is None  # the interval reaches a perfect score
+
+
+# games alternate colors, count for the first engine and are all written to the PGN file
+def test_run_tournament(tmp_path):
+    pgn_path = str(tmp_path / "games.pgn")
+    scores = run_tournament("random", "alphabeta-simple:1", DEFAULT_OPENINGS, 4, 1, pgn_path, max_plies=20)
+    assert len(scores) == 4 and set(scores) <= {0.0, 0.5, 1.0}
+    games = []
+    with open(pgn_path) as pgn_file:
+        while True:
+            game = chess.pgn.read_game(pgn_file)
+            if game is None:
+                break
+            games.append(game)
+    assert sorted(game.headers["Round"] for game in games) == ["1", "2", "3", "4"]
+    for game in games:
+        index = int(game.headers["Round"]) - 1
+        assert game.headers["White"] == ("random" if index % 2 == 0 else "alphabeta-simple:1")
+        assert game.board().fen() == chess.Board(DEFAULT_OPENINGS[(index // 2) % len(DEFAULT_OPENINGS)]).fen()
@@ -0,0 +1,93 @@
+"""
+Description: Tests of the transposition table and how the Alpha Beta search uses its entries
+"""
+
+import chess
+import pytest
+from AlphaBetaAI import AlphaBetaAI, MATE_SCORE, mate_distance
+from IterativeDeepeningAI import IterativeDeepeningAI
+from TranspositionTable import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable
+
+MOVE = chess.Move.from_uci("e2e4")
+
+
+# three keys sharing one bucket
+def bucket_keys(table):
+    return [7 + index * table.num_buckets for index in range(3)]
+
+
+def test_deeper_entry_keeps_depth_preferred_slot():
+    table = TranspositionTable(0.01)
+    deep, shallow, deeper = bucket_keys(table)
+    table.store(deep, 5, 10, EXACT, MOVE)
+    table.store(shallow, 2, 20, EXACT, MOVE)
+    assert table.probe(deep) == (deep, 5, 10, EXACT, MOVE)
+    assert table.probe(shallow) == (shallow, 2, 20, EXACT, MOVE)
+    table.store(deeper, 6, 30, EXACT, MOVE)  # takes the depth-preferred slot
+    assert table.probe(deep) is None
+    assert table.probe(shallow) is not None and table.probe(deeper) is not None
+    assert table.collisions == 1 and table.hits == 4
+
+
+def test_same_position_is_updated_in_place():
+    table = TranspositionTable(0.01)
+    key = bucket_keys(table)[0]
+    table.store(key, 5, 10, EXACT, MOVE)
+    table.store(key, 1, -10, UPPER_BOUND, None)  # a shallower result of the same position still replaces it
+    assert table.probe(key) == (key, 1, -10, UPPER_BOUND, None)
+    assert table.always_replace[key % table.num_buckets] is None
+
+
+# an AI two plies into a search from the starting position, with depth plies left; returns the AI, the board and
+# its key
+def searching_ai(depth):
+    board = chess.Board()
+    ai = AlphaBetaAI(depth + 2, chess.WHITE, False, observers=[])
+    ai.start_search(board)
+    for uci in ("e2e4", "e7e5"):
+        ai.push_move(board, chess.Move.from_uci(uci))
+    ai.depth = depth
+    return ai, board, ai.history.current()
+
+
+# (bound, stored score, alpha, beta, whether the entry ends the search of the node)
+@pytest.mark.parametrize("bound, score, alpha, beta, cuts", [
+    (EXACT, 30, -50, 50, True),
+    (LOWER_BOUND, 60, -50, 50, True),  # at least 60, so above beta
+    (LOWER_BOUND, 40, -50, 50, False),
+    (UPPER_BOUND, -60, -50, 50, True),  # at most -60, so below alpha
+    (UPPER_BOUND, -40, -50, 50, False),
+])
+def test_probe_uses_bounds(bound, score, alpha, beta, cuts):
+    ai, board, key = searching_ai(2)
+    ai.table.store(key, 2, score, bound, MOVE)
+    assert ai.probe_table(key, alpha, beta) == ((score if cuts else None), MOVE)
+
+
+def test_shallower_entry_only_orders_moves():
+    ai, board, key = searching_ai(3)
+    ai.table.store(key, 2, 30, EXACT, MOVE)
+    assert ai.probe_table(key, -50, 50) == (None, MOVE)
+
+
+# mate scores are stored as the distance from the stored node, so they stay right when read at another ply
+def test_mate_scores_are_adjusted_by_ply():
+    ai, board, key = searching_ai(2)
+    ai.store_table(key, MATE_SCORE - 5, -50, 50, MOVE)  # mate 5 plies from the root, 3 from this node
+    assert ai.table.probe(key)[2] == MATE_SCORE - 3
+    assert ai.probe_table(key, -50, 50)[0] == MATE_SCORE - 5
+    ai.pop_move(board)
+    assert ai.probe_table(key, -50, 50)[0] == MATE_SCORE - 4
+
+    ai, board, key = searching_ai(2)
+    ai.store_table(key, -MATE_SCORE + 4, -50, 50, None)
+    assert ai.table.probe(key)[2] == -MATE_SCORE + 2
+
+
+# iterations reuse the table, and a mate in one stays a mate in one
+def test_mate_in_one_through_table():
+    board = chess.Board("6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1")
+    ai = IterativeDeepeningAI(4, chess.WHITE, False, observers=[])
+    assert ai.choose_move(board) == chess.Move.from_uci("a1a8")
+    assert ai.stats.value == MATE_SCORE - 1
+    assert mate_distance(ai.stats.value) == 1
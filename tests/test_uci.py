@@ -0,0 +1,120 @@
+"""
+Description: Tests of the UCI front-end, driven through stdin/stdout of a uci.py process like a GUI would
+"""
+
+import io
+import os
+import queue
+import subprocess
+import sys
+import threading
+
+import chess
+import pytest
+from uci import UciEngine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TIMEOUT = 60  # seconds to wait for an answer before the engine counts as hung
+
+
+class UciProcess:
+    def __init__(self):
+        self.process = subprocess.Popen([sys.executable, os.path.join(ROOT, "uci.py")], cwd=ROOT,
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        self.lines = queue.Queue()
+        threading.Thread(target=self.read, daemon=True).start()
+
+    def read(self):
+        for line in self.process.stdout:
+            self.lines.put(line.strip())
+
+    def send(self, *commands):
+        for command in commands:
+            self.process.stdin.write(command + "\n")
+        self.process.stdin.flush()
+
+    # the lines written up to the next one starting with prefix (included)
+    def wait_for(self, prefix):
+        lines = []
+        while not lines or not lines[-1].startswith(prefix):
+            lines.append(self.lines.get(timeout=TIMEOUT))
+        return lines
+
+    def close(self):
+        self.send("quit")
+        self.process.wait(timeout=TIMEOUT)
+
+
+@pytest.fixture
+def engine():
+    process = UciProcess()
+    yield process
+    if process.process.poll() is None:
+        process.process.kill()
+
+
+# the move of the bestmove line at the end of lines, checked to be legal in board
+def best_move(lines, board):
+    move = chess.Move.from_uci(lines[-1].split()[1])
+    assert move in board.legal_moves
+    return move
+
+
+def test_go_depth(engine):
+    engine.send("uci")
+    assert "uciok" in engine.wait_for("uciok")
+    engine.send("position startpos moves e2e4", "go depth 3")
+    lines = engine.wait_for("bestmove")
+    assert any(line.startswith("info depth 3") for line in lines)
+    board = chess.Board()
+    board.push_uci("e2e4")
+    best_move(lines, board)
+    engine.close()
+
+
+# the worker pool of Threads > 1 has to come up while the main thread is reading stdin
+def test_go_with_threads(engine):
+    engine.send("setoption name Threads value 2", "position startpos", "go depth 2")
+    best_move(engine.wait_for("bestmove"), chess.Board())
+    engine.send("go nodes 2000")
+    lines = engine.wait_for("bestmove")
+    best_move(lines, chess.Board())
+    depths = [int(line.split()[2]) for line in lines if line.startswith("info depth")]
+    assert depths and max(depths) < 10  # the node limit ends the search
+    engine.close()
+
+
+def test_hash_zero(engine):
+    engine.send("setoption name Hash value 0", "position startpos", "go depth 2")
+    best_move(engine.wait_for("bestmove"), chess.Board())
+    engine.close()
+
+
+# an illegal move is reported and the position before the command is kept
+def test_illegal_position_is_ignored(engine):
+    engine.send("position startpos moves e2e4", "position startpos moves e2e5", "go depth 1")
+    lines = engine.wait_for("bestmove")
+    assert any(line.startswith("info string") for line in lines)
+    board = chess.Board()
+    board.push_uci("e2e4")
+    best_move(lines, board)
+    engine.close()
+
+
+# a stop right after go still answers a legal move, even if no iteration has finished
+def test_stop_right_after_go(engine):
+    engine.send("position startpos", "go infinite", "stop")
+    best_move(engine.wait_for("bestmove"), chess.Board())
+    engine.close()
+
+
+# the workers of a running parallel search are restarted with tables of the new Hash size
+def test_hash_change_restarts_workers():
+    uci = UciEngine(io.StringIO())
+    uci.handle("setoption name Threads value 2")
+    ai = uci.ai_for(chess.WHITE)
+    pool = ai.AI.parallel
+    uci.handle("setoption name Hash value 2")
+    assert ai.AI.parallel is not None and ai.AI.parallel is not pool
+    assert ai.AI.options["hash_size"] == 1
+    uci.handle("quit")
@@ -0,0 +1,176 @@
+"""
+Description: Engine vs engine tournament; plays games in a pool of worker processes, streams them to a PGN file and
+reports the Elo difference between the two engines
+"""
+
+import argparse
+import math
+import multiprocessing
+import time
+
+import chess
+import chess.pgn
+from ChessGame import ChessGame
+from MinimaxAI import MinimaxAI
+from MCTSAI import MCTSAI
+from AlphaBetaAI import AlphaBetaAI
+from IterativeDeepeningAI import IterativeDeepeningAI
+from OpeningBook import OpeningBook
+from RandomAI import RandomAI
+
+# openings used when no opening file is given (after 1-3 moves of common openings)
+DEFAULT_OPENINGS = [
+    "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1",
+    "rnbqkbnr/pppppppp/8/8/3P4/8/PPP1PPPP/RNBQKBNR b KQkq - 0 1",
+    "rnbqkbnr/pppppppp/8/8/2P5/8/PP1PPPPP/RNBQKBNR b KQkq - 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/5N2/PPPPPPPP/RNBQKB1R b KQkq - 1 1",
+    "rnbqkbnr/pp1ppppp/8/2p5/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2",
+    "rnbqkbnr/pppp1ppp/4p3/8/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2",
+    "rnbqkbnr/pp1ppppp/2p5/8/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2",
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "rnbqkb1r/pppppppp/5n2/8/3P4/8/PPP1PPPP/RNBQKBNR w KQkq - 1 2",
+    "rnbqkbnr/ppp1pppp/8/3p4/3P4/8/PPP1PPPP/RNBQKBNR w KQkq - 0 2",
+]
+
+
+# builds a silent player from a spec such as "alphabeta:3", "alphabeta-simple:3", "minimax:2", "id:4", "mcts:1000"
+# (playouts per move) or "random"
+# searching players probe the Polyglot book at book_path first when one is given
+def make_player(spec, color, book_path=None):
+    name, _, limit = spec.partition(":")
+    depth = int(limit) if limit else 3
+    book = OpeningBook(book_path) if book_path is not None and name not in ("random", "mcts") else None
+    if name == "minimax":
+        return MinimaxAI(depth, color, observers=[], book=book)
+    if name == "alphabeta":
+        return AlphaBetaAI(depth, color, False, observers=[], book=book)
+    if name == "alphabeta-simple":
+        return AlphaBetaAI(depth, color, True, observers=[], book=book)
+    if name == "id":
+        return IterativeDeepeningAI(depth, color, False, observers=[], book=book)
+    if name == "mcts":
+        return MCTSAI(color, playouts=int(limit) if limit else 1000, observers=[])
+    if name == "random":
+        return RandomAI(delay=0, quiet=True)
+    raise ValueError("unknown engine " + spec)
+
+
+# reads starting positions from a file with one FEN or EPD position per line
+def read_openings(path):
+    openings = []
+    with open(path) as opening_file:
+        for line in opening_file:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                board = chess.Board(line)
+            except ValueError:
+                board, operations = chess.Board.from_epd(line)
+            openings.append(board.fen())
+    return openings
+
+
+# plays one game in a worker process; returns (index, white spec, result, plies, PGN text, book summaries of white
+# and black)
+def play_game(task):
+    index, fen, white, black, max_plies, book_path = task
+    game = ChessGame(make_player(white, chess.WHITE, book_path), make_player(black, chess.BLACK, book_path), fen)
+    result = game.play(show_board=False, max_plies=max_plies)
+
+    pgn = chess.pgn.Game.from_board(game.board)
+    pgn.headers["Event"] = "ChessAI tournament"
+    pgn.headers["Date"] = time.strftime("%Y.%m.%d")
+    pgn.headers["Round"] = str(index + 1)
+    pgn.headers["White"] = white
+    pgn.headers["Black"] = black
+    pgn.headers["Result"] = result
+    if result == "1/2-1/2" and not game.board.is_game_over():
+        pgn.headers["Termination"] = "adjudication"  # reached max_plies
+    return index, white, result, len(game.board.move_stack), str(pgn), [game.book_summary(0), game.book_summary(1)]
+
+
+# Elo difference of a score fraction (None when one side won every game)
+def elo_difference(score):
+    if score <= 0 or score >= 1:
+        return None
+    return -400 * math.log10(1 / score - 1)
+
+
+# Elo difference of the first engine and the half width of its 95% confidence interval
+def elo_with_error(scores):
+    games = len(scores)
+    mean = sum(scores) / games
+    deviation = math.sqrt(sum((score - mean) ** 2 for score in scores) / games)
+    margin = 1.96 * deviation / math.sqrt(games)
+    elo = elo_difference(mean)
+    low = elo_difference(mean - margin)
+    high = elo_difference(mean + margin)
+    if elo is None or low is None or high is None:
+        return elo, None
+    return elo, (high - low) / 2
+
+
+# plays games between engine1 and engine2, each opening once with either color; finished games are appended to
+# pgn_path as they complete; returns engine1's score (1, 0.5 or 0) of every game
+def run_tournament(engine1, engine2, openings, games, workers, pgn_path, max_plies=None, book_path=None):
+    tasks = []
+    for index in range(games):
+        fen = openings[(index // 2) % len(openings)]
+        white, black = (engine1, engine2) if index % 2 == 0 else (engine2, engine1)
+        tasks.append((index, fen, white, black, max_plies, book_path))
+
+    scores = []
+    books = [[0, 0, 0.0], [0, 0, 0.0]]  # book moves, moves and seconds saved of engine1 and engine2
+    start = time.perf_counter()
+    with open(pgn_path, "w") as pgn_file, multiprocessing.Pool(workers) as pool:
+        for index, white, result, plies, pgn, summaries in pool.imap_unordered(play_game, tasks):
+            pgn_file.write(pgn + "\n\n")
+            pgn_file.flush()
+
+            white_score = {"1-0": 1.0, "0-1": 0.0}.get(result, 0.5)
+            engine1_white = index % 2 == 0  # compared by index so an engine can play itself
+            scores.append(white_score if engine1_white else 1 - white_score)
+            for player, summary in enumerate(summaries if engine1_white else summaries[::-1]):
+                books[player] = [total + value for total, value in zip(books[player], summary)]
+            print("game " + str(len(scores)) + "/" + str(games) + " | " + white + " vs " +
+                  (engine2 if engine1_white else engine1) + " | " + result + " | " + str(plies) + " plies")
+
+    elapsed = time.perf_counter() - start
+    wins = scores.count(1.0)
+    draws = scores.count(0.5)
+    elo, error = elo_with_error(scores)
+    print("\n" + engine1 + " vs " + engine2 + ": +" + str(wins) + " =" + str(draws) + " -" +
+          str(len(scores) - wins - draws) + " | score " + str(round(100 * sum(scores) / len(scores), 1)) + "%")
+    if elo is None:
+        print("Elo difference: unbounded (one engine won every game)")
+    elif error is None:
+        print("Elo difference: " + str(round(elo)) + " (too few decisive games for an error bar)")
+    else:
+        print("Elo difference: " + str(round(elo)) + " +/- " + str(round(error)) + " (95%)")
+    if book_path is not None:
+        for engine, (book_moves, moves, saved) in zip((engine1, engine2), books):
+            if moves:
+                print(engine + " book moves: " + str(book_moves) + "/" + str(moves) + " (" +
+                      str(round(100 * book_moves / moves, 1)) + "%) | about " + str(round(saved, 1)) +
+                      "s of search saved")
+    print(str(len(scores)) + " games in " + str(round(elapsed, 1)) + "s | " +
+          str(round(len(scores) * 3600 / elapsed / workers, 1)) + " games/hour/core | PGN written to " + pgn_path)
+    return scores
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play an engine vs engine tournament.")
+    parser.add_argument("engine1", help="e.g. alphabeta:3, alphabeta-simple:3, minimax:2, id:4, mcts:1000 or random")
+    parser.add_argument("engine2")
+    parser.add_argument("--games", type=int, default=20, help="number of games, colors alternate every game")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(), help="worker processes")
+    parser.add_argument("--openings", help="file of FEN or EPD starting positions, one per line")
+    parser.add_argument("--pgn", default="tournament.pgn", help="PGN file the games are written to")
+    parser.add_argument("--max-plies", type=int, help="score games as draws after this many plies")
+    parser.add_argument("--book", help="Polyglot .bin opening book probed before every search")
+    args = parser.parse_args()
+
+    openings = read_openings(args.openings) if args.openings else DEFAULT_OPENINGS
+    run_tournament(args.engine1, args.engine2, openings, args.games, args.workers, args.pgn, args.max_plies,
+                   args.book)
@@ -0,0 +1,189 @@
+"""
+Description: UCI front-end; keeps the Iterative Deepening AI resident between positions so its tables stay warm
+"""
+
+import multiprocessing
+import sys
+import threading
+import time
+
+import chess
+from AlphaBetaAI import mate_distance
+from AsyncEngine import AsyncEngine
+from IterativeDeepeningAI import IterativeDeepeningAI
+from MoveOrderer import MoveOrderer
+from ParallelSearch import ParallelSearch
+from TranspositionTable import TranspositionTable
+
+MAX_DEPTH = 60  # depth searched when go gives no depth (stays below MoveOrderer.MAX_PLY)
+
+
+class UciEngine:
+    def __init__(self, output=sys.stdout):
+        self.output = output
+        self.output_lock = threading.Lock()  # bestmove and info lines are written from the search thread
+        self.hash_size = 16
+        self.threads = 1
+        # scores are kept from the AI's own point of view, so each side to move gets its own AI and tables
+        self.ais = {}
+        self.engines = {}
+        self.board = chess.Board()
+        self.search = None  # future of the running search
+        self.search_ai = None
+        self.search_start = 0.0
+
+    def send(self, line):
+        with self.output_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    # the AI searching positions with color to move, created on first use
+    def ai_for(self, color):
+        if color not in self.ais:
+            ai = IterativeDeepeningAI(MAX_DEPTH, color, False, observers=[], pvs=True, aspiration_window=50)
+            self.ais[color] = ai
+            self.engines[color] = AsyncEngine(ai)
+            self.configure(ai)
+        return self.ais[color]
+
+    # applies the Hash and Threads options; Hash is split between the two sides' tables, and every worker of a
+    # parallel search gets a table of the same size, so a change of either restarts the worker pool
+    # the worker pool is started here, on the main thread: a worker forked while the main thread waits in
+    # sys.stdin would hang closing its copy of stdin, whose lock the fork copied as held
+    def configure(self, ai):
+        table_size = self.hash_size / 2
+        ai.AI.table = TranspositionTable(table_size) if table_size > 0 else None
+        if ai.AI.workers != self.threads or ai.AI.options["hash_size"] != table_size:
+            if ai.AI.parallel is not None:
+                ai.AI.parallel.close()
+                ai.AI.parallel = None
+            ai.AI.workers = self.threads
+            ai.AI.options["hash_size"] = table_size
+        if ai.AI.workers > 1 and ai.AI.parallel is None:
+            ai.AI.parallel = ParallelSearch(ai.AI)
+
+    # handles one command line; returns False on quit
+    def handle(self, line):
+        tokens = line.split()
+        if not tokens:
+            return True
+        command = tokens[0]
+
+        if command == "uci":
+            self.send("id name ChessAI")
+            self.send("id author Tate Toussaint")
+            self.send("option name Hash type spin default 16 min 0 max 4096")
+            self.send("option name Threads type spin default 1 min 1 max " + str(multiprocessing.cpu_count()))
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "ucinewgame":
+            self.stop()
+            for ai in self.ais.values():
+                if ai.AI.table is not None:
+                    ai.AI.table.clear()
+                ai.AI.orderer = MoveOrderer()
+        elif command == "setoption":
+            self.stop()
+            self.set_option(tokens)
+        elif command == "position":
+            self.stop()
+            self.set_position(tokens)
+        elif command == "go":
+            self.go(tokens)
+        elif command == "stop":
+            self.stop()
+        elif command == "quit":
+            self.stop()
+            for ai in self.ais.values():
+                ai.AI.close()
+            return False
+        return True
+
+    # setoption name <name> value <value>
+    def set_option(self, tokens):
+        if "value" not in tokens:
+            return
+        name = " ".join(tokens[2:tokens.index("value")]).lower()
+        value = " ".join(tokens[tokens.index("value") + 1:])
+        if name == "hash":
+            self.hash_size = max(0, int(value))
+        elif name == "threads":
+            self.threads = max(1, int(value))
+        else:
+            return
+        for ai in self.ais.values():
+            self.configure(ai)
+
+    # position [startpos | fen <fen>] [moves <move> ...]; an invalid FEN or illegal move is reported and the previous
+    # position kept
+    def set_position(self, tokens):
+        moves_index = tokens.index("moves") if "moves" in tokens else len(tokens)
+        try:
+            if len(tokens) > 1 and tokens[1] == "fen":
+                board = chess.Board(" ".join(tokens[2:moves_index]))
+            else:
+                board = chess.Board()
+            for uci in tokens[moves_index + 1:]:
+                board.push_uci(uci)
+        except ValueError as error:
+            self.send("info string ignoring position: " + str(error))
+            return
+        self.board = board
+
+    # go [depth <plies>] [movetime <ms>] [nodes <count>] [wtime/btime/winc/binc <ms>] [infinite]
+    def go(self, tokens):
+        self.stop()
+        limits = {}
+        for index, token in enumerate(tokens[:-1]):
+            if token in ("depth", "movetime", "nodes", "wtime", "btime", "winc", "binc"):
+                limits[token] = int(tokens[index + 1])
+
+        turn = self.board.turn
+        ai = self.ai_for(turn)
+        ai.max_depth = min(limits.get("depth", MAX_DEPTH), MAX_DEPTH)
+        ai.time_limit = limits["movetime"] / 1000 if "movetime" in limits else None
+        clock = limits.get("wtime" if turn == chess.WHITE else "btime")
+        ai.clock = clock / 1000 if clock is not None else None
+        ai.increment = limits.get("winc" if turn == chess.WHITE else "binc", 0) / 1000
+        ai.node_limit = limits.get("nodes")
+
+        self.search_ai = ai
+        self.search_start = time.perf_counter()
+        self.search = self.engines[turn].choose_move_async(self.board, self.report)
+        self.search.add_done_callback(self.send_best_move)
+
+    # interrupts the running search; it still answers with the best move of its last completed iteration
+    def stop(self):
+        if self.search is None:
+            return
+        thread = self.engines[self.search_ai.color].thread
+        while thread.is_alive():
+            # asked again until the thread ends, in case the search hadn't started (and reset the request) yet
+            self.search_ai.stop()
+            thread.join(0.05)
+        self.search = None
+
+    # progress callback: one info line per completed iteration
+    def report(self, iteration):
+        ai = self.search_ai
+        elapsed = time.perf_counter() - self.search_start
+        value = iteration.value or 0
+        mate = mate_distance(value)
+        score = "mate " + str(mate) if mate is not None else "cp " + str(value)
+        nodes = ai.AI.min_max_calls
+        self.send("info depth " + str(iteration.depth) + " score " + score + " nodes " + str(nodes) +
+                  " nps " + str(round(nodes / elapsed) if elapsed else 0) + " time " + str(round(1000 * elapsed)) +
+                  " pv " + " ".join(move.uci() for move in ai.AI.pv))
+
+    def send_best_move(self, future):
+        move = None if future.cancelled() or future.exception() is not None else future.result()
+        self.send("bestmove " + (move.uci() if move is not None else "0000"))
+
+
+if __name__ == "__main__":
+    # usage: python3 uci.py (then talk UCI on stdin/stdout, e.g. through python-chess's chess.engine)
+    engine = UciEngine()
+    for line in sys.stdin:
+        if not engine.handle(line):
+            break